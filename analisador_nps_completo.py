@@ -11,7 +11,6 @@ from encoding_fix import setup_windows_encoding, safe_print
 setup_windows_encoding()
 
 import pandas as pd
-import requests
 import re
 import io
 from datetime import datetime
@@ -19,8 +18,25 @@ import unicodedata
 import openai
 import os
 import time
+import html
+import json
+import zlib
+import codecs
+import hashlib
+import threading
+import importlib.util
+from urllib.parse import quote, urlsplit, urlunsplit, parse_qsl, urlencode
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
 from dotenv import load_dotenv
-from cache_manager import cache_manager
+from cache_manager import CacheManager, cache_manager
+from sessao_http import sessao_http
+from indice_abas import IndiceAbas, indice_abas, assinatura_cabecalho
+from cache_negativo import CacheNegativo, cache_negativo
+from limitador_google import STATUS_LIMITACAO, PrazoEsgotadoError
+from estatisticas_estrategias import EstatisticasEstrategias, estatisticas_estrategias
+from esquemas_leitura import EsquemasLeitura, esquemas_leitura
+from extratores_especiais import registro_extratores
+from api_valores_sheets import ClienteValoresSheets
 import colorama
 from colorama import init
 
@@ -30,15 +46,220 @@ init(autoreset=True)
 # Carrega configurações do .env
 load_dotenv()
 
+# Abas que o sistema precisa encontrar em toda planilha
+ABAS_PRINCIPAIS = ('NPS_D1', 'NPS_D30', 'NPS_Ruim')
+
+# Estratégias de descoberta ordenadas pelo histórico (estatisticas_estrategias):
+# código -> (descrição, método, requisições nominais). Empates mantêm esta ordem.
+ESTRATEGIAS_DESCOBERTA = {
+    '1.1': ('planilha inteira em XLSX', '_extrair_via_xlsx', 1),
+    '1.2': ('lista de abas publicadas', '_buscar_por_listagem_publicada', 3),
+    '1.5': ('índice de abas', '_buscar_por_indice_abas', 3),
+    '1.7': ('nomes exatos', '_buscar_forcado_nomes_exatos', 3),
+    '2': ('nomes diretos', '_buscar_abas_por_nomes_diretos', 20),
+}
+
+# Pacote opcional exigido por cada estratégia - sem ele a estratégia sai do plano
+DEPENDENCIAS_ESTRATEGIAS = {'1.1': 'openpyxl'}
+
+# Abas pedidas num único values:batchGet quando há chave da Sheets API (ver _extrair_via_api_valores)
+ABAS_API_VALORES = [nome.strip() for nome in
+                    os.getenv('NPS_API_ABAS', 'NPS D+1,NPS D+30,NPS Ruim').split(',') if nome.strip()]
+
+# Estratégias baratas que rodam juntas em corrida (ver _correr_estrategias)
+ESTRATEGIAS_CORRIDA = ('1.5', '1.7', '2')
+
+# Endereço base das planilhas (pode apontar para um servidor local em testes)
+URL_BASE_SHEETS = 'https://docs.google.com/spreadsheets/d'
+
+# Download em streaming: bytes por leitura de rede e linhas por bloco do pandas
+TAMANHO_BLOCO_DOWNLOAD = 64 * 1024
+LINHAS_POR_BLOCO = int(os.getenv('NPS_CSV_LINHAS_POR_BLOCO', 20000))
+
+# Modo sonda: bytes lidos de cada aba candidata durante a descoberta
+TAMANHO_AMOSTRA = int(os.getenv('NPS_SONDA_BYTES', 8 * 1024))
+
+# Motor de leitura do CSV completo: 'pandas' (blocos de linhas) ou 'pyarrow'
+# (leitura multi-thread, requer pyarrow instalado)
+MOTOR_CSV = os.getenv('NPS_CSV_MOTOR', 'pandas').strip().lower()
+
+# Formato pedido ao endpoint gviz nas buscas por nome (estratégias 1.7 e 2):
+# 'csv' ou 'json' (colunas já tipadas pelo Sheets - ver _ler_gviz_json)
+FORMATO_GVIZ = os.getenv('NPS_GVIZ_FORMATO', 'csv').strip().lower()
+
+# Modo sonda no formato JSON: linhas pedidas com "limit" (JSON não é lido pela metade)
+LINHAS_AMOSTRA_JSON = int(os.getenv('NPS_SONDA_LINHAS_JSON', 100))
+
+# Formatos testados ao registrar o esquema de leitura da coluna de data
+FORMATOS_DATA = ['%d/%m/%Y', '%Y-%m-%d', '%d/%m/%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S',
+                 '%d/%m/%Y %H:%M', '%d/%m/%y', '%m/%d/%Y']
+
+# Atualização incremental do cache: últimas linhas conhecidas repetidas no início
+# do delta para conferir que o histórico não foi editado (ver _atualizar_cache_incremental)
+LINHAS_CONTINUIDADE = max(1, int(os.getenv('NPS_DELTA_LINHAS_SOBREPOSTAS', 3)))
+
+# Respostas que dizem respeito à planilha inteira (privada, sem permissão ou
+# inexistente) - nunca vão para o cache negativo, que é por aba
+STATUS_PLANILHA_INACESSIVEL = (401, 403, 404)
+
+# Orçamento da extração (ver _orcamento_esgotado): prazo total em segundos e máximo
+# de requisições da descoberta (0 = sem limite). A fração RESERVA_MATERIALIZACAO do
+# prazo fica guardada para baixar o conteúdo completo das abas vencedoras
+PRAZO_EXTRACAO = float(os.getenv('NPS_PRAZO_EXTRACAO', 90))
+MAX_REQUISICOES_DESCOBERTA = int(os.getenv('NPS_MAX_REQUISICOES', 400))
+RESERVA_MATERIALIZACAO = float(os.getenv('NPS_RESERVA_MATERIALIZACAO', 0.25))
+
+# Possíveis nomes da coluna de avaliação (nota 0-10)
+NOMES_COLUNA_AVALIACAO = [
+    'avaliacao', 'avaliaçao', 'avaliaãão', 'avaliação', 'avaliaacaao',
+    'nota', 'score', 'rating', 'pontuacao', 'pontuação',
+    'satisfaction', 'satisfacao', 'satisfação'
+]
+
+# Possíveis nomes da coluna de data usada no filtro por período
+NOMES_COLUNA_DATA = ['data', 'date', 'timestamp']
+
+# Colunas que o pipeline usa (métricas, relatório e classificação das abas) - as
+# demais ficam de fora da consulta gviz quando o filtro por período é empurrado
+# para o servidor (ver _consulta_periodo)
+NOMES_COLUNAS_PIPELINE = NOMES_COLUNA_AVALIACAO + NOMES_COLUNA_DATA + [
+    'coment', 'feedback', 'observa',
+    'vendedor', 'atendente', 'consultor', 'funcionario',
+    'loja', 'store', 'filial', 'unidade', 'nome completo',
+    'telefone', 'fone', 'phone', 'whatsapp', 'zap', 'wpp',
+    'situa', 'resolu', 'fonte', 'origem', 'bot', 'status'
+]
+
+
+def _letra_coluna(indice):
+    """0 -> 'A', 27 -> 'AB' (identificador de coluna da linguagem de consulta gviz)"""
+    letras = ''
+    indice += 1
+    while indice:
+        indice, resto = divmod(indice - 1, 26)
+        letras = chr(ord('A') + resto) + letras
+    return letras
+
+
+def _data_consulta(valor):
+    """Data do filtro (YYYY-MM-DD ou datetime/date) como date - None se não for data"""
+    if valor is None or hasattr(valor, 'year'):
+        return valor.date() if isinstance(valor, datetime) else valor
+    try:
+        return datetime.strptime(str(valor).strip(), '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+class _FluxoResposta(io.RawIOBase):
+    """Arquivo binário somente-leitura sobre response.iter_content (lido sob demanda)"""
+
+    def __init__(self, blocos):
+        self._blocos = iter(blocos)
+        self._buffer = b''
+
+    def readable(self):
+        return True
+
+    def _proximo_bloco(self):
+        for bloco in self._blocos:
+            if bloco:
+                return bloco
+        return b''
+
+    def espiar(self, tamanho):
+        """Bytes iniciais do corpo sem consumi-los"""
+        while len(self._buffer) < tamanho:
+            bloco = self._proximo_bloco()
+            if not bloco:
+                break
+            self._buffer += bloco
+        return self._buffer[:tamanho]
+
+    def readinto(self, destino):
+        if not self._buffer:
+            self._buffer = self._proximo_bloco()
+        quantidade = min(len(destino), len(self._buffer))
+        destino[:quantidade] = self._buffer[:quantidade]
+        self._buffer = self._buffer[quantidade:]
+        return quantidade
+
 
 class AnalisadorNPSCompleto:
     """Analisador completo de NPS com extração automática e métricas segmentadas"""
     
-    def __init__(self, nome_loja="Mercadão dos Óculos", gids_customizados=None):
+    def __init__(self, nome_loja="Mercadão dos Óculos", gids_customizados=None,
+                 max_concorrencia=None, progress_callback=None, sessao=None, url_base=None,
+                 prazo_extracao=None, max_requisicoes=None, api_key=None, url_api=None,
+                 diretorio_cache=None):
         self.nome_loja = nome_loja
         self.dados_abas = {}
         self.metricas_calculadas = {}
         self.gids_customizados = gids_customizados or []  # Lista de GIDs personalizados
+        # Limite de requisições simultâneas nas buscas por GID
+        self.max_concorrencia = max(1, int(max_concorrencia or os.getenv('NPS_MAX_CONCORRENCIA', 8)))
+        # Callback de progresso no formato callback(atual, total, mensagem)
+        self.progress_callback = progress_callback
+        # Sessão HTTP com pool keep-alive compartilhada por todas as estratégias
+        self.sessao = sessao or sessao_http
+        # Base das URLs de exportação (NPS_SHEETS_URL_BASE permite um servidor local)
+        self.url_base = (url_base or os.getenv('NPS_SHEETS_URL_BASE') or URL_BASE_SHEETS).rstrip('/')
+        # Memórias persistentes (cache, índice, cache negativo, esquemas e estatísticas):
+        # com diretorio_cache são instâncias próprias gravando nele, senão as globais em cache/
+        if diretorio_cache:
+            self.cache_manager = CacheManager(cache_dir=diretorio_cache)
+            self.indice_abas = IndiceAbas(os.path.join(diretorio_cache, 'indice_abas.json'))
+            self.cache_negativo = CacheNegativo(os.path.join(diretorio_cache, 'cache_negativo.json'))
+            self.esquemas_leitura = EsquemasLeitura(os.path.join(diretorio_cache, 'esquemas_leitura.json'))
+            self.estatisticas_estrategias = EstatisticasEstrategias(
+                os.path.join(diretorio_cache, 'estatisticas_estrategias.json'))
+        else:
+            self.cache_manager = cache_manager
+            self.indice_abas = indice_abas
+            self.cache_negativo = cache_negativo
+            self.esquemas_leitura = esquemas_leitura
+            self.estatisticas_estrategias = estatisticas_estrategias
+        # Estado da corrida entre estratégias baratas (ver _correr_estrategias)
+        self._cancelar_busca = threading.Event()
+        self._lock_corrida = threading.Lock()
+        self._local = threading.local()
+        self._corrida = None
+        # Requisições feitas por cada estratégia em execução (ver _executar_estrategia)
+        self._requisicoes_estrategia = {}
+        self._abas_publicadas = []
+        self._abas_listagem = {}
+        # Abas confirmadas pelo índice persistente quando ele não cobre os 3 tipos:
+        # a descoberta procura só o que falta (ver _buscar_por_indice_persistente)
+        self._abas_indice = {}
+        # Extratores especiais à espera de uma aba baixada com o cabeçalho que pedem
+        # (ver _tentar_extratores_por_cabecalho)
+        self._extratores_cabecalho = []
+        self._recursos_conferidos = set()
+        # Memo da extração atual: URL canônica -> Future do download (ver _baixar_aba)
+        self._lock_memo = threading.Lock()
+        self._memo_downloads = {}
+        self._memo_classificacao = {}
+        self._memo_acertos = 0
+        # Sondagens que falharam nesta extração: só vão para o cache negativo se a
+        # planilha devolveu alguma aba real (ver _gravar_falhas_sondagem)
+        self._falhas_sondagem = set()
+        self._planilha_acessivel = False
+        # Chave da Sheets API: com ela as 3 abas vêm numa única chamada (estratégia API)
+        self.api_key = api_key or os.getenv('GOOGLE_SHEETS_API_KEY')
+        self.url_api = url_api
+        # Formato das buscas gviz por nome ('csv' ou 'json')
+        self.formato_gviz = FORMATO_GVIZ
+        # Período do filtro por data da extração atual (ver _consulta_periodo)
+        self._periodo = (None, None)
+        # Orçamento de cada extração: prazo (segundos) e requisições da descoberta (0 = sem limite)
+        self.prazo_extracao = float(PRAZO_EXTRACAO if prazo_extracao is None else prazo_extracao)
+        self.max_requisicoes = int(MAX_REQUISICOES_DESCOBERTA if max_requisicoes is None else max_requisicoes)
+        self._orcamento = None
+        self._abas_parciais = {}
+        # Resultado da última extração: 'completa', 'parcial' (faltam abas por orçamento
+        # esgotado ou download completo perdido) ou 'falha'; motivo_extracao_parcial explica o 'parcial'
+        self.status_extracao = None
+        self.motivo_extracao_parcial = None
         # Configuração da API OpenAI
         api_key = os.getenv('OPENAI_API_KEY')
         if not api_key:
@@ -65,7 +286,7 @@ class AnalisadorNPSCompleto:
         self.gids_customizados = []
         print("[OK] GIDs customizados removidos - usando busca padrão")
         
-    def analisar_planilha(self, url_planilha, data_inicio=None, data_fim=None):
+    def analisar_planilha(self, url_planilha, data_inicio=None, data_fim=None, nova_tentativa=False):
         """
         Análise completa da planilha NPS
         Retorna resumo estruturado em texto
@@ -74,6 +295,8 @@ class AnalisadorNPSCompleto:
             url_planilha: URL da planilha Google Sheets
             data_inicio: data de início do filtro (formato YYYY-MM-DD ou datetime)
             data_fim: data de fim do filtro (formato YYYY-MM-DD ou datetime)
+            nova_tentativa: True quando o usuário pede para tentar de novo (esquece
+                as abas inexistentes registradas no cache negativo)
         """
         try:
             print("[INICIO] Iniciando análise completa NPS...")
@@ -91,7 +314,7 @@ class AnalisadorNPSCompleto:
             
             # ETAPA 1: Extração automática das abas
             print("\n[ENTRADA] ETAPA 1: Extração das Abas")
-            if not self._extrair_abas_automaticamente(url_planilha):
+            if not self._extrair_abas_automaticamente(url_planilha, data_inicio, data_fim, nova_tentativa):
                 return "[ERRO] Falha na extração das abas"
             
             # ETAPA 2: Padronização dos dados
@@ -157,109 +380,522 @@ class AnalisadorNPSCompleto:
             print(f"[AVISO] Erro ao aplicar filtro por data: {str(e)}")
             print("   [REPETIR] Continuando com dados originais...")
     
-    def _extrair_abas_automaticamente(self, url):
-        """Sistema multi-estratégia para descobrir abas de qualquer planilha - COM CACHE"""
+    def _extrair_abas_automaticamente(self, url, data_inicio=None, data_fim=None, nova_tentativa=False):
+        """
+        Extrai as abas da planilha dentro do orçamento (prazo_extracao / max_requisicoes)
+        
+        Ao final, self.status_extracao indica 'completa', 'parcial' (orçamento esgotado
+        ou download completo de uma vencedora falhou e faltam abas principais - segue
+        com as que foram achadas, sem gravar cache nem índice) ou 'falha'.
+        
+        Com nova_tentativa=True as falhas de sondagem já registradas para a
+        planilha no cache negativo são esquecidas antes da descoberta.
+        """
+        self.status_extracao = None
+        self.motivo_extracao_parcial = None
+        inicio = time.time()
+        fim = inicio + self.prazo_extracao if self.prazo_extracao > 0 else float('inf')
+        self._orcamento = {
+            'inicio': inicio,
+            'fim': fim,
+            'fim_descoberta': inicio + self.prazo_extracao * (1 - RESERVA_MATERIALIZACAO) if self.prazo_extracao > 0 else fim,
+            'usadas': 0,
+            'materializando': False,
+            'interrompido': {}  # fase -> motivo (espera do limitador passaria do prazo)
+        }
+        self._abas_parciais = {}
+        with self._lock_memo:
+            self._falhas_sondagem = set()
+            self._planilha_acessivel = False
+        sheet_id = self._extrair_sheet_id(url)
+        if nova_tentativa and sheet_id:
+            self.cache_negativo.remover_planilha(sheet_id)
+        sucesso = False
+        try:
+            sucesso = self._extrair_abas_com_cache(url, data_inicio, data_fim)
+            return sucesso
+        finally:
+            if self.status_extracao is None:
+                self.status_extracao = 'completa' if sucesso else 'falha'
+            self._gravar_falhas_sondagem(sheet_id)
+            print(f"[ORCAMENTO] Extração {self.status_extracao}: {self._orcamento['usadas']} requisições "
+                  f"em {time.time() - inicio:.1f}s")
+            self._orcamento = None
+            self._abas_parciais = {}
+    
+    def _extrair_abas_com_cache(self, url, data_inicio=None, data_fim=None):
+        """
+        Sistema multi-estratégia para descobrir abas de qualquer planilha - COM CACHE
+        
+        Com data_inicio/data_fim o download completo das abas vencedoras vira uma
+        consulta gviz só com o período e as colunas usadas (_baixar_periodo); o
+        filtro no cliente (_aplicar_filtro_data) continua valendo como garantia.
+        """
         try:
             # Armazena URL para cache
             self._current_url = url
+            self._periodo = (data_inicio, data_fim)
             
             # Verifica cache primeiro
-            cached_data = cache_manager.get_cached_data(url)
+            cached_data = self.cache_manager.get_cached_data(url)
             if cached_data and cached_data.get('data'):
-                print("💾 Dados recuperados do cache - processamento instantâneo!")
-                self.dados_abas = cached_data['data']
-                return True
+                if not cached_data.get('precisa_validar'):
+                    print("💾 Dados recuperados do cache - processamento instantâneo!")
+                    self.dados_abas = cached_data['data']
+                    return True
+                
+                # Cache antigo: sonda barata decide entre reutilizar, anexar só as
+                # respostas novas ou baixar tudo de novo
+                sheet_id_cache = self._extrair_sheet_id(url)
+                print("[CACHE] Verificando se a planilha mudou desde o cache...")
+                atualizados = None
+                if sheet_id_cache:
+                    atualizados = self._atualizar_cache_incremental(sheet_id_cache, cached_data['data'])
+                if atualizados is not None:
+                    novas = sum(len(atualizados[tipo]) - len(df) for tipo, df in cached_data['data'].items())
+                    if novas:
+                        print(f"💾 {novas} respostas novas anexadas aos dados do cache")
+                        self.cache_manager.save_to_cache(url, atualizados)
+                    else:
+                        print("💾 Planilha sem alterações - reutilizando dados do cache")
+                        self.cache_manager.renovar_cache(url)
+                    self.dados_abas = atualizados
+                    return True
+                print("[CACHE] Histórico alterado - extraindo novamente")
             
             sheet_id = self._extrair_sheet_id(url)
             if not sheet_id:
                 print("[ERRO] ID da planilha não encontrado")
                 return False
+            self._sheet_id_atual = sheet_id
+            self._limpar_memo()
+            
+            # === ESTRATÉGIA API: AS 3 ABAS NUMA ÚNICA CHAMADA (com chave da Sheets API) ===
+            if self.api_key:
+                print("[META] ESTRATÉGIA API: Abas principais via Sheets API (values:batchGet)...")
+                abas_api = self._executar_estrategia('API', self._extrair_via_api_valores, sheet_id)
+                if len(abas_api) >= 2:
+                    self.dados_abas = abas_api
+                    return self._finalizar_extracao(abas_api)
+            
+            # === ÍNDICE PERSISTENTE: GIDs já conhecidos desta planilha ===
+            abas_indexadas = self._buscar_por_indice_persistente(sheet_id)
+            if all(tipo in abas_indexadas for tipo in ABAS_PRINCIPAIS):
+                self.dados_abas = abas_indexadas
+                return self._finalizar_extracao(abas_indexadas)
+            if abas_indexadas:
+                faltantes = [tipo for tipo in ABAS_PRINCIPAIS if tipo not in abas_indexadas]
+                print(f"[INDICE] {', '.join(faltantes)} fora do índice - descoberta só para o que falta")
+                self._abas_indice = abas_indexadas
+                self._abas_parciais.update(abas_indexadas)
             
             print("[BUSCA] Iniciando descoberta multi-estratégia de abas...")
             
-            # === ESTRATÉGIA 0: PLANILHA ABA ÚNICA (sua planilha especial) ===
-            print("[META] ESTRATÉGIA 0: Verificando se é planilha de aba única...")
-            if self._tentar_extracao_aba_unica(sheet_id, url):
-                return True
+            # === ESTRATÉGIA 0: EXTRATORES ESPECIAIS (ex.: planilha de aba única) ===
+            abas_especiais = self._tentar_extratores_especiais(sheet_id, url)
+            if abas_especiais:
+                self.dados_abas = abas_especiais
+                return self._finalizar_extracao(abas_especiais)
             
             # === ESTRATÉGIA 1: GIDs CUSTOMIZADOS (mais rápido) ===
-            if self.gids_customizados:
+            if self.gids_customizados and not self._orcamento_esgotado():
                 print(f"[META] ESTRATÉGIA 1: Usando GIDs customizados: {self.gids_customizados}")
-                abas_encontradas = self._buscar_por_gids_especificos(sheet_id, self.gids_customizados)
+                abas_encontradas = self._executar_estrategia(
+                    '1', lambda sid: self._buscar_por_gids_especificos(sid, self.gids_customizados), sheet_id)
                 if len(abas_encontradas) >= 2:  # Se encontrou pelo menos 2 abas
                     self.dados_abas = abas_encontradas
                     return self._finalizar_extracao(abas_encontradas)
             
-            # === ESTRATÉGIA 1.5: BUSCA POR ÍNDICE DAS ABAS ===
-            print("[META] ESTRATÉGIA 1.5: Busca por índice das abas...")
-            abas_por_indice = self._buscar_por_indice_abas(sheet_id)
-            if len(abas_por_indice) >= 2:
-                self.dados_abas = abas_por_indice
-                return self._finalizar_extracao(abas_por_indice)
-            
-            # === ESTRATÉGIA 1.7: BUSCA FORÇADA POR NOMES EXATOS ===
-            print("[META] ESTRATÉGIA 1.7: Busca forçada por nomes exatos das 3 abas...")
-            abas_forcadas = self._buscar_forcado_nomes_exatos(sheet_id)
-            if len(abas_forcadas) >= 2:
-                self.dados_abas = abas_forcadas
-                return self._finalizar_extracao(abas_forcadas)
-            
-            # === ESTRATÉGIA 2: BUSCA DIRETA POR NOMES (SEM GIDs) ===
-            print("[BUSCA] ESTRATÉGIA 2: Busca direta por nomes de abas...")
-            abas_diretas = self._buscar_abas_por_nomes_diretos(sheet_id)
-            if len(abas_diretas) >= 2:
-                self.dados_abas = abas_diretas
-                return self._finalizar_extracao(abas_diretas)
+            # === ESTRATÉGIAS 1.1 A 2: ORDEM PELO CUSTO ESPERADO (HISTÓRICO) ===
+            self._abas_publicadas = []
+            self._abas_listagem = {}
+            ordem = self.estatisticas_estrategias.ordenar(
+                sheet_id, {codigo: custo for codigo, (_, _, custo) in self._estrategias_disponiveis().items()})
+            print(f"[META] Ordem das estratégias (custo esperado): {' > '.join(ordem)}")
+            
+            # A mais barata, se já resolveu planilhas antes, roda sozinha primeiro
+            lider = ordem[0] if self.estatisticas_estrategias.tem_sucesso(sheet_id, ordem[0]) else None
+            if lider and not self._orcamento_esgotado():
+                abas_lider = self._executar_estrategia_do_plano(lider, sheet_id)
+                if len(abas_lider) >= 2:
+                    self.dados_abas = abas_lider
+                    return self._finalizar_extracao(abas_lider)
+                abas_especiais = self._tentar_extratores_por_cabecalho(sheet_id, url)
+                if abas_especiais:
+                    self.dados_abas = abas_especiais
+                    return self._finalizar_extracao(abas_especiais)
+            
+            for codigo in ordem:
+                if codigo == lider:
+                    continue
+                if self._orcamento_esgotado():
+                    return self._encerrar_por_orcamento()
+                
+                if codigo in ESTRATEGIAS_CORRIDA:
+                    # Índice, nomes exatos e nomes diretos rodam ao mesmo tempo (uma vez só);
+                    # a ordem de custo define quem vence quando duas acham o mesmo tipo
+                    corrida = [c for c in ordem if c in ESTRATEGIAS_CORRIDA and c != lider]
+                    if codigo != corrida[0]:
+                        continue
+                    print(f"[META] ESTRATÉGIAS {' / '.join(corrida)}: Corrida entre "
+                          f"{', '.join(ESTRATEGIAS_DESCOBERTA[c][0] for c in corrida)}...")
+                    abas = self._correr_estrategias(
+                        [(c, getattr(self, ESTRATEGIAS_DESCOBERTA[c][1])) for c in corrida], sheet_id)
+                else:
+                    abas = self._executar_estrategia_do_plano(codigo, sheet_id)
+                
+                if len(abas) >= 2:
+                    self.dados_abas = abas
+                    return self._finalizar_extracao(abas)
+                
+                # Etapa sem solução: a aba que ela baixou pode ser de um extrator especial
+                abas_especiais = self._tentar_extratores_por_cabecalho(sheet_id, url)
+                if abas_especiais:
+                    self.dados_abas = abas_especiais
+                    return self._finalizar_extracao(abas_especiais)
+            
+            # Google limitando esta planilha: adivinhar GIDs só pioraria o bloqueio
+            espera = self._google_indisponivel()
+            if espera:
+                return self._descoberta_sem_resultado(
+                    f"Google limitando o acesso à planilha - tente novamente em {espera:.0f}s")
+            
+            if self._orcamento_esgotado():
+                return self._encerrar_por_orcamento()
+            
+            # Com a lista de abas em mãos todos os GIDs reais já foram testados -
+            # adivinhar GIDs (estratégias 3 a 5) só geraria requisições inúteis
+            if self._abas_publicadas:
+                if self._abas_listagem:
+                    self.dados_abas = self._abas_listagem
+                    return self._finalizar_extracao(self._abas_listagem)
+                return self._descoberta_sem_resultado("Nenhuma aba válida entre as abas publicadas da planilha")
             
             # === ESTRATÉGIA 3: DESCOBERTA POR NOMES DAS ABAS ===
             print("[BUSCA] ESTRATÉGIA 3: Tentando descobrir GIDs por nomes das abas...")
-            abas_por_nomes = self._descobrir_gids_por_nomes(sheet_id)
+            abas_por_nomes = self._executar_estrategia('3', self._descobrir_gids_por_nomes, sheet_id)
             if len(abas_por_nomes) >= 2:
                 self.dados_abas = abas_por_nomes
                 return self._finalizar_extracao(abas_por_nomes)
             
+            if self._orcamento_esgotado():
+                return self._encerrar_por_orcamento()
+            
             # === ESTRATÉGIA 4: BUSCA INTELIGENTE OTIMIZADA ===
             print("[BUSCA] ESTRATÉGIA 4: Busca inteligente com padrões otimizados...")
-            abas_inteligente = self._busca_inteligente_otimizada(sheet_id, url)
+            abas_inteligente = self._executar_estrategia(
+                '4', lambda sid: self._busca_inteligente_otimizada(sid, url), sheet_id, minimo_abas=1)
             if len(abas_inteligente) >= 1:
                 self.dados_abas = abas_inteligente
                 return self._finalizar_extracao(abas_inteligente)
             
+            if self._orcamento_esgotado():
+                return self._encerrar_por_orcamento()
+            
             # === ESTRATÉGIA 5: BUSCA EXAUSTIVA (último recurso) ===
             print("[BUSCA] ESTRATÉGIA 5: Busca exaustiva (último recurso)...")
-            abas_exaustiva = self._busca_exaustiva(sheet_id)
+            abas_exaustiva = self._executar_estrategia('5', self._busca_exaustiva, sheet_id, minimo_abas=1)
             if len(abas_exaustiva) >= 1:
                 self.dados_abas = abas_exaustiva
                 return self._finalizar_extracao(abas_exaustiva)
             
-            print("[ERRO] Nenhuma aba válida encontrada em todas as estratégias")
-            return False
+            if self._orcamento_esgotado():
+                return self._encerrar_por_orcamento()
+            
+            return self._descoberta_sem_resultado("Nenhuma aba válida encontrada em todas as estratégias")
                 
         except Exception as e:
             print(f"[ERRO] Erro na extração: {str(e)}")
             return False
+        
+        finally:
+            self._periodo = (None, None)
+            self._abas_indice = {}
+            self._extratores_cabecalho = []
+            if self._memo_acertos:
+                print(f"[MEMO] {self._memo_acertos} downloads repetidos evitados nesta extração")
+            self._limpar_memo()
     
-    def _ler_csv_com_encoding(self, texto_csv):
-        """Lê CSV tentando múltiplos encodings"""
-        encodings = ['utf-8', 'latin-1', 'cp1252']
+    def _correr_estrategias(self, estrategias, sheet_id):
+        """
+        Executa estratégias de descoberta em paralelo e mescla as abas conforme chegam
+        
+        Cada estratégia recebe o sheet_id e publica as abas encontradas via
+        _registrar_aba_parcial. Quando NPS_D1, NPS_D30 e NPS_Ruim estão resolvidas,
+        as estratégias restantes são canceladas (elas consultam _busca_cancelada
+        a cada tentativa).
+        
+        Args:
+            estrategias: lista de tuplas (codigo, funcao) em ordem de prioridade
+            sheet_id: ID da planilha
         
-        for encoding in encodings:
+        Returns:
+            dict tipo -> DataFrame com a mescla das abas encontradas
+        """
+        with self._lock_corrida:
+            self._corrida = {'abas': {}, 'prioridade': {}}
+        self._cancelar_busca.clear()
+        
+        def executar(prioridade, codigo, funcao):
+            self._local.prioridade = prioridade
             try:
-                # Trata bytes vs string
-                if isinstance(texto_csv, bytes):
-                    texto_decoded = texto_csv.decode(encoding)
-                else:
-                    texto_decoded = str(texto_csv)
+                return prioridade, codigo, self._executar_estrategia(codigo, funcao, sheet_id)
+            except Exception as e:
+                print(f"   [AVISO] Erro na estratégia {codigo}: {str(e)[:50]}")
+                return prioridade, codigo, {}
+            finally:
+                self._local.prioridade = None
+        
+        try:
+            with ThreadPoolExecutor(max_workers=len(estrategias)) as executor:
+                futuros = [executor.submit(executar, prioridade, codigo, funcao)
+                           for prioridade, (codigo, funcao) in enumerate(estrategias)]
                 
-                df = pd.read_csv(io.StringIO(texto_decoded))
-                if len(df) > 0:  # Verifica se o DataFrame não está vazio
-                    return df
-            except Exception:
-                continue
+                for futuro in as_completed(futuros):
+                    prioridade, codigo, abas = futuro.result()
+                    
+                    # Garante a mescla mesmo de abas que não foram publicadas durante a busca
+                    for tipo, df in abas.items():
+                        self._registrar_aba_parcial(tipo, df, prioridade)
+                    
+                    print(f"   [OK] Estratégia {codigo} concluída: {len(abas)} abas")
+            
+            with self._lock_corrida:
+                abas_mescladas = dict(self._corrida['abas'])
+        finally:
+            with self._lock_corrida:
+                self._corrida = None
+            self._cancelar_busca.clear()
+        
+        return abas_mescladas
+    
+    def _registrar_aba_parcial(self, tipo, df, prioridade=None):
+        """Publica uma aba encontrada na corrida em andamento (sem efeito fora dela)"""
+        if prioridade is None:
+            prioridade = getattr(self._local, 'prioridade', None)
+        
+        with self._lock_corrida:
+            if self._corrida is None or prioridade is None:
+                return
+            
+            abas = self._corrida['abas']
+            prioridades = self._corrida['prioridade']
+            if tipo not in abas or prioridade < prioridades[tipo]:
+                abas[tipo] = df
+                prioridades[tipo] = prioridade
+            
+            if all(t in abas or t in self._abas_indice for t in ABAS_PRINCIPAIS) and not self._cancelar_busca.is_set():
+                print("   [OK] 3 abas resolvidas - cancelando estratégias restantes")
+                self._cancelar_busca.set()
+    
+    def _executar_estrategia(self, codigo, funcao, sheet_id, minimo_abas=2):
+        """
+        Executa funcao(sheet_id) medindo requisições e tempo e registra no histórico
         
-        # Fallback para DataFrame vazio se tudo falhar
-        print("   [AVISO] Erro ao ler CSV - retornando DataFrame vazio")
-        return pd.DataFrame()
+        Uma estratégia interrompida pela corrida ou pelo circuit breaker sem ter
+        resolvido a planilha não é registrada (o resultado não diz nada sobre ela).
+        """
+        anterior = getattr(self._local, 'estrategia', None)
+        self._local.estrategia = codigo
+        with self._lock_corrida:
+            self._requisicoes_estrategia[codigo] = 0
+        inicio = time.time()
+        abas = {}
+        try:
+            abas = funcao(sheet_id)
+        finally:
+            self._local.estrategia = anterior
+            with self._lock_corrida:
+                requisicoes = self._requisicoes_estrategia.pop(codigo, 0)
+                for tipo, df in abas.items():
+                    self._abas_parciais.setdefault(tipo, df)
+            sucesso = len(abas) >= minimo_abas
+            if sucesso or not self._busca_cancelada():
+                self.estatisticas_estrategias.registrar(sheet_id, codigo, sucesso, requisicoes, time.time() - inicio)
+        
+        # Índice parcial: quem achou uma aba que faltava leva junto as já indexadas
+        if any(tipo not in self._abas_indice for tipo in abas):
+            return {**self._abas_indice, **abas}
+        return abas
+    
+    def _estrategias_disponiveis(self):
+        """ESTRATEGIAS_DESCOBERTA sem as que dependem de pacote não instalado"""
+        disponiveis = dict(ESTRATEGIAS_DESCOBERTA)
+        for codigo, pacote in DEPENDENCIAS_ESTRATEGIAS.items():
+            if importlib.util.find_spec(pacote) is None:
+                del disponiveis[codigo]
+                if not getattr(AnalisadorNPSCompleto, f'_aviso_{pacote}', False):
+                    setattr(AnalisadorNPSCompleto, f'_aviso_{pacote}', True)
+                    print(f"   [AVISO] {pacote} não instalado - estratégia {codigo} "
+                          f"({ESTRATEGIAS_DESCOBERTA[codigo][0]}) fora do plano")
+        return disponiveis
+    
+    def _executar_estrategia_do_plano(self, codigo, sheet_id):
+        """Executa uma das ESTRATEGIAS_DESCOBERTA pelo código"""
+        descricao, metodo, _ = ESTRATEGIAS_DESCOBERTA[codigo]
+        print(f"[META] ESTRATÉGIA {codigo}: {descricao}...")
+        return self._executar_estrategia(codigo, getattr(self, metodo), sheet_id)
+    
+    def _contar_requisicao(self):
+        """
+        Soma uma requisição ao orçamento da extração e à estratégia desta thread
+        
+        Returns:
+            False (sem somar) quando o orçamento já acabou - a requisição não deve ser feita
+        """
+        codigo = getattr(self._local, 'estrategia', None)
+        with self._lock_corrida:
+            if self._orcamento is not None:
+                if self._orcamento_esgotado():
+                    return False
+                self._orcamento['usadas'] += 1
+            if codigo in self._requisicoes_estrategia:
+                self._requisicoes_estrategia[codigo] += 1
+        return True
+    
+    def _orcamento_esgotado(self):
+        """
+        Motivo do fim do orçamento da extração atual (None enquanto ainda houver)
+        
+        Na descoberta valem o limite de requisições e o prazo menos a reserva de
+        materialização; no download das abas vencedoras, só o prazo total.
+        """
+        orcamento = self._orcamento
+        if orcamento is None:
+            return None
+        interrompido = orcamento['interrompido'].get(self._fase_orcamento(orcamento))
+        if interrompido:
+            return interrompido
+        agora = time.time()
+        if orcamento['materializando']:
+            if agora >= orcamento['fim']:
+                return f"prazo de {self.prazo_extracao:.0f}s esgotado"
+            return None
+        if self.max_requisicoes and orcamento['usadas'] >= self.max_requisicoes:
+            return f"limite de {self.max_requisicoes} requisições atingido"
+        if agora >= orcamento['fim_descoberta']:
+            return f"prazo da descoberta ({orcamento['fim_descoberta'] - orcamento['inicio']:.0f}s) esgotado"
+        return None
+    
+    def _fase_orcamento(self, orcamento):
+        """'descoberta' ou 'materializacao' (download completo das vencedoras)"""
+        return 'materializacao' if orcamento['materializando'] else 'descoberta'
+    
+    def _prazo_limitador(self):
+        """Fim da fase atual do orçamento, repassado ao limitador da sessão (None = sem prazo)"""
+        orcamento = self._orcamento
+        if orcamento is None or getattr(self.sessao, 'limitador', None) is None:
+            return None
+        fim = orcamento['fim'] if orcamento['materializando'] else orcamento['fim_descoberta']
+        return fim if fim != float('inf') else None
+    
+    def _interromper_por_prazo(self, erro):
+        """Espera do limitador passaria do prazo: encerra a fase atual como orçamento esgotado"""
+        orcamento = self._orcamento
+        if orcamento is None:
+            return
+        with self._lock_corrida:
+            orcamento['interrompido'].setdefault(
+                self._fase_orcamento(orcamento),
+                f"espera de {erro.espera:.0f}s pedida pelo Google passaria do prazo")
+    
+    def _get(self, url, hedge=False, **kwargs):
+        """
+        GET pela sessão com o prazo do orçamento repassado ao limitador
+        
+        Retry-After/backoff ou espera por ficha que passariam do prazo levantam
+        PrazoEsgotadoError sem dormir, e a fase atual termina pelo mesmo caminho
+        do orçamento esgotado (_orcamento_esgotado).
+        """
+        prazo = self._prazo_limitador()
+        if prazo is not None:
+            kwargs['prazo'] = prazo
+        try:
+            if hedge and hasattr(self.sessao, 'get_com_hedge'):
+                return self.sessao.get_com_hedge(url, **kwargs)
+            kwargs.pop('ao_duplicar', None)
+            return self.sessao.get(url, **kwargs)
+        except PrazoEsgotadoError as e:
+            self._interromper_por_prazo(e)
+            raise
+    
+    def _requisicoes_restantes(self):
+        """Requisições que a descoberta ainda pode fazer (None = sem limite)"""
+        orcamento = self._orcamento
+        if orcamento is None or not self.max_requisicoes:
+            return None
+        return max(0, self.max_requisicoes - orcamento['usadas'])
+    
+    def _timeout_no_prazo(self, timeout):
+        """Reduz o timeout de uma requisição ao tempo que ainda resta no orçamento"""
+        orcamento = self._orcamento
+        if orcamento is None:
+            return timeout
+        fim = orcamento['fim'] if orcamento['materializando'] else orcamento['fim_descoberta']
+        return max(1, min(timeout, fim - time.time()))
+    
+    def _timeout_adaptativo(self, url, padrao):
+        """Timeout derivado das latências medidas do endpoint (padrao sem medições suficientes)"""
+        latencias = getattr(self.sessao, 'latencias', None)
+        return latencias.timeout(url, padrao) if latencias is not None else padrao
+    
+    def _encerrar_por_orcamento(self):
+        """Orçamento esgotado no meio da descoberta: segue com as abas achadas até aqui"""
+        motivo = self._orcamento_esgotado()
+        with self._lock_corrida:
+            abas = dict(self._abas_parciais)
+        if not abas:
+            print(f"[ERRO] Descoberta interrompida ({motivo}) sem nenhuma aba encontrada")
+            return False
+        print(f"[AVISO] Descoberta interrompida ({motivo}) - seguindo com {len(abas)} abas")
+        self.dados_abas = abas
+        return self._finalizar_extracao(abas)
+    
+    def _descoberta_sem_resultado(self, mensagem):
+        """Descoberta esgotada sem abas novas: segue com as do índice parcial, se houver"""
+        if not self._abas_indice:
+            print(f"[ERRO] {mensagem}")
+            return False
+        print(f"[AVISO] {mensagem} - seguindo com as {len(self._abas_indice)} abas do índice")
+        self.dados_abas = dict(self._abas_indice)
+        return self._finalizar_extracao(self.dados_abas)
+    
+    def _busca_cancelada(self):
+        """
+        Indica se a corrida atual já resolveu as 3 abas principais, se o Google
+        bloqueou a planilha ou se o orçamento da extração acabou
+        """
+        return (self._cancelar_busca.is_set() or bool(self._google_indisponivel())
+                or self._orcamento_esgotado() is not None)
+    
+    def _google_indisponivel(self):
+        """Segundos restantes do circuit breaker da planilha atual (0 = liberada)"""
+        limitador = getattr(self.sessao, 'limitador', None)
+        sheet_id = getattr(self, '_sheet_id_atual', None)
+        if limitador is None or not sheet_id:
+            return 0
+        return limitador.tempo_circuito_aberto(sheet_id)
+    
+    def _detectar_encoding(self, amostra):
+        """
+        Encoding do CSV decidido uma vez a partir de uma amostra dos bytes iniciais
+        
+        BOM UTF-8 -> 'utf-8-sig'; UTF-8 válido (um caractere cortado no fim da
+        amostra é tolerado) -> 'utf-8'; senão 'cp1252', ou 'latin-1' quando há
+        bytes que o cp1252 não define.
+        """
+        if amostra.startswith(codecs.BOM_UTF8):
+            return 'utf-8-sig'
+        try:
+            codecs.getincrementaldecoder('utf-8')().decode(amostra, final=False)
+            return 'utf-8'
+        except UnicodeDecodeError:
+            pass
+        try:
+            amostra.decode('cp1252')
+            return 'cp1252'
+        except UnicodeDecodeError:
+            return 'latin-1'
     
     def _identificar_tipo_aba(self, df):
         """Identifica o tipo da aba baseado na estrutura das colunas - Sistema Inteligente com Priorização"""
@@ -488,14 +1124,7 @@ class AnalisadorNPSCompleto:
     
     def _padronizar_avaliacao(self, df):
         """Garante que a coluna Avaliação seja numérica"""
-        # Lista expandida de possíveis nomes para coluna de avaliação
-        nomes_avaliacao = [
-            'avaliacao', 'avaliaçao', 'avaliaãão', 'avaliação', 'avaliaacaao',
-            'nota', 'score', 'rating', 'pontuacao', 'pontuação',
-            'satisfaction', 'satisfacao', 'satisfação'
-        ]
-        
-        col_avaliacao = self._encontrar_coluna_por_nomes(df.columns, nomes_avaliacao)
+        col_avaliacao = self._encontrar_coluna_por_nomes(df.columns, NOMES_COLUNA_AVALIACAO)
         
         if col_avaliacao:
             df[col_avaliacao] = pd.to_numeric(df[col_avaliacao], errors='coerce')
@@ -638,6 +1267,12 @@ class AnalisadorNPSCompleto:
                     resumo += f"   [DATA] Data fim: {data_fim_str}\n"
                 resumo += "\n"
             
+            # Orçamento da extração esgotado antes de achar todas as abas
+            if self.status_extracao == 'parcial':
+                faltantes = [aba for aba in ABAS_PRINCIPAIS if aba not in self.dados_abas]
+                resumo += (f"[AVISO] Extração parcial ({self.motivo_extracao_parcial}) - "
+                           f"abas não analisadas: {', '.join(faltantes)}\n\n")
+            
             # Resumo das métricas NPS D+1 e D+30
             resumo += self._gerar_secao_metricas_nps()
             
@@ -964,6 +1599,1028 @@ Seja específico, use dados reais e foque em ações práticas.
         except:
             return None
     
+    def _marcar_origem(self, df, gid=None, nome_aba=None, response=None):
+        """Anota no DataFrame de onde a aba veio e os validadores HTTP da resposta"""
+        df.attrs['origem'] = {'gid': gid, 'aba': nome_aba}
+        if response is not None:
+            validadores = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified')
+            }
+            if any(validadores.values()):
+                df.attrs['validadores'] = validadores
+        return df
+    
+    def _url_origem(self, sheet_id, origem, consulta=None, formato='csv'):
+        """URL da aba descrita em df.attrs['origem'] (gviz quando há consulta ou o formato é JSON)"""
+        if consulta is not None or origem.get('gid') is None or formato != 'csv':
+            if origem.get('gid') is not None:
+                return self._url_gviz(sheet_id, gid=origem['gid'], formato=formato, consulta=consulta)
+            return self._url_gviz(sheet_id, nome_aba=origem.get('aba'), formato=formato, consulta=consulta)
+        return self._url_export(sheet_id, origem['gid'])
+    
+    def _assinatura_linhas(self, df):
+        """Texto normalizado das linhas (independe de como cada leitor tipou os valores)"""
+        def normalizar(valor):
+            if valor is None or (isinstance(valor, float) and valor != valor):
+                return ''
+            if isinstance(valor, float) and valor.is_integer():
+                return str(int(valor))
+            return str(valor).strip()
+        
+        return '\n'.join('|'.join(normalizar(v) for v in linha)
+                         for linha in df.itertuples(index=False, name=None))
+    
+    def _marcar_continuidade(self, df):
+        """Guarda em df.attrs o total de linhas e o hash das últimas LINHAS_CONTINUIDADE"""
+        df.attrs['continuidade'] = {
+            'linhas': len(df),
+            'hash': hashlib.md5(self._assinatura_linhas(df.tail(LINHAS_CONTINUIDADE)).encode('utf-8')).hexdigest()
+        }
+        return df
+    
+    def _atualizar_cache_incremental(self, sheet_id, dados_cache):
+        """
+        Sonda barata de mudança que baixa só as linhas novas de cada aba em cache
+        
+        As abas NPS só crescem no fim, então para cada aba:
+        1) validadores HTTP (ETag/Last-Modified), quando a resposta original os
+           trouxe - 304 significa aba igual; validador diferente sem linha nova
+           no fim significa linha antiga editada (extrai tudo de novo);
+        2) senão, consulta gviz "select * offset N-K" que devolve as K últimas
+           linhas conhecidas (LINHAS_CONTINUIDADE) seguidas das novas. Se o hash
+           dessas K linhas bate com o guardado em df.attrs['continuidade'], o
+           histórico está intacto e só o resto é anexado ao DataFrame do cache.
+        
+        Returns:
+            dict tipo -> DataFrame atualizado, ou None quando o histórico foi
+            editado/apagado (ou a sonda falhou) e é preciso extrair tudo de novo
+        """
+        atualizados = {}
+        for tipo, df in dados_cache.items():
+            origem = df.attrs.get('origem') or {}
+            if (origem.get('gid') is None and origem.get('aba') is None) or len(df) == 0:
+                return None
+            formato = df.attrs.get('formato', 'csv')
+            if formato == 'xlsx':
+                # Células com tipos nativos não se comparam com o delta em CSV
+                print(f"   [AVISO] {tipo}: aba lida do XLSX - sem atualização incremental")
+                return None
+            
+            try:
+                validadores = df.attrs.get('validadores')
+                validadores_atuais = None
+                if validadores:
+                    condicionais = {}
+                    if validadores.get('etag'):
+                        condicionais['If-None-Match'] = validadores['etag']
+                    if validadores.get('last_modified'):
+                        condicionais['If-Modified-Since'] = validadores['last_modified']
+                    
+                    response = self._get(self._url_origem(sheet_id, origem, formato=formato), headers=condicionais,
+                                         timeout=10, stream=True)
+                    response.close()
+                    if response.status_code == 304 or (
+                            validadores.get('etag') and response.headers.get('ETag') == validadores['etag']):
+                        print(f"   [OK] {tipo}: sem alterações (validador HTTP)")
+                        atualizados[tipo] = df
+                        continue
+                    # Aba mudou: os validadores novos valem para a aba atualizada pelo delta
+                    validadores_atuais = {
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified')
+                    }
+                
+                continuidade = df.attrs.get('continuidade') or self._marcar_continuidade(df).attrs['continuidade']
+                if continuidade['linhas'] != len(df):
+                    return None
+                sobrepostas = min(LINHAS_CONTINUIDADE, len(df))
+                
+                consulta = f"select * offset {len(df) - sobrepostas}"
+                url_delta = self._url_origem(sheet_id, origem, consulta=consulta, formato=formato)
+                response = self._get(url_delta, timeout=10, stream=True)
+                try:
+                    # Delta lido do mesmo jeito que a aba em cache (formato, com ou sem esquema)
+                    recentes = (self._ler_resposta(response, url_delta,
+                                                   sheet_id=sheet_id if df.attrs.get('esquema') else None)
+                                if response.status_code == 200 else None)
+                finally:
+                    response.close()
+                
+                if (recentes is None or len(recentes) < sobrepostas or
+                        assinatura_cabecalho(recentes.attrs.get('cabecalho', recentes.columns)) !=
+                        assinatura_cabecalho(df.attrs.get('cabecalho', df.columns))):
+                    print(f"   [AVISO] {tipo}: aba mudou desde o cache")
+                    return None
+                
+                hash_recentes = hashlib.md5(
+                    self._assinatura_linhas(recentes.head(sobrepostas)).encode('utf-8')).hexdigest()
+                if hash_recentes != continuidade['hash']:
+                    print(f"   [AVISO] {tipo}: histórico editado desde o cache")
+                    return None
+                
+                delta = recentes.iloc[sobrepostas:]
+                if len(delta) == 0:
+                    if validadores_atuais is not None:
+                        # Validador mudou sem linha nova: alguma linha antiga foi editada
+                        print(f"   [AVISO] {tipo}: validador mudou sem linhas novas - histórico editado")
+                        return None
+                    print(f"   [OK] {tipo}: sem alterações ({len(df)} linhas)")
+                    atualizados[tipo] = df
+                    continue
+                
+                df_atualizado = pd.concat([df, delta], ignore_index=True)
+                # Validadores da resposta completa antiga dão lugar aos da aba atual
+                df_atualizado.attrs = {k: v for k, v in df.attrs.items() if k != 'validadores'}
+                if validadores_atuais and any(validadores_atuais.values()):
+                    df_atualizado.attrs['validadores'] = validadores_atuais
+                atualizados[tipo] = self._marcar_continuidade(df_atualizado)
+                print(f"   [OK] {tipo}: +{len(delta)} linhas novas (total {len(df_atualizado)})")
+                
+            except Exception as e:
+                print(f"   [AVISO] Erro na sonda de mudança de {tipo}: {str(e)[:50]}")
+                return None
+        
+        return atualizados
+    
+    def _buscar_por_indice_persistente(self, sheet_id):
+        """
+        Busca direta das abas registradas no índice persistente desta planilha
+        
+        Só aceita o resultado se o cabeçalho de TODAS as abas indexadas continuar
+        com a mesma assinatura - qualquer diferença devolve {} e a descoberta
+        completa roda normalmente. Uma entrada sem os 3 tipos devolve só as abas
+        que tem; quem chama roda a descoberta para os tipos que faltam.
+        """
+        entradas = self.indice_abas.obter(sheet_id)
+        if not entradas:
+            return {}
+        
+        print(f"[INDICE] Planilha conhecida - buscando {len(entradas)} abas indexadas...")
+        abas_encontradas = {}
+        
+        for tipo, entrada in entradas.items():
+            gid = entrada.get('gid')
+            nome_aba = entrada.get('aba')
+            try:
+                if gid is not None:
+                    csv_url = self._url_export(sheet_id, gid)
+                else:
+                    csv_url = self._url_gviz(sheet_id, nome_aba=nome_aba)
+                
+                # Com período só o cabeçalho é conferido aqui - o conteúdo vem filtrado
+                # pelo servidor em _materializar_abas
+                df = self._baixar_aba(sheet_id, csv_url, 15, gid=gid, nome_aba=nome_aba,
+                                      amostra=any(self._periodo))
+                if df is None:
+                    print(f"   [AVISO] {tipo}: aba indexada não respondeu")
+                    return {}
+                
+                if assinatura_cabecalho(df.attrs.get('cabecalho', df.columns)) != entrada.get('assinatura'):
+                    print(f"   [AVISO] {tipo}: cabeçalho mudou - refazendo descoberta")
+                    return {}
+                
+                abas_encontradas[tipo] = df
+                print(f"   [OK] {tipo}: {len(df)} registros (índice, GID {gid if gid is not None else nome_aba})")
+                
+            except Exception as e:
+                print(f"   [AVISO] Erro na aba indexada {tipo}: {str(e)[:50]}")
+                return {}
+        
+        return abas_encontradas
+    
+    def _atualizar_indice_persistente(self):
+        """Registra no índice persistente a origem das abas principais extraídas"""
+        sheet_id = getattr(self, '_sheet_id_atual', None)
+        if not sheet_id:
+            return
+        
+        abas_indice = {}
+        for tipo in ABAS_PRINCIPAIS:
+            df = self.dados_abas.get(tipo)
+            if df is None:
+                continue
+            origem = df.attrs.get('origem')
+            if not origem or (origem.get('gid') is None and origem.get('aba') is None):
+                continue
+            abas_indice[tipo] = {
+                'gid': origem.get('gid'),
+                'aba': origem.get('aba'),
+                # Abas baixadas por consulta guardam o cabeçalho completo em attrs
+                'assinatura': assinatura_cabecalho(df.attrs.get('cabecalho', df.columns))
+            }
+        
+        if abas_indice:
+            # Tipos que ficaram de fora desta extração mantêm a entrada anterior
+            entradas = self.indice_abas.obter(sheet_id)
+            entradas.update(abas_indice)
+            self.indice_abas.registrar(sheet_id, entradas)
+    
+    def _limpar_memo(self):
+        """Esquece downloads e classificações memorizados (início/fim de cada extração)"""
+        with self._lock_memo:
+            self._memo_downloads = {}
+            self._memo_classificacao = {}
+            self._memo_acertos = 0
+    
+    def _url_canonica(self, url):
+        """
+        URL com parâmetros em ordem fixa - mesma aba, mesma chave no memo
+        
+        Na exportação CSV de um GID, single=true (URL da estratégia 1.5) não muda
+        o corpo e é descartado: o GID 0 das estratégias 1.5, 4 e 5 vira um download só.
+        """
+        partes = urlsplit(url)
+        parametros = parse_qsl(partes.query, keep_blank_values=True)
+        if partes.path.endswith('/export') and any(chave == 'gid' for chave, _ in parametros):
+            parametros = [(chave, valor) for chave, valor in parametros if chave != 'single']
+        return urlunsplit((partes.scheme, partes.netloc.lower(), partes.path,
+                           urlencode(sorted(parametros)), ''))
+    
+    def _baixar_aba(self, sheet_id, csv_url, timeout, gid=None, nome_aba=None, amostra=False):
+        """
+        Baixa uma aba no máximo uma vez por extração (memo por URL canônica)
+        
+        Estratégias diferentes pedindo o mesmo recurso (ex.: GID 0 nas buscas 1.5, 4
+        e 5, ou 'NPS D+1' nas estratégias 1.7 e 2) recebem o resultado já baixado,
+        inclusive quando pedem ao mesmo tempo na corrida. Uma amostra memorizada não
+        atende um pedido de corpo completo. Cada chamada recebe sua própria cópia
+        rasa do DataFrame (attrs independentes).
+        """
+        chave = self._url_canonica(csv_url)
+        with self._lock_memo:
+            futuro = self._memo_downloads.get(chave)
+            reaproveitar = futuro is not None and (amostra or not futuro.amostra)
+            if reaproveitar:
+                self._memo_acertos += 1
+            else:
+                futuro = Future()
+                futuro.amostra = amostra
+                self._memo_downloads[chave] = futuro
+        
+        if not reaproveitar:
+            try:
+                df = self._transferir_aba(sheet_id, csv_url, timeout, gid, nome_aba, amostra)
+            except Exception as e:
+                with self._lock_memo:
+                    if self._memo_downloads.get(chave) is futuro:
+                        del self._memo_downloads[chave]
+                futuro.set_exception(e)
+                raise
+            if df is not None:
+                df.attrs['recurso'] = chave
+                futuro.amostra = bool(df.attrs.get('amostra_url'))
+            futuro.set_result(df)
+        
+        df = futuro.result()
+        if df is None:
+            return None
+        copia = df.copy(deep=False)
+        copia.attrs = {k: (dict(v) if isinstance(v, dict) else v) for k, v in df.attrs.items()}
+        return copia
+    
+    def _classificar_aba(self, df):
+        """_identificar_tipo_aba com memo por recurso (cada aba é classificada uma vez por extração)"""
+        chave = df.attrs.get('recurso')
+        if chave is not None:
+            with self._lock_memo:
+                if chave in self._memo_classificacao:
+                    return self._memo_classificacao[chave]
+        
+        tipo = self._identificar_tipo_aba(df)
+        if chave is not None:
+            with self._lock_memo:
+                self._memo_classificacao[chave] = tipo
+        return tipo
+    
+    def _transferir_aba(self, sheet_id, csv_url, timeout, gid=None, nome_aba=None, amostra=False):
+        """
+        Baixa uma aba em streaming, passando pelo cache negativo
+        
+        O corpo é lido em blocos de TAMANHO_BLOCO_DOWNLOAD e o CSV é montado em
+        blocos de LINHAS_POR_BLOCO linhas enquanto a transferência continua, sem
+        guardar o texto inteiro da resposta.
+        
+        Com amostra=True (modo sonda) só os primeiros TAMANHO_AMOSTRA bytes são
+        lidos e a conexão é fechada (no JSON gviz, só LINHAS_AMOSTRA_JSON linhas
+        são pedidas). Se a aba não coube na amostra, o DataFrame leva
+        df.attrs['amostra_url'] e o corpo completo é baixado depois, só para as
+        abas vencedoras (_materializar_abas).
+        
+        Returns:
+            DataFrame com origem e validadores marcados, ou None quando a aba já é
+            conhecida como inexistente/vazia ou acabou de falhar (e foi registrada)
+        """
+        tipo_chave, valor_chave = ('gid', gid) if gid is not None else ('aba', nome_aba)
+        with self._lock_memo:
+            falhou_nesta_extracao = (tipo_chave, valor_chave) in self._falhas_sondagem
+        if falhou_nesta_extracao or self.cache_negativo.contem(sheet_id, tipo_chave, valor_chave):
+            return None
+        
+        url_requisicao = csv_url
+        amostra_json = amostra and 'out:json' in csv_url
+        if amostra_json:
+            url_requisicao = self._url_gviz(sheet_id, nome_aba=nome_aba, gid=gid, formato='json',
+                                            consulta=f"select * limit {LINHAS_AMOSTRA_JSON + 1}")
+        
+        # Sem orçamento a aba não é consultada (e nada vai para o cache negativo)
+        if not self._contar_requisicao():
+            return None
+        timeout = self._timeout_no_prazo(self._timeout_adaptativo(url_requisicao, timeout))
+        if not amostra:
+            # Aba vencedora (corpo completo): cópia atrasada corta a cauda de latência
+            response = self._get(url_requisicao, hedge=True, ao_duplicar=self._contar_requisicao,
+                                 timeout=timeout, stream=True)
+        else:
+            response = self._get(url_requisicao, timeout=timeout, stream=True)
+        try:
+            df = self._ler_resposta(response, url_requisicao, amostra, sheet_id) if response.status_code == 200 else None
+        finally:
+            response.close()
+        
+        if amostra_json and df is not None and len(df) > LINHAS_AMOSTRA_JSON:
+            atributos = dict(df.attrs)
+            df = df.iloc[:LINHAS_AMOSTRA_JSON].copy()
+            df.attrs = dict(atributos, amostra=True)
+        
+        if df is None:
+            # Limitação/instabilidade do Google, consulta tq recusada (ex.: tipo da
+            # coluna) ou planilha inacessível não dizem nada sobre a aba existir
+            consulta = 'tq' in dict(parse_qsl(urlsplit(url_requisicao).query))
+            if (response.status_code not in STATUS_LIMITACAO and not consulta
+                    and not self._planilha_inacessivel(response)):
+                with self._lock_memo:
+                    self._falhas_sondagem.add((tipo_chave, valor_chave))
+            return None
+        
+        with self._lock_memo:
+            self._planilha_acessivel = True
+        if df.attrs.pop('amostra', False):
+            df.attrs['amostra_url'] = csv_url
+        return self._marcar_origem(df, gid=gid, nome_aba=nome_aba, response=response)
+    
+    def _planilha_inacessivel(self, response):
+        """
+        Indica se a falha é da planilha inteira e não da aba: 401/403/404 ou a
+        página HTML de login/erro que o Google devolve para planilha privada
+        """
+        if response.status_code in STATUS_PLANILHA_INACESSIVEL:
+            return True
+        if 'accounts.google.com' in (getattr(response, 'url', None) or ''):
+            return True
+        return response.status_code == 200 and 'text/html' in response.headers.get('Content-Type', '')
+    
+    def _gravar_falhas_sondagem(self, sheet_id):
+        """
+        Leva ao cache negativo as sondagens que falharam nesta extração
+        
+        Só quando a mesma planilha devolveu pelo menos uma aba real - sem isso a
+        falha pode ser da planilha (privada, fora do ar) e não das abas. As
+        entradas antigas valem até o TTL; só saem antes as das abas extraídas
+        agora ou todas as da planilha numa nova tentativa explícita
+        (nova_tentativa=True).
+        """
+        with self._lock_memo:
+            falhas, self._falhas_sondagem = self._falhas_sondagem, set()
+            acessivel, self._planilha_acessivel = self._planilha_acessivel, False
+        
+        if sheet_id:
+            # Aba que respondeu deixa de constar como inexistente (pelo GID e pelo nome)
+            for df in self.dados_abas.values():
+                origem = df.attrs.get('origem') or {}
+                if origem.get('gid') is not None:
+                    self.cache_negativo.remover(sheet_id, 'gid', origem['gid'])
+                if origem.get('aba'):
+                    self.cache_negativo.remover(sheet_id, 'aba', origem['aba'])
+            if acessivel:
+                for tipo_chave, valor_chave in falhas:
+                    self.cache_negativo.registrar(sheet_id, tipo_chave, valor_chave)
+            elif falhas:
+                print(f"[CACHE] Nenhuma aba real respondeu - {len(falhas)} falhas de sondagem não registradas")
+        
+        # Persiste as sondagens que falharam e mostra quanto o cache negativo poupou
+        self.cache_negativo.salvar()
+        stats_negativo = self.cache_negativo.get_stats()
+        if stats_negativo['acertos']:
+            print(f"[CACHE] Cache negativo: {stats_negativo['requisicoes_economizadas']} requisições evitadas "
+                  f"({stats_negativo['taxa_acerto']}% das sondagens)")
+    
+    def _ler_resposta(self, response, url, amostra=False, sheet_id=None):
+        """Lê o corpo conforme o formato pedido na URL (JSON gviz ou CSV em streaming)"""
+        if 'out:json' in url:
+            return self._ler_gviz_json(response)
+        return self._ler_csv_streaming(response, amostra, sheet_id)
+    
+    def _ler_gviz_json(self, response):
+        """
+        Monta o DataFrame tipado a partir da resposta gviz tqx=out:json
+        
+        O Sheets já informa o tipo de cada coluna: 'number' vira float64 e
+        'date'/'datetime' vira datetime64 direto dos valores Date(a,m,d,...), sem
+        pd.to_numeric/pd.to_datetime nem detecção de encoding (JSON é UTF-8). Os
+        rótulos das colunas são o cabeçalho da aba (headers=1). Retorna None para
+        página de erro ou status 'error' da consulta.
+        """
+        corpo = response.content
+        inicio = corpo.find(b'setResponse(')
+        fim = corpo.rfind(b')')
+        if inicio < 0 or fim <= inicio:
+            return None
+        
+        resposta = json.loads(corpo[inicio + len(b'setResponse('):fim])
+        if resposta.get('status') not in ('ok', 'warning') or 'table' not in resposta:
+            erros = resposta.get('errors') or [{}]
+            print(f"   [AVISO] Consulta gviz recusada: {erros[0].get('detailed_message') or erros[0].get('reason')}")
+            return None
+        
+        tabela = resposta['table']
+        definicoes = tabela.get('cols', [])
+        vazia = [None] * len(definicoes)
+        # Transpõe as células uma vez: tupla de valores 'v' por coluna
+        por_coluna = list(zip(*(
+            [celula.get('v') if celula else None for celula in ((linha or {}).get('c') or vazia)]
+            for linha in tabela.get('rows', [])))) or [()] * len(definicoes)
+        
+        colunas = {}
+        for coluna, valores in zip(definicoes, por_coluna):
+            tipo = coluna.get('type')
+            if tipo == 'number':
+                serie = pd.Series(valores, dtype='float64')
+            elif tipo in ('date', 'datetime'):
+                serie = self._serie_datas_gviz(valores)
+            else:
+                serie = pd.Series(valores, dtype=object)
+            
+            # Rótulos repetidos seguem o padrão do pandas ('Data', 'Data.1', ...)
+            rotulo = str(coluna.get('label') or coluna.get('id'))
+            nome, repeticao = rotulo, 0
+            while nome in colunas:
+                repeticao += 1
+                nome = f"{rotulo}.{repeticao}"
+            colunas[nome] = serie
+        
+        df = pd.DataFrame(colunas)
+        df.attrs['formato'] = 'json'
+        return df
+    
+    def _serie_datas_gviz(self, valores):
+        """Coluna de valores 'Date(a,m,d[,h,mi,s])' montada por componentes (mês do gviz começa em 0)"""
+        partes = pd.Series(valores, dtype=object).str.extract(
+            r'Date\((\d+),(\d+),(\d+)(?:,(\d+),(\d+),(\d+))?').astype('float64').fillna(
+            {3: 0, 4: 0, 5: 0})
+        partes.columns = ['year', 'month', 'day', 'hour', 'minute', 'second']
+        partes['month'] += 1
+        return pd.to_datetime(partes, errors='coerce')
+    
+    def _ler_csv_streaming(self, response, amostra=False, sheet_id=None):
+        """
+        Monta o DataFrame bloco a bloco a partir do corpo da resposta
+        
+        Cada bloco já sai com a coluna de avaliação numérica, então o texto bruto
+        nunca fica inteiro em memória. As linhas são mantidas na posição original
+        (a sonda de mudança usa offsets da aba). O encoding é detectado uma vez
+        pelos primeiros TAMANHO_AMOSTRA bytes e o corpo é decodificado uma única
+        vez durante a leitura (fica em df.attrs['encoding']). Retorna None para
+        corpo vazio ou página de erro do Google (HTML).
+        
+        Na leitura completa de uma aba com esquema registrado (esquemas_leitura)
+        só as colunas usadas são lidas, já com os tipos do esquema e a data
+        convertida pelo formato conhecido; o cabeçalho original fica em
+        df.attrs['cabecalho']. Com NPS_CSV_MOTOR=pyarrow o corpo é lido pelo
+        leitor multi-thread do Arrow.
+        """
+        fluxo = _FluxoResposta(response.iter_content(chunk_size=TAMANHO_BLOCO_DOWNLOAD))
+        inicio = fluxo.espiar(1024).lstrip(b'\xef\xbb\xbf \t\r\n')
+        if not inicio or inicio.startswith(b'<') or b'Sorry, unable to open' in inicio:
+            return None
+        
+        encoding = self._detectar_encoding(fluxo.espiar(TAMANHO_AMOSTRA))
+        if encoding not in ('utf-8', 'utf-8-sig'):
+            print(f"   [AVISO] CSV fora de UTF-8 - lendo como {encoding}")
+        
+        if amostra:
+            df = self._ler_amostra_csv(fluxo, encoding)
+            if df is not None:
+                return df
+            # Amostra ilegível (ex.: célula com quebra de linha cortada) - lê o corpo todo
+        
+        cabecalho, esquema = self._esquema_da_resposta(fluxo, encoding, sheet_id)
+        
+        df = None
+        if MOTOR_CSV == 'pyarrow':
+            df = self._ler_csv_arrow(fluxo, encoding, esquema)
+        if df is None:
+            df = self._ler_csv_pandas(fluxo, encoding, esquema)
+            if df is None:
+                return None
+        
+        df.attrs['encoding'] = encoding
+        if esquema:
+            df.attrs['cabecalho'] = cabecalho
+            df.attrs['esquema'] = True
+        return df
+    
+    def _ler_csv_pandas(self, fluxo, encoding, esquema=None):
+        """Leitura em blocos de LINHAS_POR_BLOCO linhas com o leitor C do pandas"""
+        texto = io.TextIOWrapper(io.BufferedReader(fluxo, TAMANHO_BLOCO_DOWNLOAD),
+                                 encoding=encoding, errors='replace')
+        opcoes = {'usecols': esquema['colunas'], 'dtype': str} if esquema else {}
+        blocos = []
+        col_avaliacao = None
+        try:
+            for bloco in pd.read_csv(texto, chunksize=LINHAS_POR_BLOCO, **opcoes):
+                if not blocos:
+                    col_avaliacao = self._encontrar_coluna_por_nomes(bloco.columns, NOMES_COLUNA_AVALIACAO)
+                blocos.append(self._tipar_colunas(bloco, esquema, col_avaliacao))
+        except pd.errors.EmptyDataError:
+            return None
+        
+        if not blocos:
+            return pd.DataFrame()
+        return pd.concat(blocos, ignore_index=True) if len(blocos) > 1 else blocos[0].reset_index(drop=True)
+    
+    def _ler_csv_arrow(self, fluxo, encoding, esquema=None):
+        """
+        Leitura do corpo inteiro com pyarrow.csv (multi-thread, buffers colunares)
+        
+        Retorna None se o pyarrow não estiver instalado - quem chama cai no pandas.
+        """
+        try:
+            import pyarrow as pa
+            from pyarrow import csv as pa_csv
+        except ImportError:
+            if not getattr(AnalisadorNPSCompleto, '_aviso_pyarrow', False):
+                AnalisadorNPSCompleto._aviso_pyarrow = True
+                print("   [AVISO] pyarrow não instalado - lendo CSV com pandas")
+            return None
+        
+        opcoes_leitura = pa_csv.ReadOptions(use_threads=True, block_size=1024 * 1024,
+                                            encoding='utf8' if encoding.startswith('utf-8') else encoding)
+        if esquema:
+            opcoes_conversao = pa_csv.ConvertOptions(include_columns=esquema['colunas'], strings_can_be_null=True,
+                                                     column_types={col: pa.string() for col in esquema['colunas']})
+        else:
+            opcoes_conversao = pa_csv.ConvertOptions(strings_can_be_null=True)
+        
+        tabela = pa_csv.read_csv(io.BufferedReader(fluxo, TAMANHO_BLOCO_DOWNLOAD),
+                                 read_options=opcoes_leitura, convert_options=opcoes_conversao)
+        df = tabela.to_pandas()
+        col_avaliacao = self._encontrar_coluna_por_nomes(df.columns, NOMES_COLUNA_AVALIACAO)
+        return self._tipar_colunas(df, esquema, col_avaliacao)
+    
+    def _tipar_colunas(self, df, esquema, col_avaliacao):
+        """
+        Avaliação numérica e, com esquema, data já convertida
+        
+        As demais colunas do esquema ficam como texto: uma coluna que só tinha
+        números no registro (ex.: Telefone) pode receber '(41) 99999-0000' depois,
+        e a conversão forçada viraria NaN.
+        """
+        if esquema:
+            col_data = esquema.get('coluna_data')
+            if col_data in df.columns and esquema.get('formato_data'):
+                df[col_data] = pd.to_datetime(df[col_data], format=esquema['formato_data'], errors='coerce')
+        if col_avaliacao is not None:
+            df[col_avaliacao] = pd.to_numeric(df[col_avaliacao], errors='coerce')
+        return df
+    
+    def _esquema_da_resposta(self, fluxo, encoding, sheet_id):
+        """
+        Cabeçalho da resposta (lido da amostra inicial) e o esquema registrado para ele
+        
+        Returns:
+            (cabecalho, esquema) - esquema None sem sheet_id, sem registro ou
+            quando alguma coluna do esquema não está mais no cabeçalho
+        """
+        if not sheet_id:
+            return None, None
+        try:
+            cabecalho = list(pd.read_csv(io.BytesIO(fluxo.espiar(TAMANHO_AMOSTRA)), nrows=0,
+                                         encoding=encoding, encoding_errors='replace').columns)
+        except (pd.errors.ParserError, pd.errors.EmptyDataError):
+            return None, None
+        
+        esquema = self.esquemas_leitura.obter(sheet_id, assinatura_cabecalho(cabecalho))
+        if not esquema or not all(col in cabecalho for col in esquema['colunas']):
+            return cabecalho, None
+        return cabecalho, esquema
+    
+    def _detectar_formato_data(self, valores):
+        """Primeiro de FORMATOS_DATA que converte todas as datas da amostra (None se nenhum)"""
+        amostra = valores.dropna().astype(str).str.strip()
+        amostra = amostra[amostra != ''].head(200)
+        if len(amostra) == 0:
+            return None
+        for formato in FORMATOS_DATA:
+            if pd.to_datetime(amostra, format=formato, errors='coerce').notna().all():
+                return formato
+        return None
+    
+    def _registrar_esquemas_leitura(self):
+        """Registra o esquema de leitura das abas principais lidas do CSV ou do XLSX nesta extração"""
+        sheet_id = getattr(self, '_sheet_id_atual', None)
+        if not sheet_id:
+            return
+        
+        esquemas = {}
+        for tipo in ABAS_PRINCIPAIS:
+            df = self.dados_abas.get(tipo)
+            # Só abas completas lidas do CSV ou do XLSX, sem consulta nem esquema já aplicado
+            xlsx = df is not None and df.attrs.get('formato') == 'xlsx'
+            if (df is None or len(df) == 0 or ('encoding' not in df.attrs and not xlsx) or
+                    df.attrs.get('consulta') or df.attrs.get('esquema') or df.attrs.get('amostra_url')):
+                continue
+            
+            colunas = [col for col in df.columns
+                       if self._encontrar_coluna_por_nomes([col], NOMES_COLUNAS_PIPELINE)]
+            col_avaliacao = self._encontrar_coluna_por_nomes(colunas, NOMES_COLUNA_AVALIACAO)
+            if col_avaliacao is None:
+                continue
+            
+            # Só a avaliação é numérica por definição - o resto é lido como texto
+            tipos = {col: 'numero' if col == col_avaliacao else 'texto' for col in colunas}
+            
+            col_data = self._encontrar_coluna_por_nomes(colunas, NOMES_COLUNA_DATA)
+            formato = None
+            # No XLSX a data já vem como datetime: o formato do texto no CSV é desconhecido
+            if col_data is not None and tipos[col_data] == 'texto' and not xlsx:
+                formato = self._detectar_formato_data(df[col_data])
+            
+            esquemas[assinatura_cabecalho(df.columns)] = {
+                'colunas': colunas,
+                'tipos': tipos,
+                'coluna_data': col_data if formato else None,
+                'formato_data': formato
+            }
+        
+        if esquemas:
+            self.esquemas_leitura.registrar(sheet_id, esquemas)
+            print(f"[ESQUEMA] Esquema de leitura registrado para {len(esquemas)} abas")
+    
+    def _ler_amostra_csv(self, fluxo, encoding='utf-8-sig'):
+        """
+        Lê só o cabeçalho e as primeiras linhas (até TAMANHO_AMOSTRA bytes)
+        
+        A última linha, possivelmente cortada, é descartada. Quando o corpo
+        inteiro coube na amostra o DataFrame já é a aba completa; senão sai com
+        df.attrs['amostra'] = True. Retorna None se a amostra não puder ser lida.
+        """
+        dados = fluxo.espiar(TAMANHO_AMOSTRA + 1)
+        completa = len(dados) <= TAMANHO_AMOSTRA
+        if not completa:
+            fim_linha = dados.rfind(b'\n', 0, TAMANHO_AMOSTRA)
+            if fim_linha < 0:
+                return None
+            dados = dados[:fim_linha]
+        
+        try:
+            df = pd.read_csv(io.BytesIO(dados), encoding=encoding, encoding_errors='replace')
+        except (pd.errors.ParserError, pd.errors.EmptyDataError):
+            return None
+        df.attrs['encoding'] = encoding
+        
+        col_avaliacao = self._encontrar_coluna_por_nomes(df.columns, NOMES_COLUNA_AVALIACAO)
+        if col_avaliacao is not None:
+            df[col_avaliacao] = pd.to_numeric(df[col_avaliacao], errors='coerce')
+        if not completa:
+            df.attrs['amostra'] = True
+        return df
+    
+    def _materializar_abas(self, abas_encontradas):
+        """Baixa o corpo completo das abas vencedoras que só foram sondadas (in-place)"""
+        sheet_id = getattr(self, '_sheet_id_atual', None)
+        pendentes = {tipo: df for tipo, df in abas_encontradas.items() if df.attrs.get('amostra_url')}
+        if not pendentes or not sheet_id:
+            return abas_encontradas
+        
+        print(f"[DOWNLOAD] Baixando conteúdo completo de {len(pendentes)} abas sondadas...")
+        
+        def baixar(item):
+            tipo, df = item
+            origem = df.attrs.get('origem') or {}
+            try:
+                if any(self._periodo):
+                    df_periodo = self._baixar_periodo(sheet_id, df, origem)
+                    if df_periodo is not None:
+                        return tipo, df_periodo
+                return tipo, self._baixar_aba(sheet_id, df.attrs['amostra_url'], 30,
+                                              gid=origem.get('gid'), nome_aba=origem.get('aba'))
+            except Exception as e:
+                print(f"   [AVISO] Erro ao baixar {tipo}: {str(e)[:50]}")
+                return tipo, None
+        
+        with ThreadPoolExecutor(max_workers=min(len(pendentes), self.max_concorrencia)) as executor:
+            for tipo, df_completo in executor.map(baixar, pendentes.items()):
+                if df_completo is None:
+                    print(f"   [AVISO] {tipo}: conteúdo completo indisponível - aba descartada")
+                    del abas_encontradas[tipo]
+                else:
+                    abas_encontradas[tipo] = df_completo
+        
+        return abas_encontradas
+    
+    def _consulta_periodo(self, amostra):
+        """
+        Consulta gviz com o período da extração e só as colunas do pipeline
+        
+        Ex.: "select B, C, F, G where toDate(B) >= date '2025-01-01' and
+        toDate(B) <= date '2025-01-07'". As colunas são identificadas pela posição
+        no cabeçalho da amostra (A, B, ...); colunas fora de NOMES_COLUNAS_PIPELINE
+        ficam de fora, a não ser que isso deixe a aba sem avaliação.
+        
+        Returns:
+            (consulta, colunas esperadas na resposta) ou (None, None) quando o
+            filtro não pode ser expresso (datas inválidas, sem coluna de data)
+        """
+        data_inicio, data_fim = self._periodo
+        inicio, fim = _data_consulta(data_inicio), _data_consulta(data_fim)
+        if (data_inicio and inicio is None) or (data_fim and fim is None) or not (inicio or fim):
+            return None, None
+        
+        colunas = list(amostra.columns)
+        col_data = self._encontrar_coluna_por_nomes(colunas, NOMES_COLUNA_DATA)
+        if col_data is None:
+            return None, None
+        letra_data = _letra_coluna(colunas.index(col_data))
+        
+        posicoes = [i for i, col in enumerate(colunas)
+                    if col == col_data or self._encontrar_coluna_por_nomes([col], NOMES_COLUNAS_PIPELINE)]
+        if (len(posicoes) == len(colunas) or
+                self._encontrar_coluna_por_nomes([colunas[i] for i in posicoes], NOMES_COLUNA_AVALIACAO) is None):
+            posicoes = list(range(len(colunas)))
+            selecao = '*'
+        else:
+            selecao = ', '.join(_letra_coluna(i) for i in posicoes)
+        
+        condicoes = []
+        if inicio:
+            condicoes.append(f"toDate({letra_data}) >= date '{inicio:%Y-%m-%d}'")
+        if fim:
+            condicoes.append(f"toDate({letra_data}) <= date '{fim:%Y-%m-%d}'")
+        
+        return f"select {selecao} where {' and '.join(condicoes)}", [colunas[i] for i in posicoes]
+    
+    def _baixar_periodo(self, sheet_id, amostra, origem):
+        """
+        Baixa uma aba sondada já filtrada pelo servidor (período + colunas usadas)
+        
+        Retorna None quando a consulta não pode ser montada, é recusada pelo
+        Google (ex.: coluna de data guardada como texto) ou volta com outro
+        cabeçalho - o chamador baixa então a aba inteira e o filtro fica no cliente.
+        """
+        consulta, colunas = self._consulta_periodo(amostra)
+        if consulta is None:
+            return None
+        
+        url_periodo = self._url_origem(sheet_id, origem, consulta=consulta, formato=amostra.attrs.get('formato', 'csv'))
+        df = self._baixar_aba(sheet_id, url_periodo, 30,
+                              gid=origem.get('gid'), nome_aba=origem.get('aba'))
+        if df is None or assinatura_cabecalho(df.attrs.get('cabecalho', df.columns)) != assinatura_cabecalho(colunas):
+            print("   [AVISO] Consulta por período recusada - filtro por data fica no cliente")
+            return None
+        
+        df.attrs['consulta'] = consulta
+        df.attrs['cabecalho'] = list(amostra.columns)
+        print(f"   [OK] Filtro no servidor: {len(df)} registros, {len(colunas)}/{len(amostra.columns)} colunas")
+        return df
+    
+    def _url_export(self, sheet_id, gid, formato='csv', single=False):
+        """URL de exportação de uma aba por GID (gid=None exporta a planilha inteira)"""
+        url = f"{self.url_base}/{sheet_id}/export?format={formato}"
+        if single:
+            url += "&single=true"
+        if gid is not None:
+            url += f"&gid={gid}"
+        return url
+    
+    def _url_gviz(self, sheet_id, nome_aba=None, gid=None, formato='csv', consulta=None):
+        """URL do endpoint gviz para uma aba (por nome ou por GID), com consulta tq opcional"""
+        url = f"{self.url_base}/{sheet_id}/gviz/tq?tqx=out:{formato}"
+        if nome_aba is not None:
+            url += f"&sheet={quote(nome_aba, safe='')}"
+        if gid is not None:
+            url += f"&gid={gid}"
+        if consulta is not None:
+            # headers=1 garante que offset/limit contem só linhas de dados
+            url += f"&headers=1&tq={quote(consulta, safe='')}"
+        elif formato == 'json':
+            # No JSON os rótulos das colunas são o cabeçalho da aba
+            url += "&headers=1"
+        return url
+    
+    def _listar_abas_publicadas(self, sheet_id):
+        """
+        Lista (nome, GID) de todas as abas com uma única requisição à página htmlview
+        
+        Returns:
+            lista de tuplas (nome_aba, gid) na ordem da planilha - vazia se a página
+            não estiver acessível ou não tiver o menu de abas
+        """
+        try:
+            url = f"{self.url_base}/{sheet_id}/htmlview"
+            if not self._contar_requisicao():
+                return []
+            response = self._get(url, timeout=self._timeout_no_prazo(self._timeout_adaptativo(url, 10)))
+            if response.status_code != 200:
+                print(f"   [AVISO] Página htmlview indisponível (HTTP {response.status_code})")
+                return []
+            
+            abas = self._extrair_abas_do_html(response.text)
+            if abas:
+                print(f"   [OK] {len(abas)} abas publicadas: {[nome for nome, _ in abas]}")
+            else:
+                print("   [AVISO] Nenhuma aba encontrada na página htmlview")
+            return abas
+            
+        except Exception as e:
+            print(f"   [AVISO] Erro ao listar abas: {str(e)[:50]}")
+            return []
+    
+    def _extrair_abas_do_html(self, texto_html):
+        """Extrai (nome, GID) do HTML das páginas htmlview/pubhtml do Google Sheets"""
+        abas = []
+        
+        # htmlview: items.push({name: "NPS D+1", pageUrl: "...", gid: "123", ...})
+        padrao_js = r'\{\s*name:\s*"((?:[^"\\]|\\.)*)"[^{}]*?gid:\s*"(\d+)"'
+        for nome_js, gid in re.findall(padrao_js, texto_html):
+            nome = re.sub(r'\\x([0-9a-fA-F]{2})', lambda m: chr(int(m.group(1), 16)), nome_js)
+            nome = re.sub(r'\\u([0-9a-fA-F]{4})', lambda m: chr(int(m.group(1), 16)), nome)
+            nome = re.sub(r'\\(.)', r'\1', nome)
+            abas.append((nome, int(gid)))
+        
+        # pubhtml: <li id="sheet-button-123"><a ...>NPS D+1</a></li>
+        if not abas:
+            padrao_menu = r'<li[^>]*id="sheet-button-(\d+)"[^>]*>(.*?)</li>'
+            for gid, conteudo in re.findall(padrao_menu, texto_html, flags=re.DOTALL):
+                nome = html.unescape(re.sub(r'<[^>]+>', '', conteudo)).strip()
+                abas.append((nome, int(gid)))
+        
+        # Remove GIDs repetidos mantendo a ordem
+        vistos = set()
+        abas_unicas = []
+        for nome, gid in abas:
+            if gid not in vistos:
+                vistos.add(gid)
+                abas_unicas.append((nome, gid))
+        
+        return abas_unicas
+    
+    def _classificar_nome_aba(self, nome_aba):
+        """Tipo provável da aba a partir do nome (None se o nome não indicar nada)"""
+        nome = self._remover_acentos(nome_aba).lower()
+        compacto = re.sub(r'[\s_-]+', '', nome)
+        
+        if any(p in nome for p in ['ruim', 'critico', 'detrator', 'reclamac', 'insatisfeito']):
+            return 'NPS_Ruim'
+        if any(p in compacto for p in ['d+30', 'd30', 'produto', 'whats', 'posvenda']):
+            return 'NPS_D30'
+        if re.search(r'd\+?1(?!\d)', compacto) or any(p in nome for p in ['atendimento', 'telefone']):
+            return 'NPS_D1'
+        return None
+    
+    def _resolver_tipo_aba(self, df, tipo_nome):
+        """Combina o tipo sugerido pelo nome da aba com o identificado pelo conteúdo"""
+        tipo_conteudo = self._classificar_aba(df)
+        if tipo_nome == 'NPS_Ruim':
+            # Mesmo critério da busca forçada: nome "Ruim" prevalece
+            return tipo_nome
+        if tipo_conteudo not in ('desconhecido', 'Dados_Gerais'):
+            return tipo_conteudo
+        return tipo_nome or tipo_conteudo
+    
+    def _extrair_via_api_valores(self, sheet_id):
+        """ESTRATÉGIA API: Lê as abas de ABAS_API_VALORES num único values:batchGet da Sheets API"""
+        abas_encontradas = {}
+        cliente = ClienteValoresSheets(self.api_key, self.sessao, self.url_api)
+        url_lote = cliente.url_lote(sheet_id, ABAS_API_VALORES)
+        
+        try:
+            if not self._contar_requisicao():
+                return abas_encontradas
+            abas = cliente.buscar(sheet_id, ABAS_API_VALORES,
+                                  timeout=self._timeout_no_prazo(self._timeout_adaptativo(url_lote, 30)),
+                                  prazo=self._prazo_limitador())
+        except PrazoEsgotadoError as e:
+            self._interromper_por_prazo(e)
+            print(f"   [AVISO] Sheets API: {e}")
+            return abas_encontradas
+        except Exception as e:
+            print(f"   [AVISO] Sheets API indisponível: {str(e)[:80]}")
+            return abas_encontradas
+        
+        for nome_aba, df in abas.items():
+            tipo_final = self._resolver_tipo_aba(df, self._classificar_nome_aba(nome_aba))
+            if tipo_final != 'desconhecido' and tipo_final not in abas_encontradas:
+                self._marcar_origem(df, nome_aba=nome_aba)
+                abas_encontradas[tipo_final] = df
+                print(f"   [OK] {tipo_final}: {len(df)} registros (aba '{nome_aba}' - API)")
+        
+        return abas_encontradas
+    
+    def _extrair_via_xlsx(self, sheet_id):
+        """ESTRATÉGIA 1.1: Baixa a planilha inteira em XLSX (1 requisição) e lê todas as abas"""
+        abas_encontradas = {}
+        
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            print("   [AVISO] openpyxl não instalado - estratégia XLSX indisponível")
+            return abas_encontradas
+        
+        try:
+            if not self._contar_requisicao():
+                return abas_encontradas
+            url_xlsx = self._url_export(sheet_id, None, formato='xlsx')
+            response = self._get(url_xlsx, timeout=self._timeout_no_prazo(self._timeout_adaptativo(url_xlsx, 30)))
+            if response.status_code != 200 or not response.content.startswith(b'PK'):
+                print(f"   [AVISO] Exportação XLSX indisponível (HTTP {response.status_code})")
+                return abas_encontradas
+            
+            # read_only: as linhas são lidas sob demanda, sem montar a planilha toda na memória
+            workbook = load_workbook(io.BytesIO(response.content), read_only=True, data_only=True)
+            print(f"   [OK] XLSX recebido ({len(response.content) / 1024:.0f} KB) - abas: {workbook.sheetnames}")
+            
+            try:
+                for worksheet in workbook.worksheets:
+                    if all(tipo in abas_encontradas for tipo in ABAS_PRINCIPAIS):
+                        break
+                    
+                    df = self._dataframe_da_worksheet(worksheet)
+                    if len(df) <= 1:
+                        continue
+                    
+                    tipo_final = self._resolver_tipo_aba(df, self._classificar_nome_aba(worksheet.title))
+                    if tipo_final != 'desconhecido' and tipo_final not in abas_encontradas:
+                        self._marcar_origem(df, nome_aba=worksheet.title)
+                        df.attrs['formato'] = 'xlsx'
+                        abas_encontradas[tipo_final] = df
+                        print(f"   [OK] {tipo_final}: {len(df)} registros (aba '{worksheet.title}' - XLSX)")
+            finally:
+                workbook.close()
+                
+        except Exception as e:
+            print(f"   [AVISO] Erro na leitura XLSX: {str(e)[:50]}")
+        
+        return abas_encontradas
+    
+    def _dataframe_da_worksheet(self, worksheet):
+        """
+        Monta DataFrame de uma worksheet openpyxl (1ª linha = cabeçalho, tipos nativos)
+        
+        Datas vêm como datetime e números como int/float, não como o texto que o
+        CSV traz: a aba sai marcada com df.attrs['formato'] = 'xlsx' e fica fora
+        da atualização incremental (o delta é CSV e nunca bateria).
+        """
+        linhas = worksheet.iter_rows(values_only=True)
+        cabecalho = next(linhas, None)
+        if not cabecalho:
+            return pd.DataFrame()
+        
+        # Descarta colunas vazias à direita do cabeçalho
+        largura = len(cabecalho)
+        while largura > 0 and cabecalho[largura - 1] in (None, ''):
+            largura -= 1
+        colunas = [str(col) if col not in (None, '') else f"Unnamed: {i}"
+                   for i, col in enumerate(cabecalho[:largura])]
+        
+        dados = [linha[:largura] for linha in linhas if any(valor not in (None, '') for valor in linha[:largura])]
+        return pd.DataFrame(dados, columns=colunas)
+    
+    def _buscar_por_listagem_publicada(self, sheet_id):
+        """ESTRATÉGIA 1.2: Lê a lista de abas (htmlview) e baixa só as abas reais"""
+        self._abas_publicadas = self._listar_abas_publicadas(sheet_id)
+        if self._abas_publicadas:
+            self._abas_listagem = self._buscar_por_listagem_abas(sheet_id, self._abas_publicadas)
+        return self._abas_listagem
+    
+    def _buscar_por_listagem_abas(self, sheet_id, abas_publicadas):
+        """ESTRATÉGIA 1.2: Baixa apenas as abas reais listadas na página htmlview"""
+        abas_encontradas = {}
+        
+        # Abas cujo nome já indica o tipo vêm primeiro
+        por_nome = [(nome, gid, self._classificar_nome_aba(nome)) for nome, gid in abas_publicadas]
+        por_nome.sort(key=lambda item: item[2] is None)
+        
+        for nome_aba, gid, tipo_nome in por_nome:
+            if all(tipo in abas_encontradas for tipo in ABAS_PRINCIPAIS):
+                break
+            try:
+                df = self._baixar_aba(sheet_id, self._url_export(sheet_id, gid), 10, gid=gid, amostra=True)
+                if df is None or len(df) <= 1:
+                    continue
+                
+                tipo_final = self._resolver_tipo_aba(df, tipo_nome)
+                if tipo_final != 'desconhecido' and tipo_final not in abas_encontradas:
+                    self._marcar_origem(df, gid=gid, nome_aba=nome_aba)
+                    abas_encontradas[tipo_final] = df
+                    print(f"   [OK] {tipo_final}: {len(df)} registros (aba '{nome_aba}', GID {gid})")
+                    
+            except Exception as e:
+                print(f"   [AVISO] Erro na aba '{nome_aba}': {str(e)[:50]}")
+                continue
+        
+        return abas_encontradas
+    
     def _buscar_por_indice_abas(self, sheet_id):
         """ESTRATÉGIA 1.5: Busca por índice das abas (0, 1, 4)"""
         abas_encontradas = {}
@@ -975,33 +2632,27 @@ Seja específico, use dados reais e foque em ações práticas.
             4: 'NPS_D30'
         }
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
         print("   [BUSCA] Testando extração por índices de abas (0, 1, 4)...")
         
         for indice, tipo_esperado in indices_mapeamento.items():
+            if self._busca_cancelada():
+                break
             try:
                 # URL para acessar aba por índice
-                csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&single=true&gid={indice}"
-                response = requests.get(csv_url, timeout=10, headers=headers)
+                csv_url = self._url_export(sheet_id, indice, single=True)
+                df = self._baixar_aba(sheet_id, csv_url, 10, gid=indice, amostra=True)
                 
-                if (response.status_code == 200 and 
-                    response.text.strip() and 
-                    'Error' not in response.text and
-                    len(response.text) > 50):
-                    
-                    df = self._ler_csv_com_encoding(response.text)
+                if df is not None:
                     if len(df) > 1:
                         # Verifica o tipo real da aba
-                        tipo_real = self._identificar_tipo_aba(df)
+                        tipo_real = self._classificar_aba(df)
                         
                         # Usa o tipo identificado se for válido, senão usa o esperado
                         tipo_final = tipo_real if tipo_real != 'desconhecido' else tipo_esperado
                         
                         if tipo_final not in abas_encontradas:
                             abas_encontradas[tipo_final] = df
+                            self._registrar_aba_parcial(tipo_final, df)
                             print(f"   [OK] {tipo_final}: {len(df)} registros (índice {indice})")
                         
             except Exception as e:
@@ -1021,26 +2672,18 @@ Seja específico, use dados reais e foque em ações práticas.
             'NPS Ruim': 'NPS_Ruim'
         }
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
         print(f"   [META] Forçando busca pelos nomes: {list(mapeamento_forcado.keys())}")
         
         for nome_aba, tipo_forcado in mapeamento_forcado.items():
+            if self._busca_cancelada():
+                break
             try:
                 # Busca direta pelo nome exato
-                nome_encoded = nome_aba.replace(' ', '%20').replace('+', '%2B')
-                csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={nome_encoded}"
+                csv_url = self._url_gviz(sheet_id, nome_aba=nome_aba, formato=self.formato_gviz)
                 
-                response = requests.get(csv_url, timeout=10, headers=headers)
+                df = self._baixar_aba(sheet_id, csv_url, 10, nome_aba=nome_aba, amostra=True)
                 
-                if (response.status_code == 200 and 
-                    response.text.strip() and 
-                    'Error' not in response.text and
-                    len(response.text) > 100):
-                    
-                    df = self._ler_csv_com_encoding(response.text)
+                if df is not None:
                     if len(df) > 1:
                         # FORÇA o tipo baseado no nome se for uma aba NPS específica
                         if nome_aba == 'NPS Ruim':
@@ -1049,10 +2692,11 @@ Seja específico, use dados reais e foque em ações práticas.
                             print(f"   [FORCED] FORCADO: '{nome_aba}' -> {tipo_forcado} (ignorando deteccao automatica)")
                         else:
                             # Para outras abas, usa detecção automática se possível
-                            tipo_detectado = self._identificar_tipo_aba(df)
+                            tipo_detectado = self._classificar_aba(df)
                             tipo_final = tipo_detectado if tipo_detectado != 'desconhecido' and tipo_detectado != 'Dados_Gerais' else tipo_forcado
                         
                         abas_encontradas[tipo_final] = df
+                        self._registrar_aba_parcial(tipo_final, df)
                         print(f"   [OK] {tipo_final}: {len(df)} registros (nome forçado: '{nome_aba}')")
                         
             except Exception as e:
@@ -1067,10 +2711,6 @@ Seja específico, use dados reais e foque em ações práticas.
         """ESTRATÉGIA 1: Busca por GIDs específicos fornecidos - PROCESSAMENTO SEQUENCIAL OTIMIZADO"""
         abas_encontradas = {}
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
         total_gids = len(gids_lista)
         print(f"   [CRESCIMENTO] Processando {total_gids} GIDs sequencialmente...")
         
@@ -1078,31 +2718,24 @@ Seja específico, use dados reais e foque em ações práticas.
             # Feedback de progresso real (não simulado)
             progress_pct = (i / total_gids) * 100
             print(f"   [PROGRESSO] {i}/{total_gids} ({progress_pct:.1f}%) - Processando GID: {gid}")
-            # Retry com 2 tentativas por GID
-            for tentativa in range(2):
-                try:
-                    csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
-                    response = requests.get(csv_url, timeout=15, headers=headers)
-                    
-                    # Validação melhor de response
-                    if (response.status_code == 200 and 
-                        response.text.strip() and 
-                        'Error' not in response.text and 
-                        'Sorry, unable to open the file at this time' not in response.text and
-                        len(response.text) > 50):  # Verifica se não é resposta de erro do Google
-                        
-                        df = self._ler_csv_com_encoding(response.text)
-                        if len(df) > 1:
-                            tipo_aba = self._identificar_tipo_aba(df)
-                            if tipo_aba != 'desconhecido':
-                                abas_encontradas[tipo_aba] = df
-                                print(f"   [OK] {tipo_aba}: {len(df)} registros (GID {gid})")
-                                break  # Sucesso, sai do loop de retry
-                            
-                except Exception as e:
-                    if tentativa == 1:  # Última tentativa
-                        print(f"   [AVISO] Erro após 2 tentativas no GID {gid}: {str(e)[:50]}")
+            if self._busca_cancelada():
+                break
+            # Repetições em 429/503/erro de conexão ficam a cargo do limitador da sessão
+            try:
+                csv_url = self._url_export(sheet_id, gid)
+                # Corpo vazio ou página de erro do Google já voltam como None
+                df = self._baixar_aba(sheet_id, csv_url, 15, gid=gid, amostra=True)
+                if df is None or len(df) <= 1:
                     continue
+                
+                tipo_aba = self._classificar_aba(df)
+                if tipo_aba != 'desconhecido':
+                    abas_encontradas[tipo_aba] = df
+                    print(f"   [OK] {tipo_aba}: {len(df)} registros (GID {gid})")
+                    
+            except Exception as e:
+                print(f"   [AVISO] Erro no GID {gid}: {str(e)[:50]}")
+                continue
         
         return abas_encontradas
     
@@ -1144,24 +2777,25 @@ Seja específico, use dados reais e foque em ações práticas.
         
         for tipo_aba, lista_nomes in todos_nomes.items():
             for nome_aba in lista_nomes:
+                if self._busca_cancelada():
+                    break
                 try:
-                    # Codifica o nome da aba para URL
-                    nome_encoded = nome_aba.replace(' ', '%20').replace('+', '%2B')
-                    csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={nome_encoded}"
+                    csv_url = self._url_gviz(sheet_id, nome_aba=nome_aba, formato=self.formato_gviz)
                     
-                    response = requests.get(csv_url, timeout=5)
+                    df = self._baixar_aba(sheet_id, csv_url, 5, nome_aba=nome_aba, amostra=True)
                     
-                    if response.status_code == 200 and response.text.strip() and 'Error' not in response.text:
-                        df = self._ler_csv_com_encoding(response.text)
+                    if df is not None:
                         if len(df) > 1:  # Tem dados válidos
                             # Confirma o tipo analisando o conteúdo
-                            tipo_confirmado = self._identificar_tipo_aba(df)
+                            tipo_confirmado = self._classificar_aba(df)
                             if tipo_confirmado != 'desconhecido':
                                 abas_encontradas[tipo_confirmado] = df
+                                self._registrar_aba_parcial(tipo_confirmado, df)
                                 print(f"   [OK] {tipo_confirmado}: {len(df)} registros (nome: '{nome_aba}')")
                                 break  # Encontrou esta aba, passa para próximo tipo
                             elif tipo_aba not in abas_encontradas:  # Se não confirmou tipo mas não tem aba deste tipo ainda
                                 abas_encontradas[tipo_aba] = df
+                                self._registrar_aba_parcial(tipo_aba, df)
                                 print(f"   [OK] {tipo_aba}: {len(df)} registros (nome: '{nome_aba}' - assumido)")
                                 break
                                 
@@ -1179,22 +2813,8 @@ Seja específico, use dados reais e foque em ações práticas.
             
             # Testa GIDs baseados em padrões de nomes conhecidos
             gids_por_nomes = self._gerar_gids_por_padroes_nomes()
-            
-            for gid in gids_por_nomes:
-                try:
-                    csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
-                    response = requests.get(csv_url, timeout=5)
-                    
-                    if response.status_code == 200 and response.text.strip():
-                        df = self._ler_csv_com_encoding(response.text)
-                        if len(df) > 1:
-                            tipo_aba = self._identificar_tipo_aba(df)
-                            if tipo_aba != 'desconhecido' and tipo_aba not in abas_encontradas:
-                                abas_encontradas[tipo_aba] = df
-                                print(f"   [OK] {tipo_aba}: {len(df)} registros (GID {gid} - por padrão)")
-                                
-                except Exception:
-                    continue
+            abas_encontradas = self._sondar_gids_concorrente(sheet_id, gids_por_nomes, timeout=5,
+                                                             descricao="por padrão")
                     
         except Exception as e:
             print(f"   [AVISO] Erro na descoberta por nomes: {str(e)}")
@@ -1236,23 +2856,11 @@ Seja específico, use dados reais e foque em ações práticas.
         ]
         gids_inteligentes.extend(gids_comuns_grandes)
         
-        print(f"   [DADOS] Testando {len(set(gids_inteligentes))} GIDs inteligentes...")
+        # Remove duplicatas mantendo a ordem (GIDs mais prováveis primeiro)
+        gids_unicos = list(dict.fromkeys(gids_inteligentes))
+        print(f"   [DADOS] Testando {len(gids_unicos)} GIDs inteligentes...")
         
-        for gid in set(gids_inteligentes):
-            try:
-                csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
-                response = requests.get(csv_url, timeout=5)
-                
-                if response.status_code == 200 and response.text.strip():
-                    df = self._ler_csv_com_encoding(response.text)
-                    if len(df) > 1:
-                        tipo_aba = self._identificar_tipo_aba(df)
-                        if tipo_aba != 'desconhecido' and tipo_aba not in abas_encontradas:
-                            abas_encontradas[tipo_aba] = df
-                            print(f"   [OK] {tipo_aba}: {len(df)} registros (GID {gid})")
-                            
-            except Exception:
-                continue
+        abas_encontradas = self._sondar_gids_concorrente(sheet_id, gids_unicos, timeout=5)
         
         return abas_encontradas
     
@@ -1280,35 +2888,111 @@ Seja específico, use dados reais e foque em ações práticas.
         
         print(f"   [DADOS] Testando {len(todos_gids)} GIDs na busca exaustiva...")
         
-        for i, gid in enumerate(todos_gids):
-            # Feedback de progresso melhorado - a cada 25 GIDs
-            if i % 25 == 0 and i > 0:
-                progress_pct = (i / len(todos_gids)) * 100
-                found_count = len(abas_encontradas)
-                print(f"   [CRESCIMENTO] Progresso: {i}/{len(todos_gids)} ({progress_pct:.1f}%) - Encontradas: {found_count} abas")
-                
-                # Pequena pausa para não sobrecarregar (mantém lógica sequencial)
-                time.sleep(0.1)
-            
+        # Pool limitado - interrompe sozinho quando as 3 abas principais aparecem
+        abas_encontradas = self._sondar_gids_concorrente(sheet_id, todos_gids, timeout=3)
+        
+        return abas_encontradas
+    
+    def _testar_gid(self, sheet_id, gid, timeout=5):
+        """Baixa um GID e identifica o tipo da aba - retorna (tipo, df) ou None"""
+        csv_url = self._url_export(sheet_id, gid)
+        df = self._baixar_aba(sheet_id, csv_url, timeout, gid=gid, amostra=True)
+        
+        if df is not None and len(df) > 1:
+            tipo_aba = self._classificar_aba(df)
+            if tipo_aba != 'desconhecido':
+                return tipo_aba, df
+        
+        return None
+    
+    def _sondar_gids_concorrente(self, sheet_id, gids, timeout=5, descricao=None, progress_callback=None):
+        """
+        Testa uma lista de GIDs com pool de threads limitado por self.max_concorrencia
+        
+        Para assim que NPS_D1, NPS_D30 e NPS_Ruim forem encontradas. Quando o mesmo
+        tipo aparece em mais de um GID, vence o que vem primeiro na lista (mesmo
+        resultado da busca sequencial).
+        
+        Args:
+            sheet_id: ID da planilha
+            gids: lista de GIDs candidatos, em ordem de prioridade
+            timeout: timeout de cada requisição (segundos)
+            descricao: texto extra para o log de abas encontradas
+            progress_callback: callback(atual, total, mensagem) - usa self.progress_callback se omitido
+        """
+        abas_encontradas = {}
+        prioridade_abas = {}  # tipo -> posição do GID na lista
+        callback = progress_callback or self.progress_callback
+        total = len(gids)
+        
+        if total == 0:
+            return abas_encontradas
+        
+        # Orçamento curto: gasta as requisições restantes nos GIDs mais prováveis (início
+        # da lista); GIDs no cache negativo não custam requisição e continuam na fila
+        restantes = self._requisicoes_restantes()
+        if restantes is not None:
+            with self._lock_memo:
+                falhas = set(self._falhas_sondagem)
+            selecionados = []
+            for gid in gids:
+                # Só planejamento: os acertos do cache contam em _transferir_aba
+                if ('gid', gid) not in falhas and not self.cache_negativo.tem_registro(sheet_id, 'gid', gid):
+                    if restantes == 0:
+                        continue
+                    restantes -= 1
+                selecionados.append(gid)
+            if len(selecionados) < total:
+                print(f"   [ORCAMENTO] {total} GIDs candidatos - orçamento cobre os {len(selecionados)} mais prováveis")
+                gids = selecionados
+                total = len(gids)
+                if total == 0:
+                    return abas_encontradas
+        
+        parar = threading.Event()
+        estrategia = getattr(self._local, 'estrategia', None)
+        
+        def tarefa(posicao, gid):
+            if parar.is_set() or self._busca_cancelada():
+                return posicao, gid, None
+            # Requisições das threads do pool contam para a estratégia que as disparou
+            self._local.estrategia = estrategia
             try:
-                csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
-                response = requests.get(csv_url, timeout=3)
-                
-                if response.status_code == 200 and response.text.strip():
-                    df = self._ler_csv_com_encoding(response.text)
-                    if len(df) > 1:
-                        tipo_aba = self._identificar_tipo_aba(df)
-                        if tipo_aba != 'desconhecido' and tipo_aba not in abas_encontradas:
-                            abas_encontradas[tipo_aba] = df
-                            print(f"   [OK] {tipo_aba}: {len(df)} registros (GID {gid})")
-                            
-                            # Para se encontrou as 3 abas principais (otimização)
-                            if len(abas_encontradas) >= 3:
-                                print(f"   [OK] 3 abas encontradas - interrompendo busca exaustiva (otimização)")
-                                break
-                            
+                return posicao, gid, self._testar_gid(sheet_id, gid, timeout)
             except Exception:
-                continue
+                return posicao, gid, None
+        
+        workers = min(self.max_concorrencia, total)
+        print(f"   [PROCESSO] {total} GIDs com até {workers} requisições simultâneas...")
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futuros = [executor.submit(tarefa, posicao, gid) for posicao, gid in enumerate(gids)]
+            
+            for concluidos, futuro in enumerate(as_completed(futuros), 1):
+                posicao, gid, resultado = futuro.result()
+                
+                # Progresso real (não simulado)
+                if callback:
+                    callback(concluidos, total, f"Processando GID: {gid}")
+                elif concluidos % 25 == 0:
+                    progress_pct = (concluidos / total) * 100
+                    print(f"   [CRESCIMENTO] Progresso: {concluidos}/{total} ({progress_pct:.1f}%) - Encontradas: {len(abas_encontradas)} abas")
+                
+                if resultado:
+                    tipo_aba, df = resultado
+                    if tipo_aba not in abas_encontradas or posicao < prioridade_abas[tipo_aba]:
+                        abas_encontradas[tipo_aba] = df
+                        prioridade_abas[tipo_aba] = posicao
+                        sufixo = f" - {descricao}" if descricao else ""
+                        print(f"   [OK] {tipo_aba}: {len(df)} registros (GID {gid}{sufixo})")
+                    
+                    # Para se encontrou as 3 abas principais (otimização)
+                    if all(tipo in abas_encontradas for tipo in ABAS_PRINCIPAIS):
+                        print(f"   [OK] 3 abas encontradas - cancelando GIDs restantes")
+                        parar.set()
+                        for pendente in futuros:
+                            pendente.cancel()
+                        break
         
         return abas_encontradas
     
@@ -1328,9 +3012,6 @@ Seja específico, use dados reais e foque em ações práticas.
             # Processa GID individual (mantém lógica atual) 
             result = self.process_single_gid(gid)
             results.append(result)
-            
-            # Pequena pausa para não sobrecarregar (conforme especificação)
-            time.sleep(0.1)
         
         print(f"[OK] Processamento sequencial concluído: {len(results)} resultados")
         return results
@@ -1370,9 +3051,8 @@ Seja específico, use dados reais e foque em ações práticas.
         # Simula GIDs que poderiam corresponder a esses nomes
         for i, nome in enumerate(nomes_comuns):
             # Gera alguns GIDs "plausíveis" baseados no nome
-            hash_base = hash(nome) % 1000000
-            if hash_base < 0:
-                hash_base = abs(hash_base)
+            # crc32 é estável entre execuções (hash() do Python muda a cada processo)
+            hash_base = zlib.crc32(nome.encode('utf-8')) % 1000000
             
             gids_por_padroes.extend([
                 hash_base,
@@ -1388,6 +3068,24 @@ Seja específico, use dados reais e foque em ações práticas.
     
     def _finalizar_extracao(self, abas_encontradas):
         """Finaliza o processo de extração com relatório e sistema de fallback inteligente"""
+        # Orçamento esgotado na descoberta: se faltar aba, a extração é parcial
+        motivo_parcial = self._orcamento_esgotado()
+        if self._orcamento is not None:
+            self._orcamento['materializando'] = True
+        
+        # Abas do índice parcial completam o que a descoberta achou
+        for tipo, df in self._abas_indice.items():
+            abas_encontradas.setdefault(tipo, df)
+        
+        # Descoberta em modo sonda: só agora baixa o conteúdo completo das vencedoras
+        # (as que falham ou estouram o prazo são descartadas)
+        abas_sondadas = set(abas_encontradas)
+        self._materializar_abas(abas_encontradas)
+        descartadas = sorted(abas_sondadas - set(abas_encontradas))
+        if descartadas and not motivo_parcial:
+            motivo_parcial = (self._orcamento_esgotado() or
+                              f"conteúdo completo indisponível: {', '.join(descartadas)}")
+        
         print(f"[DADOS] Total de abas encontradas: {len(abas_encontradas)}")
         
         for tipo, df in abas_encontradas.items():
@@ -1419,10 +3117,40 @@ Seja específico, use dados reais e foque em ações práticas.
             else:
                 print("   [IDEIA] Fallback não encontrou abas adicionais")
         
-        # Salva no cache para próximas consultas (dados finalizados)
+        # Sem as 3 abas principais o resultado não representa a planilha: índice,
+        # esquemas e cache ficam como estão
+        abas_faltantes = [aba for aba in abas_esperadas if aba not in abas_encontradas]
+        if abas_faltantes:
+            if motivo_parcial:
+                self.status_extracao = 'parcial'
+                self.motivo_extracao_parcial = motivo_parcial
+                print(f"[AVISO] Extração parcial ({motivo_parcial}) - índice e cache não atualizados")
+            else:
+                print(f"[AVISO] Faltam {', '.join(abas_faltantes)} - índice e cache não atualizados")
+            return bool(abas_encontradas)
+        
+        # Memoriza onde cada aba estava para pular a descoberta na próxima vez
+        try:
+            self._atualizar_indice_persistente()
+        except Exception as e:
+            print(f"[AVISO] Erro ao atualizar índice de abas: {e}")
+        
+        # Registra como ler cada aba sem inferência de tipos na próxima vez
+        try:
+            self._registrar_esquemas_leitura()
+        except Exception as e:
+            print(f"[AVISO] Erro ao registrar esquemas de leitura: {e}")
+        
+        # Salva no cache para próximas consultas (dados finalizados) - abas filtradas
+        # no servidor têm só parte da planilha e não podem atender outros períodos
+        if any(df.attrs.get('consulta') for df in self.dados_abas.values()):
+            print("[CACHE] Abas filtradas por período no servidor - cache não atualizado")
+            return True
         try:
             if hasattr(self, '_current_url'):
-                cache_manager.save_to_cache(self._current_url, self.dados_abas)
+                for df in self.dados_abas.values():
+                    self._marcar_continuidade(df)
+                self.cache_manager.save_to_cache(self._current_url, self.dados_abas)
         except:
             pass  # Ignora erros de cache
         
@@ -1506,85 +3234,79 @@ Seja específico, use dados reais e foque em ações práticas.
         
         return gids_comuns
     
-    def _tentar_extracao_aba_unica(self, sheet_id, url):
-        """ESTRATÉGIA ESPECIAL: Detecta planilhas de aba única com múltiplas fontes"""
-        try:
-            # Importa o extrator especial
-            import os
-            import sys
-            import importlib.util
-            
-            # Carrega o módulo do extrator especial
-            caminho_extrator = os.path.join(os.path.dirname(__file__), 'extrator_aba_unica_especial.py')
-            if not os.path.exists(caminho_extrator):
-                print("   [ERRO] Extrator especial não encontrado")
-                return False
-            
-            spec = importlib.util.spec_from_file_location("extrator_especial", caminho_extrator)
-            extrator_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(extrator_module)
-            
-            # Usa o extrator especial
-            extractor_especial = extrator_module.ExtratorAbaUnicaEspecial()
-            resultado = extractor_especial.extrair_especial(url)
-            
-            if resultado.get('sucesso'):
-                print("   [OK] Detectada planilha tipo aba única!")
-                
-                # Converte para formato do sistema principal
-                import pandas as pd
-                self.dados_abas = {}
-                
-                for tipo, linhas in resultado['dados_separados'].items():
-                    # Cria DataFrame
-                    df = pd.DataFrame(linhas, columns=resultado['header'])
-                    
-                    # Mapeia tipos para formato do sistema
-                    if tipo == 'D+30':
-                        self.dados_abas['NPS_D30'] = df
-                        print(f"   [DADOS] NPS D+30: {len(df)} registros")
-                    elif tipo == 'D+1':
-                        self.dados_abas['NPS_D1'] = df
-                        print(f"   [DADOS] NPS D+1: {len(df)} registros")
-                    elif tipo == 'NPS_Ruim':
-                        self.dados_abas['NPS_Ruim'] = df
-                        print(f"   [DADOS] NPS Ruim: {len(df)} registros")
-                
-                # Implementa NPS Ruim automaticamente
-                try:
-                    print("   [BUSCA] Implementando NPS Ruim automaticamente...")
-                    caminho_implementador = os.path.join(os.path.dirname(__file__), 'implementar_nps_ruim_completo.py')
-                    if os.path.exists(caminho_implementador):
-                        spec_ruim = importlib.util.spec_from_file_location("implementador_ruim", caminho_implementador)
-                        implementador_module = importlib.util.module_from_spec(spec_ruim)
-                        spec_ruim.loader.exec_module(implementador_module)
-                        
-                        implementador = implementador_module.ImplementadorNPSRuim()
-                        resultado_ruim = implementador.implementar_nps_ruim_completo(url)
-                        
-                        if resultado_ruim.get('sucesso'):
-                            # Carrega dados NPS Ruim
-                            import csv
-                            with open('extracao_especial_NPS_Ruim.csv', 'r', encoding='utf-8') as f:
-                                reader = csv.DictReader(f)
-                                dados_ruim = list(reader)
-                            
-                            # Converte para DataFrame
-                            df_ruim = pd.DataFrame(dados_ruim)
-                            self.dados_abas['NPS_Ruim'] = df_ruim
-                            print(f"   [OK] NPS Ruim implementado: {len(df_ruim)} casos")
-                        
-                except Exception as e:
-                    print(f"   [AVISO] Erro ao implementar NPS Ruim: {e}")
-                
-                return True
+    def _tentar_extratores_especiais(self, sheet_id, url):
+        """
+        ESTRATÉGIA 0: extratores especiais registrados (extratores_especiais)
+        
+        Só roda quem aceita a URL. Extratores com condição de cabeçalho não fazem
+        sonda própria: ficam em self._extratores_cabecalho e são conferidos contra
+        as abas que a descoberta já baixou (_tentar_extratores_por_cabecalho). Sem
+        extrator aplicável não há custo nenhum.
+        
+        Returns:
+            dict tipo -> DataFrame do primeiro extrator que reconhecer a planilha, ou {}
+        """
+        extratores = registro_extratores.aplicaveis(url)
+        self._extratores_cabecalho = [extrator for extrator in extratores if extrator.colunas_cabecalho]
+        self._recursos_conferidos = set()
+        sem_cabecalho = [extrator for extrator in extratores if not extrator.colunas_cabecalho]
+        if not sem_cabecalho:
+            return {}
+        
+        print(f"[META] ESTRATÉGIA 0: Extratores especiais ({', '.join(e.nome for e in sem_cabecalho)})...")
+        return self._rodar_extratores(sem_cabecalho, sheet_id, url, None)
+    
+    def _tentar_extratores_por_cabecalho(self, sheet_id, url):
+        """
+        Confere os extratores com condição de cabeçalho contra as abas já baixadas
+        pela descoberta (memo), na ordem em que chegaram
+        
+        Chamado quando uma etapa da descoberta não resolve a planilha: nenhuma
+        requisição é feita até algum cabeçalho casar.
+        """
+        if not self._extratores_cabecalho:
+            return {}
+        
+        with self._lock_memo:
+            downloads = [(chave, futuro) for chave, futuro in self._memo_downloads.items()
+                         if chave not in self._recursos_conferidos and futuro.done()]
+        
+        for chave, futuro in downloads:
+            self._recursos_conferidos.add(chave)
+            if futuro.exception() is not None or futuro.result() is None:
+                continue
+            amostra = futuro.result()
+            cabecalho = amostra.attrs.get('cabecalho', amostra.columns)
+            candidatos = [extrator for extrator in self._extratores_cabecalho if extrator.aplica_cabecalho(cabecalho)]
+            if not candidatos:
+                continue
             
-            return False
+            print(f"[META] ESTRATÉGIA 0: Extratores especiais ({', '.join(e.nome for e in candidatos)})...")
+            abas = self._rodar_extratores(candidatos, sheet_id, url, amostra)
+            if abas:
+                self._extratores_cabecalho = []
+                return abas
+        return {}
+    
+    def _rodar_extratores(self, extratores, sheet_id, url, amostra):
+        """Primeiro resultado entre os extratores (recortes sem origem de aba inteira)"""
+        for extrator in extratores:
+            try:
+                abas = extrator.extrair(self, sheet_id, url, amostra)
+            except Exception as e:
+                print(f"   [ERRO] Erro no extrator {extrator.nome}: {e}")
+                continue
+            if not abas:
+                continue
             
-        except Exception as e:
-            print(f"   [ERRO] Erro na estratégia aba única: {e}")
-            return False
-
+            print(f"   [OK] Planilha reconhecida pelo extrator {extrator.nome}")
+            for tipo, df in abas.items():
+                # Recortes de uma aba não podem ir para o índice/atualização incremental como aba inteira
+                df.attrs.pop('origem', None)
+                print(f"   [DADOS] {tipo}: {len(df)} registros")
+            return abas
+        
+        return {}
 
 def main():
     """Função principal para uso direto"""
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Análise em Lote - Várias lojas (uma planilha por loja) analisadas em paralelo
+Data: 16/10/2026
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+# Limite global de análises simultâneas no processo (todos os lotes somados)
+MAX_ANALISES_SIMULTANEAS = max(1, int(os.getenv('NPS_LOTE_CONCORRENCIA', 4)))
+_vagas_analise = threading.BoundedSemaphore(MAX_ANALISES_SIMULTANEAS)
+
+
+def normalizar_item_lote(item):
+    """
+    Aceita dict {'loja_nome', 'sheets_url', 'data_inicio', 'data_fim'} ou
+    tupla (loja_nome, sheets_url[, data_inicio[, data_fim]])
+    """
+    if isinstance(item, dict):
+        loja = {
+            'loja_nome': item.get('loja_nome') or item.get('nome_loja'),
+            'sheets_url': item.get('sheets_url') or item.get('url'),
+            'data_inicio': item.get('data_inicio') or None,
+            'data_fim': item.get('data_fim') or None
+        }
+    else:
+        valores = list(item) + [None] * (4 - len(item))
+        loja = dict(zip(('loja_nome', 'sheets_url', 'data_inicio', 'data_fim'), valores[:4]))
+
+    if not loja['sheets_url']:
+        raise ValueError(f"URL da planilha ausente para a loja '{loja['loja_nome']}'")
+    loja['loja_nome'] = loja['loja_nome'] or 'Análise Universal'
+    return loja
+
+
+def analisar_loja(loja_nome, sheets_url, data_inicio=None, data_fim=None):
+    """Extração, métricas NPS e insights IA de uma loja (sem gerar documento)"""
+    from analisador_nps_completo import AnalisadorNPSCompleto
+
+    analisador = AnalisadorNPSCompleto(loja_nome)
+    resumo = analisador.analisar_planilha(sheets_url, data_inicio, data_fim)
+
+    if not analisador.dados_abas or resumo.startswith('[ERRO]'):
+        return {'success': False, 'error': resumo}
+
+    # NPS e nota média combinando D+1 e D+30 (ponderados pelo número de respostas)
+    respostas = promotores = detratores = soma_notas = 0
+    for tipo in ('NPS_D1', 'NPS_D30'):
+        metricas = analisador.metricas_calculadas.get(tipo) or {}
+        if 'total_respostas' not in metricas:
+            continue
+        respostas += metricas['total_respostas']
+        promotores += metricas['promotores']['count']
+        detratores += metricas['detratores']['count']
+        soma_notas += float(metricas['nota_media']) * metricas['total_respostas']
+
+    ruim = analisador.metricas_calculadas.get('NPS_Ruim') or {}
+    return {
+        'success': True,
+        'dados': {
+            'total_registros': sum(len(df) for df in analisador.dados_abas.values()),
+            'total_respostas': respostas,
+            'nps_score': round((promotores - detratores) / respostas * 100, 1) if respostas else 0,
+            'avg_rating': round(soma_notas / respostas, 1) if respostas else 0,
+            'casos_criticos': ruim.get('total_casos', 0),
+            'loja_nome': loja_nome
+        },
+        'resumo': resumo
+    }
+
+
+def consolidar_resultados(resultados):
+    """Resumo do lote: contagens, NPS médio ponderado e ranking das lojas"""
+    sucessos = [r for r in resultados if r.get('success')]
+    ranking = sorted(
+        ({'loja_nome': r['loja_nome'],
+          'nps_score': r.get('dados', {}).get('nps_score', 0),
+          'total_registros': r.get('dados', {}).get('total_registros', 0)} for r in sucessos),
+        key=lambda item: item['nps_score'], reverse=True
+    )
+
+    # Peso pelas respostas quando disponível, senão pelos registros
+    pesos = [r['dados'].get('total_respostas', r['dados'].get('total_registros', 0)) for r in sucessos]
+    peso_total = sum(pesos)
+    nps_medio = (sum(r['dados'].get('nps_score', 0) * peso for r, peso in zip(sucessos, pesos)) / peso_total
+                 if peso_total else 0)
+
+    return {
+        'total_lojas': len(resultados),
+        'sucessos': len(sucessos),
+        'falhas': len(resultados) - len(sucessos),
+        'total_registros': sum(r['dados'].get('total_registros', 0) for r in sucessos),
+        'nps_medio_ponderado': round(nps_medio, 1),
+        'ranking': ranking,
+        'lojas_com_falha': [{'loja_nome': r['loja_nome'], 'error': r.get('error')}
+                            for r in resultados if not r.get('success')]
+    }
+
+
+def analisar_lote(lojas, analisar=None, max_concorrencia=None, progress_callback=None):
+    """
+    Analisa várias lojas em paralelo, limitado por MAX_ANALISES_SIMULTANEAS no processo
+
+    Args:
+        lojas: lista de dicts ou tuplas (ver normalizar_item_lote)
+        analisar: função (loja_nome, sheets_url, data_inicio, data_fim) -> dict com
+                  'success' e 'dados' (padrão: analisar_loja)
+        max_concorrencia: limite deste lote (nunca acima do limite global)
+        progress_callback: callback(atual, total, mensagem)
+
+    Returns:
+        dict com 'resultados' (na ordem de entrada), 'resumo' consolidado e tempos
+    """
+    analisar = analisar or analisar_loja
+    itens = [normalizar_item_lote(item) for item in lojas]
+    total = len(itens)
+    workers = max(1, min(total, int(max_concorrencia or MAX_ANALISES_SIMULTANEAS), MAX_ANALISES_SIMULTANEAS))
+    resultados = [None] * total
+    inicio_lote = time.time()
+
+    print(f"[LOTE] {total} lojas com até {workers} análises simultâneas...")
+
+    def executar(posicao, loja):
+        with _vagas_analise:
+            inicio = time.time()
+            try:
+                resultado = analisar(loja['loja_nome'], loja['sheets_url'], loja['data_inicio'], loja['data_fim'])
+            except Exception as e:
+                resultado = {'success': False, 'error': f'Erro na análise: {str(e)}'}
+            resultado = dict(resultado or {'success': False, 'error': 'Análise sem resultado'})
+            resultado.update(loja)
+            resultado['duracao_segundos'] = round(time.time() - inicio, 2)
+            return posicao, resultado
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futuros = [executor.submit(executar, posicao, loja) for posicao, loja in enumerate(itens)]
+        for concluidos, futuro in enumerate(as_completed(futuros), 1):
+            posicao, resultado = futuro.result()
+            resultados[posicao] = resultado
+            status = 'OK' if resultado.get('success') else 'ERRO'
+            mensagem = f"[{status}] {resultado['loja_nome']} ({resultado['duracao_segundos']}s)"
+            if progress_callback:
+                progress_callback(concluidos, total, mensagem)
+            print(f"[LOTE] {concluidos}/{total} {mensagem}")
+
+    duracao = round(time.time() - inicio_lote, 2)
+    resumo = consolidar_resultados(resultados)
+    print(f"[LOTE] Concluído em {duracao}s: {resumo['sucessos']} sucessos, {resumo['falhas']} falhas")
+
+    return {
+        'resultados': resultados,
+        'resumo': resumo,
+        'duracao_segundos': duracao,
+        'timestamp': datetime.now().isoformat()
+    }
+
+
+if __name__ == "__main__":
+    import sys
+    import csv
+    import json
+
+    if len(sys.argv) < 2:
+        print("Uso: python analise_lote.py lojas.csv [saida.json]")
+        print("CSV com colunas: loja_nome, sheets_url, data_inicio, data_fim")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r', encoding='utf-8-sig', newline='') as f:
+        lojas = [linha for linha in csv.DictReader(f) if (linha.get('sheets_url') or '').strip()]
+
+    lote = analisar_lote(lojas)
+    for resultado in lote['resumo']['ranking']:
+        print(f"  {resultado['loja_nome']}: NPS {resultado['nps_score']}")
+
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], 'w', encoding='utf-8') as f:
+            json.dump(lote, f, ensure_ascii=False, indent=2, default=str)
+        print(f"Resultado salvo em {sys.argv[2]}")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+API de Valores - Cliente do values:batchGet da Sheets API v4 (várias abas numa única chamada)
+Data: 16/10/2026
+"""
+
+import os
+from urllib.parse import quote, urlencode
+import numpy as np
+import pandas as pd
+
+# Endereço base da Sheets API (NPS_SHEETS_API_URL_BASE permite um servidor local)
+URL_API_SHEETS = 'https://sheets.googleapis.com/v4/spreadsheets'
+
+
+class ClienteValoresSheets:
+    """
+    Busca várias abas inteiras (intervalo = nome da aba) numa requisição values:batchGet
+
+    Usa chave de API, então a planilha precisa estar compartilhada por link. As
+    células vêm formatadas (FORMATTED_VALUE), como no CSV exportado, e colunas
+    só com números viram numéricas - o mesmo DataFrame que a leitura do CSV daria.
+    """
+
+    def __init__(self, api_key, sessao, url_api=None):
+        self.api_key = api_key
+        self.sessao = sessao
+        self.url_api = (url_api or os.getenv('NPS_SHEETS_API_URL_BASE') or URL_API_SHEETS).rstrip('/')
+
+    def url_lote(self, sheet_id, nomes_abas):
+        """URL do values:batchGet com um intervalo por aba"""
+        parametros = [('ranges', "'" + nome.replace("'", "''") + "'") for nome in nomes_abas]
+        parametros += [('majorDimension', 'ROWS'), ('valueRenderOption', 'FORMATTED_VALUE'), ('key', self.api_key)]
+        return f"{self.url_api}/{sheet_id}/values:batchGet?{urlencode(parametros, quote_via=quote)}"
+
+    def buscar(self, sheet_id, nomes_abas, timeout=30, prazo=None):
+        """
+        Baixa as abas pedidas numa única chamada
+
+        Args:
+            prazo: time.time() limite repassado ao limitador da sessão (None = sem prazo)
+
+        Returns:
+            dict nome_aba -> DataFrame (abas sem linhas de dados ficam de fora)
+
+        Raises:
+            ValueError com a mensagem da API quando a chamada é recusada (chave
+            inválida, planilha privada ou aba inexistente recusam o lote inteiro)
+        """
+        extras = {'prazo': prazo} if prazo is not None else {}
+        response = self.sessao.get(self.url_lote(sheet_id, nomes_abas), timeout=timeout, **extras)
+        try:
+            if response.status_code != 200:
+                try:
+                    mensagem = response.json()['error']['message']
+                except Exception:
+                    mensagem = f"HTTP {response.status_code}"
+                raise ValueError(mensagem)
+            intervalos = response.json().get('valueRanges', [])
+        finally:
+            response.close()
+
+        abas = {}
+        for nome_aba, intervalo in zip(nomes_abas, intervalos):
+            df = self.dataframe(intervalo.get('values', []))
+            if df is not None:
+                abas[nome_aba] = df
+        return abas
+
+    @staticmethod
+    def dataframe(valores):
+        """DataFrame de uma matriz de valores (1ª linha = cabeçalho) - None se não houver dados"""
+        if len(valores) < 2:
+            return None
+
+        # A API omite as células vazias do fim de cada linha
+        cabecalho = list(valores[0])
+        largura = len(cabecalho)
+        while largura > 0 and cabecalho[largura - 1] in (None, ''):
+            largura -= 1
+        if largura == 0:
+            return None
+
+        colunas, vistas = [], {}
+        for indice, rotulo in enumerate(cabecalho[:largura]):
+            rotulo = str(rotulo) if rotulo not in (None, '') else f"Unnamed: {indice}"
+            # Nomes repetidos ganham sufixo .1, .2... como no read_csv
+            if rotulo in vistas:
+                vistas[rotulo] += 1
+                rotulo = f"{rotulo}.{vistas[rotulo]}"
+            else:
+                vistas[rotulo] = 0
+            colunas.append(rotulo)
+
+        dados = [linha[:largura] + [''] * (largura - len(linha)) for linha in valores[1:]
+                 if any(valor not in (None, '') for valor in linha[:largura])]
+        if not dados:
+            return None
+
+        df = pd.DataFrame(dados, columns=colunas).replace('', np.nan)
+        for coluna in df.columns:
+            serie = df[coluna]
+            numerica = pd.to_numeric(serie, errors='coerce')
+            if numerica.notna().sum() == serie.notna().sum():
+                df[coluna] = numerica
+        return df
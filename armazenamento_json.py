@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Armazenamento JSON - Leitura e gravação atômica das memórias persistentes em cache/
+Data: 16/10/2026
+"""
+
+import os
+import json
+
+
+def carregar_json(arquivo, descricao, padrao=None):
+    """
+    Lê um arquivo JSON
+
+    Args:
+        arquivo: caminho do arquivo
+        descricao: nome da memória nas mensagens de erro (ex.: 'índice de abas')
+        padrao: valor quando o arquivo não existe ou está corrompido ({} se omitido)
+    """
+    vazio = {} if padrao is None else padrao
+    if not os.path.exists(arquivo):
+        return vazio
+    try:
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️ Erro ao ler {descricao}: {e}")
+        return vazio
+
+
+def salvar_json(arquivo, dados, descricao, indentar=True):
+    """
+    Grava um arquivo JSON de forma atômica (arquivo temporário + rename)
+
+    Leitores nunca veem o arquivo pela metade. Uma falha só é impressa: quem
+    chama continua com os dados em memória.
+
+    Returns:
+        True se o arquivo foi gravado
+    """
+    try:
+        os.makedirs(os.path.dirname(arquivo) or '.', exist_ok=True)
+        temporario = f"{arquivo}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False, indent=2 if indentar else None)
+        os.replace(temporario, arquivo)
+        return True
+    except Exception as e:
+        print(f"⚠️ Erro ao salvar {descricao}: {e}")
+        return False
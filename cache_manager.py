@@ -15,9 +15,12 @@ import pickle
 class CacheManager:
     """Gerenciador de cache inteligente para otimizar análises recorrentes"""
     
-    def __init__(self, cache_dir="cache", ttl_hours=1):
+    def __init__(self, cache_dir="cache", ttl_hours=None, ttl_validacao_minutos=None):
         self.cache_dir = cache_dir
-        self.ttl_seconds = ttl_hours * 3600  # TTL de 1 hora como especificado
+        # Tempo máximo que uma entrada é mantida (só é reutilizada após sonda de mudança)
+        self.ttl_seconds = float(ttl_hours or os.getenv('NPS_CACHE_TTL_HORAS', 24)) * 3600
+        # Entradas mais novas que isso são reutilizadas sem consultar a planilha
+        self.ttl_validacao_seconds = float(ttl_validacao_minutos or os.getenv('NPS_CACHE_VALIDACAO_MIN', 5)) * 60
         self.url_cache = {}  # URLs testadas
         self.analysis_cache = {}  # Resultados análise  
         self.cache_times = {}  # Timestamps
@@ -61,7 +64,13 @@ class CacheManager:
         return (current_time - cache_time) < self.ttl_seconds
     
     def get_cached_data(self, sheets_url, filters=None):
-        """Recupera dados do cache se disponível e válido"""
+        """
+        Recupera dados do cache se disponível e válido
+        
+        O dicionário retornado traz 'precisa_validar' = True quando a entrada passou
+        de ttl_validacao_seconds: quem chama deve sondar a planilha antes de reutilizar
+        (e chamar renovar_cache se nada mudou).
+        """
         cache_key = self._get_cache_key(sheets_url, filters)
         cache_path = self._get_cache_path(cache_key)
         
@@ -72,6 +81,8 @@ class CacheManager:
             with open(cache_path, 'rb') as f:
                 cached_data = pickle.load(f)
             
+            idade = time.time() - os.path.getmtime(cache_path)
+            cached_data['precisa_validar'] = idade >= self.ttl_validacao_seconds
             print(f"💾 Cache encontrado para URL (idade: {self._get_cache_age(cache_path)})")
             return cached_data
             
@@ -104,6 +115,15 @@ class CacheManager:
         except Exception as e:
             print(f"⚠️ Erro ao salvar cache: {e}")
     
+    def renovar_cache(self, sheets_url, filters=None):
+        """Marca a entrada como recém-validada (planilha confirmada sem alterações)"""
+        cache_path = self._get_cache_path(self._get_cache_key(sheets_url, filters))
+        try:
+            if os.path.exists(cache_path):
+                os.utime(cache_path, None)
+        except Exception as e:
+            print(f"⚠️ Erro ao renovar cache: {e}")
+    
     def _get_cache_age(self, cache_path):
         """Retorna idade do cache em formato legível"""
         cache_time = os.path.getmtime(cache_path)
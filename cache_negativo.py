@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Cache Negativo - Lembra GIDs e nomes de abas que não existem em cada planilha
+Data: 16/10/2026
+"""
+
+import os
+import time
+import threading
+from armazenamento_json import carregar_json, salvar_json
+
+
+class CacheNegativo:
+    """Cache de sondagens que falharam (erro HTTP ou corpo vazio), com TTL próprio"""
+
+    def __init__(self, arquivo=None, ttl_horas=None):
+        self.arquivo = arquivo or os.path.join('cache', 'cache_negativo.json')
+        self.ttl_seconds = float(ttl_horas or os.getenv('NPS_CACHE_NEGATIVO_TTL_HORAS', 6)) * 3600
+        self._lock = threading.Lock()
+        self._entradas = self._carregar()  # chave -> timestamp da falha
+        self._alterado = False
+
+        # Contadores para acompanhar as requisições economizadas
+        self.acertos = 0
+        self.falhas = 0
+
+    def _chave(self, sheet_id, tipo, valor):
+        """Chave (sheet_id, 'gid'|'aba', valor) serializada"""
+        return f"{sheet_id}|{tipo}|{valor}"
+
+    def _carregar(self):
+        """Lê as entradas ainda válidas do disco"""
+        entradas = carregar_json(self.arquivo, 'cache negativo')
+        agora = time.time()
+        try:
+            return {chave: momento for chave, momento in entradas.items()
+                    if agora - momento < self.ttl_seconds}
+        except (AttributeError, TypeError) as e:
+            print(f"⚠️ Erro ao ler cache negativo: {e}")
+            return {}
+
+    def contem(self, sheet_id, tipo, valor):
+        """True se a sondagem falhou há menos de TTL (conta acerto/falha do cache)"""
+        chave = self._chave(sheet_id, tipo, valor)
+        with self._lock:
+            momento = self._entradas.get(chave)
+            if momento is not None and time.time() - momento < self.ttl_seconds:
+                self.acertos += 1
+                return True
+            if momento is not None:
+                del self._entradas[chave]
+                self._alterado = True
+            self.falhas += 1
+            return False
+
+    def tem_registro(self, sheet_id, tipo, valor):
+        """Como contem, mas sem contar acerto/falha (consultas de planejamento)"""
+        with self._lock:
+            momento = self._entradas.get(self._chave(sheet_id, tipo, valor))
+            return momento is not None and time.time() - momento < self.ttl_seconds
+
+    def registrar(self, sheet_id, tipo, valor):
+        """Marca a sondagem como inexistente/vazia"""
+        with self._lock:
+            self._entradas[self._chave(sheet_id, tipo, valor)] = time.time()
+            self._alterado = True
+
+    def remover(self, sheet_id, tipo, valor):
+        """Esquece a falha de uma sondagem (a aba respondeu)"""
+        with self._lock:
+            if self._entradas.pop(self._chave(sheet_id, tipo, valor), None) is not None:
+                self._alterado = True
+
+    def remover_planilha(self, sheet_id):
+        """Esquece todas as falhas registradas para a planilha"""
+        prefixo = f"{sheet_id}|"
+        with self._lock:
+            for chave in [c for c in self._entradas if c.startswith(prefixo)]:
+                del self._entradas[chave]
+                self._alterado = True
+
+    def salvar(self):
+        """Grava as entradas no disco se houve mudança"""
+        with self._lock:
+            if not self._alterado:
+                return
+            # Sem indentação: centenas de GIDs por planilha
+            if salvar_json(self.arquivo, self._entradas, 'cache negativo', indentar=False):
+                self._alterado = False
+
+    def get_stats(self):
+        """Retorna estatísticas do cache negativo"""
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                'entradas': len(self._entradas),
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'requisicoes_economizadas': self.acertos,
+                'taxa_acerto': round(self.acertos / consultas * 100, 1) if consultas else 0.0
+            }
+
+
+# Instância global do cache negativo
+cache_negativo = CacheNegativo()
+
+if __name__ == "__main__":
+    print("Cache Negativo - GIDs e abas inexistentes")
+    print("=" * 50)
+
+    stats = cache_negativo.get_stats()
+    print(f"Entradas válidas: {stats['entradas']}")
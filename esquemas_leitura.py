@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Esquemas de Leitura - Como ler o CSV de cada aba já conhecida sem inferência de tipos
+Data: 16/10/2026
+"""
+
+import os
+import threading
+from datetime import datetime
+from armazenamento_json import carregar_json, salvar_json
+
+
+class EsquemasLeitura:
+    """
+    Guarda, por sheet_id e assinatura do cabeçalho, o esquema de leitura de uma aba
+
+    Esquema: {'colunas': colunas usadas pelo pipeline (na ordem do cabeçalho),
+    'tipos': {coluna: 'numero'|'texto'}, 'coluna_data': nome ou None,
+    'formato_data': formato strptime ou None}. Registrado depois de uma extração
+    bem-sucedida; a leitura seguinte da mesma aba usa o esquema direto.
+    """
+
+    def __init__(self, arquivo=None):
+        self.arquivo = arquivo or os.path.join('cache', 'esquemas_leitura.json')
+        self._lock = threading.Lock()
+        self._esquemas = self._carregar()
+
+    def _carregar(self):
+        """Lê os esquemas do disco (vazio se não existir ou estiver corrompido)"""
+        return carregar_json(self.arquivo, 'esquemas de leitura')
+
+    def _salvar(self):
+        """Grava os esquemas de forma atômica"""
+        salvar_json(self.arquivo, self._esquemas, 'esquemas de leitura')
+
+    def obter(self, sheet_id, assinatura):
+        """Esquema da aba com este cabeçalho (None se ainda não foi registrado)"""
+        with self._lock:
+            esquema = self._esquemas.get(sheet_id, {}).get(assinatura)
+            return dict(esquema) if esquema else None
+
+    def registrar(self, sheet_id, esquemas):
+        """
+        Adiciona/atualiza esquemas da planilha
+
+        Args:
+            sheet_id: ID da planilha
+            esquemas: dict assinatura do cabeçalho -> esquema
+        """
+        agora = datetime.now().isoformat()
+        with self._lock:
+            por_planilha = self._esquemas.setdefault(sheet_id, {})
+            for assinatura, esquema in esquemas.items():
+                por_planilha[assinatura] = {
+                    'colunas': list(esquema['colunas']),
+                    'tipos': dict(esquema['tipos']),
+                    'coluna_data': esquema.get('coluna_data'),
+                    'formato_data': esquema.get('formato_data'),
+                    'visto_em': agora
+                }
+            self._salvar()
+
+    def remover(self, sheet_id):
+        """Esquece os esquemas da planilha (próxima leitura volta à inferência)"""
+        with self._lock:
+            if self._esquemas.pop(sheet_id, None) is not None:
+                self._salvar()
+
+
+# Instância global dos esquemas de leitura
+esquemas_leitura = EsquemasLeitura()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Estatísticas de Estratégias - Histórico de cada estratégia de descoberta de abas
+Data: 16/10/2026
+"""
+
+import os
+import threading
+from datetime import datetime
+from armazenamento_json import carregar_json, salvar_json
+
+
+def _novo_registro():
+    return {'execucoes': 0, 'sucessos': 0, 'requisicoes': 0, 'segundos': 0.0}
+
+
+class EstatisticasEstrategias:
+    """
+    Guarda, no geral e por sheet_id, execuções, sucessos, requisições e tempo de cada estratégia
+
+    O custo esperado de uma estratégia é o número médio de requisições por execução
+    dividido pela taxa de sucesso (quantas requisições se gasta, em média, até ela
+    resolver a planilha). Os valores são suavizados com o custo padrão informado pelo
+    analisador, então uma estratégia nunca executada começa pelo custo nominal.
+    """
+
+    def __init__(self, arquivo=None):
+        self.arquivo = arquivo or os.path.join('cache', 'estatisticas_estrategias.json')
+        self._lock = threading.Lock()
+        self._dados = self._carregar()
+
+    def _carregar(self):
+        """Lê as estatísticas do disco (vazias se não existir ou estiver corrompido)"""
+        dados = carregar_json(self.arquivo, 'estatísticas de estratégias')
+        if not isinstance(dados, dict):
+            return {'geral': {}, 'planilhas': {}}
+        return {'geral': dados.get('geral', {}), 'planilhas': dados.get('planilhas', {})}
+
+    def _salvar(self):
+        """Grava as estatísticas de forma atômica"""
+        salvar_json(self.arquivo, self._dados, 'estatísticas de estratégias')
+
+    def registrar(self, sheet_id, codigo, sucesso, requisicoes, segundos):
+        """Soma uma execução da estratégia ao histórico geral e ao da planilha"""
+        with self._lock:
+            por_planilha = self._dados['planilhas'].setdefault(sheet_id, {})
+            for registros in (self._dados['geral'], por_planilha):
+                registro = registros.setdefault(codigo, _novo_registro())
+                registro['execucoes'] += 1
+                registro['sucessos'] += 1 if sucesso else 0
+                registro['requisicoes'] += requisicoes
+                registro['segundos'] = round(registro['segundos'] + segundos, 3)
+            if sucesso:
+                por_planilha[codigo]['ultimo_sucesso'] = datetime.now().isoformat()
+            self._salvar()
+
+    def _registro(self, sheet_id, codigo):
+        """Histórico da planilha quando existe, senão o geral"""
+        registro = self._dados['planilhas'].get(sheet_id, {}).get(codigo)
+        return registro or self._dados['geral'].get(codigo)
+
+    def custo_esperado(self, sheet_id, codigo, custo_padrao):
+        """Requisições esperadas até o sucesso (suavizado com o custo padrão)"""
+        with self._lock:
+            registro = self._registro(sheet_id, codigo)
+        if not registro:
+            return float(custo_padrao)
+        execucoes = registro['execucoes']
+        taxa_sucesso = (registro['sucessos'] + 1) / (execucoes + 2)
+        requisicoes_media = (registro['requisicoes'] + custo_padrao) / (execucoes + 1)
+        return requisicoes_media / taxa_sucesso
+
+    def tem_sucesso(self, sheet_id, codigo):
+        """True se a estratégia já resolveu alguma planilha (esta, ou qualquer uma sem histórico próprio)"""
+        with self._lock:
+            registro = self._registro(sheet_id, codigo)
+            return bool(registro and registro['sucessos'])
+
+    def ordenar(self, sheet_id, custos_padrao):
+        """
+        Ordena códigos de estratégia pelo custo esperado (empates mantêm a ordem original)
+
+        Args:
+            sheet_id: ID da planilha
+            custos_padrao: dict ordenado codigo -> custo nominal em requisições
+        """
+        return sorted(custos_padrao, key=lambda codigo: self.custo_esperado(sheet_id, codigo, custos_padrao[codigo]))
+
+    def resumo(self, sheet_id=None):
+        """Tabela codigo -> métricas (geral ou de uma planilha) para inspeção"""
+        with self._lock:
+            registros = self._dados['geral'] if sheet_id is None else self._dados['planilhas'].get(sheet_id, {})
+            resumo = {}
+            for codigo, registro in registros.items():
+                execucoes = registro['execucoes'] or 1
+                resumo[codigo] = {
+                    'execucoes': registro['execucoes'],
+                    'taxa_sucesso': round(registro['sucessos'] / execucoes * 100, 1),
+                    'requisicoes_media': round(registro['requisicoes'] / execucoes, 1),
+                    'segundos_media': round(registro['segundos'] / execucoes, 2)
+                }
+            return resumo
+
+    def planilhas(self):
+        """IDs das planilhas com histórico"""
+        with self._lock:
+            return list(self._dados['planilhas'])
+
+
+# Instância global das estatísticas de estratégias
+estatisticas_estrategias = EstatisticasEstrategias()
+
+if __name__ == "__main__":
+    import sys
+
+    print("Estatísticas de Estratégias de Descoberta")
+    print("=" * 50)
+
+    sheet_id = sys.argv[1] if len(sys.argv) > 1 else None
+    titulo = f"Planilha {sheet_id}" if sheet_id else f"Geral ({len(estatisticas_estrategias.planilhas())} planilhas)"
+    print(titulo)
+
+    resumo = estatisticas_estrategias.resumo(sheet_id)
+    if not resumo:
+        print("Sem histórico")
+    for codigo, metricas in sorted(resumo.items(), key=lambda item: item[1]['requisicoes_media']):
+        print(f"  Estratégia {codigo:>4}: {metricas['execucoes']:>4} execuções | "
+              f"{metricas['taxa_sucesso']:>5}% sucesso | "
+              f"{metricas['requisicoes_media']:>6} req/execução | "
+              f"{metricas['segundos_media']:>6}s")
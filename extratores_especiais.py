@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Extratores Especiais - Registro dos plugins da estratégia 0 (planilhas fora do padrão de 3 abas)
+Data: 16/10/2026
+"""
+
+import os
+import re
+import abc
+import time
+import threading
+import importlib
+import importlib.util
+import numpy as np
+import pandas as pd
+
+# Módulos extras com extratores (separados por vírgula); cada um expõe uma lista EXTRATORES
+MODULOS_EXTRATORES = [nome.strip() for nome in os.getenv('NPS_EXTRATORES_ESPECIAIS', '').split(',') if nome.strip()]
+
+
+class ExtratorEspecial(abc.ABC):
+    """
+    Base de um extrator especial da estratégia 0
+
+    As condições são baratas e conferidas antes de qualquer trabalho:
+    - padroes_url: regex aplicadas à URL (basta uma casar); vazio = qualquer URL
+    - colunas_cabecalho: trechos que precisam aparecer no cabeçalho de uma aba já
+      baixada pela descoberta (sem sonda própria - o extrator só roda depois de
+      uma etapa da descoberta não resolver a planilha); vazio = roda logo no início
+
+    Um extrator sem nenhuma condição roda em toda análise.
+    """
+
+    nome = 'especial'
+    padroes_url = ()
+    colunas_cabecalho = ()
+
+    def aplica_url(self, url):
+        """Confere as condições de URL"""
+        return not self.padroes_url or any(re.search(padrao, url) for padrao in self.padroes_url)
+
+    def aplica_cabecalho(self, colunas):
+        """Confere se todos os trechos de colunas_cabecalho aparecem no cabeçalho"""
+        colunas = [str(coluna).lower() for coluna in colunas]
+        return all(any(trecho in coluna for coluna in colunas) for trecho in self.colunas_cabecalho)
+
+    @abc.abstractmethod
+    def extrair(self, analisador, sheet_id, url, amostra):
+        """
+        Extrai as abas da planilha
+
+        Args:
+            analisador: AnalisadorNPSCompleto (sessão, downloads com memo e orçamento)
+            sheet_id: ID da planilha
+            url: URL informada pelo usuário
+            amostra: aba baixada pela descoberta cujo cabeçalho casou (pode ser só a
+                     amostra, com df.attrs['amostra_url']); None sem colunas_cabecalho
+
+        Returns:
+            dict tipo -> DataFrame (NPS_D1, NPS_D30, NPS_Ruim) ou None se a planilha
+            não é deste tipo
+        """
+
+
+class DivisorAbaUnica(ExtratorEspecial):
+    """
+    Planilha de aba única com todas as fontes (coluna Fonte + Telefone e WhatsApp)
+
+    A aba é baixada uma vez e cada linha recebe o tipo numa passada vetorizada,
+    nesta ordem de prioridade:
+    1. campos de resolução preenchidos (Situação, Comentário da Resolução...) -> NPS_Ruim
+    2. valor da coluna de fonte ('NPS Ruim', 'D+30', 'D+1'...) - a coluna é fatorada
+       e só os valores distintos são interpretados em Python
+    3. WhatsApp preenchido -> NPS_D30; telefone preenchido -> NPS_D1
+    Cada tipo vira uma cópia das suas linhas (df.take), sem as colunas vazias
+    naquele tipo.
+
+    Uma aba NPS Ruim comum também tem Fonte, Telefone e WhatsApp: antes do
+    download completo a amostra precisa ter uma linha de D+1/D+30 com nota de
+    promotor ou neutro (ver mistura_fontes).
+    """
+
+    nome = 'aba única com fontes'
+    colunas_cabecalho = ('fonte', 'whats', 'fone')
+    TIPOS = ('NPS_D1', 'NPS_D30', 'NPS_Ruim')  # código do tipo = posição (-1 = sem tipo)
+    COLUNAS_FONTE = ('fonte', 'origem', 'canal')
+    COLUNAS_RESOLUCAO = ('situa', 'resolu')
+    COLUNAS_WHATSAPP = ('whats', 'zap', 'wpp')
+    COLUNAS_TELEFONE = ('telefone', 'fone', 'phone', 'celular')
+    COLUNAS_AVALIACAO = ('avalia', 'nota')
+    NOTA_MINIMA_NAO_DETRATOR = 7
+
+    def extrair(self, analisador, sheet_id, url, amostra):
+        if amostra is not None and not self.mistura_fontes(amostra):
+            return None
+
+        df = amostra
+        if df is None or df.attrs.get('amostra_url'):
+            # Aba só sondada pela descoberta: baixa o corpo completo (ou o GID 0 sem amostra)
+            origem = (df.attrs.get('origem') if df is not None else None) or {'gid': 0}
+            url_aba = df.attrs['amostra_url'] if df is not None else analisador._url_export(sheet_id, 0)
+            df = analisador._baixar_aba(sheet_id, url_aba, 30, gid=origem.get('gid'), nome_aba=origem.get('aba'))
+        if df is None or df.empty:
+            return None
+
+        inicio = time.perf_counter()
+        codigos = self.classificar_linhas(df)
+        abas = self.dividir(df, codigos)
+        # Um tipo só no corpo completo é uma aba comum
+        if len(abas) < 2:
+            return None
+
+        sem_tipo = int((codigos < 0).sum())
+        print(f"   [DIVISOR] {len(df)} linhas divididas em {(time.perf_counter() - inicio) * 1000:.0f}ms"
+              + (f" ({sem_tipo} sem fonte identificável descartadas)" if sem_tipo else ""))
+        return abas
+
+    @staticmethod
+    def _colunas(colunas, trechos, excluir=()):
+        """Colunas cujo nome contém algum dos trechos (e nenhum dos excluídos)"""
+        return [coluna for coluna in colunas
+                if any(trecho in str(coluna).lower() for trecho in trechos)
+                and not any(trecho in str(coluna).lower() for trecho in excluir)]
+
+    @staticmethod
+    def _preenchido(df, colunas):
+        """Máscara das linhas com pelo menos uma das colunas preenchida"""
+        mascara = np.zeros(len(df), dtype=bool)
+        for coluna in colunas:
+            serie = df[coluna]
+            if pd.api.types.is_numeric_dtype(serie):
+                mascara |= serie.notna().to_numpy()
+            else:
+                mascara |= serie.fillna('').astype(str).str.strip().ne('').to_numpy()
+        return mascara
+
+    @staticmethod
+    def _tipo_da_fonte(valor):
+        """Código do tipo de um valor da coluna de fonte (-1 se não identifica)"""
+        texto = re.sub(r'[\s_+\-]', '', str(valor).lower())
+        if 'ruim' in texto or 'detrator' in texto:
+            return 2
+        if 'd30' in texto or texto.endswith('30'):
+            return 1
+        if 'd1' in texto:
+            return 0
+        return -1
+
+    def mistura_fontes(self, df):
+        """
+        Indica se a aba tem linhas de D+1/D+30 que não são de detratores
+
+        Numa aba NPS Ruim a Fonte diz de onde veio o detrator ('D+1', 'D+30') e
+        todas as notas vão de 0 a 6: dividida pela fonte, os casos pendentes
+        iriam para D+1/D+30. Uma nota 7 ou mais numa linha de D+1/D+30 só
+        existe na aba única com todas as fontes. Sem coluna de avaliação a aba
+        não é dividida.
+        """
+        avaliacoes = self._colunas(df.columns, self.COLUNAS_AVALIACAO)
+        if not avaliacoes or df.empty:
+            return False
+        notas = pd.to_numeric(df[avaliacoes[0]], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        codigos = self.classificar_linhas(df)
+        return bool((((codigos == 0) | (codigos == 1)) & (notas >= self.NOTA_MINIMA_NAO_DETRATOR)).any())
+
+    def classificar_linhas(self, df):
+        """Código do tipo (posição em TIPOS, -1 = sem tipo) de cada linha"""
+        colunas = list(df.columns)
+        codigos = np.full(len(df), -1, dtype=np.int8)
+
+        fontes = self._colunas(colunas, self.COLUNAS_FONTE)
+        if fontes:
+            fatores, valores = pd.factorize(df[fontes[0]])
+            # Fator -1 (célula vazia) cai no -1 acrescentado ao final
+            tipos_valores = np.array([self._tipo_da_fonte(valor) for valor in valores] + [-1], dtype=np.int8)
+            codigos = tipos_valores[fatores]
+
+        resolucao = self._preenchido(df, self._colunas(colunas, self.COLUNAS_RESOLUCAO))
+        codigos = np.where(resolucao, 2, codigos)
+
+        sem_tipo = codigos < 0
+        whatsapp = self._preenchido(df, self._colunas(colunas, self.COLUNAS_WHATSAPP))
+        telefone = self._preenchido(df, self._colunas(colunas, self.COLUNAS_TELEFONE, excluir=self.COLUNAS_WHATSAPP))
+        codigos = np.where(sem_tipo & whatsapp, 1, np.where(sem_tipo & telefone, 0, codigos))
+        return codigos.astype(np.int8)
+
+    def dividir(self, df, codigos):
+        """Linhas de cada tipo copiadas com df.take, sem as colunas que ficaram vazias no tipo"""
+        abas = {}
+        for codigo, tipo in enumerate(self.TIPOS):
+            indices = np.flatnonzero(codigos == codigo)
+            if len(indices) == 0:
+                continue
+            fatia = df.take(indices)
+            fatia = fatia.loc[:, fatia.notna().any().to_numpy()]
+            abas[tipo] = fatia.reset_index(drop=True)
+        return abas
+
+
+class ExtratorLegadoAbaUnica(ExtratorEspecial):
+    """
+    Adapta extrator_aba_unica_especial.py ao registro: o módulo é carregado uma vez
+    e as linhas viram DataFrames em memória
+
+    implementar_nps_ruim_completo.py não é registrado: ele grava
+    extracao_especial_NPS_Ruim.csv no diretório atual, compartilhado pelas
+    análises em paralelo do servidor.
+    """
+
+    nome = 'aba única (legado)'
+    colunas_cabecalho = ('fonte',)
+    TIPOS = {'D+1': 'NPS_D1', 'D+30': 'NPS_D30', 'NPS_Ruim': 'NPS_Ruim'}
+
+    def __init__(self, modulo_extrator):
+        self._modulo_extrator = modulo_extrator
+
+    def extrair(self, analisador, sheet_id, url, amostra):
+        resultado = self._modulo_extrator.ExtratorAbaUnicaEspecial().extrair_especial(url)
+        if not resultado.get('sucesso'):
+            return None
+
+        return {self.TIPOS[tipo]: pd.DataFrame(linhas, columns=resultado['header'])
+                for tipo, linhas in resultado['dados_separados'].items() if tipo in self.TIPOS}
+
+
+class RegistroExtratores:
+    """Extratores especiais do processo, carregados uma única vez (ver carregar)"""
+
+    def __init__(self, modulos=None, diretorio_legado=None):
+        self.modulos = list(MODULOS_EXTRATORES if modulos is None else modulos)
+        self.diretorio_legado = diretorio_legado or os.path.dirname(os.path.abspath(__file__))
+        # Embutido: planilhas de aba única com coluna de fonte
+        self._extratores = [DivisorAbaUnica()]
+        self._carregado = False
+        self._lock = threading.Lock()
+
+    def registrar(self, extrator):
+        """Adiciona um extrator (conferido depois dos já registrados)"""
+        with self._lock:
+            self._extratores.append(extrator)
+
+    def carregar(self):
+        """Importa os módulos de extratores na primeira chamada (chamadas seguintes não fazem nada)"""
+        if self._carregado:
+            return
+        with self._lock:
+            if self._carregado:
+                return
+
+            for nome_modulo in self.modulos:
+                try:
+                    modulo = importlib.import_module(nome_modulo)
+                    self._extratores.extend(getattr(modulo, 'EXTRATORES', ()))
+                except Exception as e:
+                    print(f"[AVISO] Extratores de {nome_modulo} não carregados: {e}")
+
+            legado = self._carregar_modulo('extrator_aba_unica_especial.py')
+            if legado is not None:
+                self._extratores.append(ExtratorLegadoAbaUnica(legado))
+
+            self._carregado = True
+            if self._extratores:
+                print(f"[OK] Extratores especiais: {', '.join(e.nome for e in self._extratores)}")
+
+    def _carregar_modulo(self, arquivo):
+        """Carrega um módulo legado pelo caminho (None se o arquivo não existir ou falhar)"""
+        caminho = os.path.join(self.diretorio_legado, arquivo)
+        if not os.path.exists(caminho):
+            return None
+        try:
+            spec = importlib.util.spec_from_file_location(os.path.splitext(arquivo)[0], caminho)
+            modulo = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(modulo)
+            return modulo
+        except Exception as e:
+            print(f"[AVISO] Erro ao carregar {arquivo}: {e}")
+            return None
+
+    def aplicaveis(self, url):
+        """Extratores cujas condições de URL aceitam esta planilha"""
+        self.carregar()
+        with self._lock:
+            return [extrator for extrator in self._extratores if extrator.aplica_url(url)]
+
+
+# Instância global do registro de extratores especiais
+registro_extratores = RegistroExtratores()
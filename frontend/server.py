@@ -66,7 +66,8 @@ DEBUG = os.getenv('DEBUG_MODE', 'False').lower() == 'true'
 TIMEOUTS = {
     'test_endpoint': 30,      # Era 15s
     'full_analysis': 120,     # Era 60s
-    'individual_request': 10   # Para requests individuais
+    'individual_request': 10,  # Para requests individuais
+    'extraction': 75          # Prazo da extração das abas (sobra tempo para IA e documento)
 }
 
 class ErrorHandler:
@@ -171,8 +172,10 @@ def test_extraction():
         if not re.match(r'https://docs\.google\.com/spreadsheets/d/[a-zA-Z0-9-_]+', sheets_url):
             return jsonify({'success': False, 'error': 'URL inválida. Use formato: https://docs.google.com/spreadsheets/d/...'})
         
-        # Teste rápido de conexão
+        # Teste rápido de conexão (pool keep-alive compartilhado com o analisador)
         import requests
+        from sessao_http import sessao_http
+        from limitador_google import CircuitoAbertoError
         try:
             # Extrai ID da planilha
             sheet_id_match = re.search(r'/spreadsheets/d/([a-zA-Z0-9-_]+)', sheets_url)
@@ -183,7 +186,7 @@ def test_extraction():
             
             # Testa acesso básico com timeout otimizado
             test_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid=0"
-            response = requests.get(test_url, timeout=TIMEOUTS['test_endpoint'], allow_redirects=True)
+            response = sessao_http.get(test_url, timeout=TIMEOUTS['test_endpoint'], allow_redirects=True)
             
             if response.status_code == 200 and len(response.text) > 50:
                 return jsonify({
@@ -196,6 +199,12 @@ def test_extraction():
                 
         except requests.exceptions.Timeout:
             return jsonify({'success': False, 'error': f'Timeout após {TIMEOUTS["test_endpoint"]}s - planilha demorou muito para responder'})
+        except CircuitoAbertoError as e:
+            return jsonify({
+                'success': False,
+                'error': f'Google limitando o acesso à planilha - tente novamente em {e.segundos_restantes:.0f}s',
+                'retry_after': int(e.segundos_restantes) + 1
+            }), 503, {'Retry-After': str(int(e.segundos_restantes) + 1)}
         except Exception as e:
             return jsonify({'success': False, 'error': f'Erro de conexão: {str(e)}'})
             
@@ -232,6 +241,10 @@ def analyze_data():
             result = handle_sheets_url()
         
         print("[ANALYZE] ANALISE CONCLUIDA")
+        
+        # Google limitando a planilha: 503 + Retry-After para o cliente tentar depois
+        if result.get('retry_after'):
+            return jsonify(result), 503, {'Retry-After': str(result['retry_after'])}
         return jsonify(result)
         
     except Exception as e:
@@ -244,6 +257,45 @@ def analyze_data():
             'error': f'Erro interno: {str(e)}'
         }), 500
 
+@app.route('/api/analyze/batch', methods=['POST', 'OPTIONS'])
+def analyze_batch():
+    """Análise de várias lojas em paralelo (uma planilha por loja) com resumo consolidado"""
+    
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        data = request.get_json() or {}
+        lojas = data.get('lojas') or []
+        estilo_pdf = data.get('estilo_pdf', 'mdo_weasy')
+        
+        if not lojas:
+            return jsonify({'success': False, 'error': 'Lista de lojas é obrigatória'}), 400
+        
+        print(f"[BATCH] NOVA ANALISE EM LOTE: {len(lojas)} lojas")
+        
+        from analise_lote import analisar_lote
+        
+        def analisar(loja_nome, sheets_url, data_inicio, data_fim):
+            return run_analysis(sheets_url, loja_nome, estilo_pdf, data_inicio, data_fim)
+        
+        lote = analisar_lote(lojas, analisar=analisar, max_concorrencia=data.get('max_concorrencia'))
+        
+        print("[BATCH] ANALISE EM LOTE CONCLUIDA")
+        return jsonify({'success': lote['resumo']['sucessos'] > 0, **lote})
+        
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        print(f"[ERROR] ERRO NA API DE LOTE: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        
+        return jsonify({
+            'success': False,
+            'error': f'Erro interno: {str(e)}'
+        }), 500
+
 def handle_file_upload():
     """Processa upload de arquivo CSV"""
     print("[UPLOAD] Processando upload de arquivo...")
@@ -414,6 +466,7 @@ def handle_sheets_url():
     estilo_pdf = data.get('estilo_pdf', 'mdo_weasy')  # Novo parâmetro
     data_inicio = data.get('data_inicio')  # NOVO: Filtro por data início
     data_fim = data.get('data_fim')  # NOVO: Filtro por data fim
+    nova_tentativa = bool(data.get('nova_tentativa'))  # Usuário pediu para tentar de novo
     
     print(f"[URL] URL: {sheets_url}")
     print(f"[LOJA] Projeto: {loja_nome}")
@@ -434,9 +487,10 @@ def handle_sheets_url():
         }
     
     # Executa análise original com filtro por data
-    return run_analysis(sheets_url, loja_nome, estilo_pdf, data_inicio, data_fim)
+    return run_analysis(sheets_url, loja_nome, estilo_pdf, data_inicio, data_fim, nova_tentativa)
 
-def run_analysis(sheets_url, loja_nome, estilo_pdf='mdo_weasy', data_inicio=None, data_fim=None):
+def run_analysis(sheets_url, loja_nome, estilo_pdf='mdo_weasy', data_inicio=None, data_fim=None,
+                 nova_tentativa=False):
     """Executa análise e gera PDF MDO com emojis reais"""
     try:
         print(f"INICIANDO ANÁLISE MDO para: {loja_nome}")
@@ -451,9 +505,16 @@ def run_analysis(sheets_url, loja_nome, estilo_pdf='mdo_weasy', data_inicio=None
         
         # 1. EXTRAÇÃO COM NOVO SISTEMA IA (COM FILTRO POR DATA)
         print("[EXTRACT] PASSO 1: Extraindo dados com IA avancada...")
-        analisador_completo = AnalisadorNPSCompleto(loja_nome)
+        analisador_completo = AnalisadorNPSCompleto(loja_nome, prazo_extracao=TIMEOUTS['extraction'])
         
-        if not analisador_completo._extrair_abas_automaticamente(sheets_url):
+        if not analisador_completo._extrair_abas_automaticamente(sheets_url, data_inicio, data_fim, nova_tentativa):
+            espera = analisador_completo._google_indisponivel()
+            if espera:
+                return {
+                    'success': False,
+                    'error': f'O Google está limitando o acesso a esta planilha. Tente novamente em {espera:.0f}s.',
+                    'retry_after': int(espera) + 1
+                }
             return {
                 'success': False,
                 'error': 'Não foi possível conectar com a planilha. Verifique se está pública.'
@@ -580,7 +641,7 @@ def run_analysis(sheets_url, loja_nome, estilo_pdf='mdo_weasy', data_inicio=None
             vendedores_count = 0
         
         # Retornar estrutura compatível com frontend
-        return {
+        resposta = {
             'success': True,
             'message': 'Análise concluída com sucesso! Documento profissional gerado.',
             'arquivo': nome_arquivo,
@@ -592,8 +653,14 @@ def run_analysis(sheets_url, loja_nome, estilo_pdf='mdo_weasy', data_inicio=None
                 'vendedores': vendedores_count,
                 'loja_nome': loja_nome
             },
-            'tipo_relatorio': 'Análise NPS - Documento DOC'
+            'tipo_relatorio': 'Análise NPS - Documento DOC',
+            'status_extracao': analisador_completo.status_extracao
         }
+        if analisador_completo.status_extracao == 'parcial':
+            resposta['message'] = ('Análise concluída com dados parciais: nem todas as abas foram '
+                                   'encontradas dentro do tempo limite.')
+            resposta['abas_encontradas'] = sorted(analisador_completo.dados_abas.keys())
+        return resposta
         
     except Exception as e:
         print(f"[ERROR] ERRO NA ANALISE MDO: {str(e)}")
@@ -616,12 +683,16 @@ def start_server():
         print(f"[AVISO] Porta {PORT} ocupada, usando {available_port}")
         PORT = available_port
     
+    # Extratores especiais (estratégia 0) carregados uma vez, antes da primeira análise
+    from extratores_especiais import registro_extratores
+    registro_extratores.carregar()
+    
     print(f"{Fore.CYAN}DASHBOT - SERVIDOR FLASK{Style.RESET_ALL}")
     print(f"{Fore.CYAN}=" * 60 + f"{Style.RESET_ALL}")
     print(f"{Fore.GREEN}Rodando em: http://localhost:{PORT}{Style.RESET_ALL}")
     print(f"{Fore.YELLOW}IA: GPT-4o integrada{Style.RESET_ALL}")
     print(f"{Fore.YELLOW}Suporte: Qualquer planilha{Style.RESET_ALL}")
-    print(f"{Fore.YELLOW}API: /api/analyze{Style.RESET_ALL}")
+    print(f"{Fore.YELLOW}API: /api/analyze | /api/analyze/batch{Style.RESET_ALL}")
     print(f"{Fore.YELLOW}Timeouts: Test {TIMEOUTS['test_endpoint']}s | Analysis {TIMEOUTS['full_analysis']}s{Style.RESET_ALL}")
     print(f"{Fore.CYAN}=" * 60 + f"{Style.RESET_ALL}")
     print(f"{Fore.RED}Ctrl+C para parar{Style.RESET_ALL}")
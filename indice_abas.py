@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Índice de Abas - Memória persistente de onde ficam as abas NPS de cada planilha
+Data: 16/10/2026
+"""
+
+import os
+import hashlib
+import threading
+from datetime import datetime
+from armazenamento_json import carregar_json, salvar_json
+
+
+def assinatura_cabecalho(colunas):
+    """Gera assinatura estável do cabeçalho de uma aba (ordem e nomes das colunas)"""
+    texto = '|'.join(str(col).strip().lower() for col in colunas)
+    return hashlib.md5(texto.encode('utf-8')).hexdigest()
+
+
+class IndiceAbas:
+    """Guarda, por sheet_id, o GID/nome e a assinatura do cabeçalho de cada tipo de aba"""
+
+    def __init__(self, arquivo=None):
+        self.arquivo = arquivo or os.path.join('cache', 'indice_abas.json')
+        self._lock = threading.Lock()
+        self._indice = self._carregar()
+
+    def _carregar(self):
+        """Lê o índice do disco (vazio se não existir ou estiver corrompido)"""
+        return carregar_json(self.arquivo, 'índice de abas')
+
+    def _salvar(self):
+        """Grava o índice de forma atômica"""
+        salvar_json(self.arquivo, self._indice, 'índice de abas')
+
+    def obter(self, sheet_id):
+        """Retorna {tipo: {'gid', 'aba', 'assinatura', 'visto_em'}} da planilha"""
+        with self._lock:
+            return dict(self._indice.get(sheet_id, {}))
+
+    def registrar(self, sheet_id, abas):
+        """
+        Substitui as entradas da planilha
+
+        Args:
+            sheet_id: ID da planilha
+            abas: dict tipo -> {'gid': int|None, 'aba': str|None, 'assinatura': str}
+        """
+        agora = datetime.now().isoformat()
+        entradas = {}
+        for tipo, info in abas.items():
+            entradas[tipo] = {
+                'gid': info.get('gid'),
+                'aba': info.get('aba'),
+                'assinatura': info['assinatura'],
+                'visto_em': agora
+            }
+
+        with self._lock:
+            self._indice[sheet_id] = entradas
+            self._salvar()
+
+    def remover(self, sheet_id):
+        """Esquece a planilha (próxima extração volta à descoberta completa)"""
+        with self._lock:
+            if self._indice.pop(sheet_id, None) is not None:
+                self._salvar()
+
+
+# Instância global do índice de abas
+indice_abas = IndiceAbas()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Latências HTTP - Percentis de latência por endpoint para timeouts adaptativos e hedge
+Data: 16/10/2026
+"""
+
+import os
+import re
+import threading
+from collections import deque
+from urllib.parse import urlsplit, parse_qsl
+
+PADRAO_PLANILHA = re.compile(r'/d/[^/]+/')
+PADRAO_PLANILHA_API = re.compile(r'(/v4/spreadsheets/)[^/]+')
+
+
+def _percentil(amostras, percentual):
+    """Percentil de uma lista já ordenada (vizinho mais próximo)"""
+    return amostras[min(len(amostras) - 1, int(round(percentual / 100 * (len(amostras) - 1))))]
+
+
+class LatenciasEndpoints:
+    """
+    Janela das últimas latências (até os cabeçalhos da resposta) de cada endpoint
+
+    O endpoint é host + caminho sem o ID da planilha + formato pedido (ex.:
+    docs.google.com/spreadsheets/d/*/export:csv), então todas as planilhas
+    alimentam a mesma estatística. Com menos de `amostras_minimas` medições
+    nada é derivado e quem chama usa os valores fixos de sempre.
+    """
+
+    def __init__(self, janela=None, amostras_minimas=None, fator_timeout=None,
+                 timeout_minimo=None, timeout_maximo=None):
+        self.janela = int(janela or os.getenv('NPS_LATENCIA_JANELA', 200))
+        self.amostras_minimas = int(amostras_minimas or os.getenv('NPS_LATENCIA_AMOSTRAS_MINIMAS', 20))
+        # Timeout adaptativo = p99 x fator, limitado a [timeout_minimo, timeout_maximo]
+        self.fator_timeout = float(fator_timeout or os.getenv('NPS_LATENCIA_FATOR_TIMEOUT', 4))
+        self.timeout_minimo = float(timeout_minimo or os.getenv('NPS_TIMEOUT_MINIMO', 3))
+        self.timeout_maximo = float(timeout_maximo or os.getenv('NPS_TIMEOUT_MAXIMO', 30))
+
+        self._lock = threading.Lock()
+        self._latencias = {}  # endpoint -> deque de segundos
+
+    @staticmethod
+    def endpoint(url):
+        """Chave do endpoint de uma URL (sem ID da planilha, GID ou consulta)"""
+        partes = urlsplit(url)
+        parametros = dict(parse_qsl(partes.query))
+        formato = parametros.get('format') or parametros.get('tqx', '').replace('out:', '')
+        caminho = PADRAO_PLANILHA_API.sub(r'\1*', PADRAO_PLANILHA.sub('/d/*/', partes.path))
+        return f"{partes.netloc}{caminho}" + (f":{formato}" if formato else '')
+
+    def registrar(self, url, segundos):
+        """Soma uma medição à janela do endpoint"""
+        chave = self.endpoint(url)
+        with self._lock:
+            if chave not in self._latencias:
+                self._latencias[chave] = deque(maxlen=self.janela)
+            self._latencias[chave].append(segundos)
+
+    def percentil(self, url, percentual):
+        """Percentil das latências do endpoint (None com poucas medições)"""
+        with self._lock:
+            amostras = sorted(self._latencias.get(self.endpoint(url), ()))
+        if len(amostras) < self.amostras_minimas:
+            return None
+        return _percentil(amostras, percentual)
+
+    def timeout(self, url, padrao):
+        """Timeout derivado do p99 do endpoint (padrao enquanto não há medições suficientes)"""
+        p99 = self.percentil(url, 99)
+        if p99 is None:
+            return padrao
+        return min(self.timeout_maximo, max(self.timeout_minimo, p99 * self.fator_timeout))
+
+    def resumo(self):
+        """Percentis de cada endpoint para diagnóstico"""
+        with self._lock:
+            janelas = {chave: sorted(valores) for chave, valores in self._latencias.items()}
+        return {
+            chave: {'amostras': len(amostras),
+                    **{f"p{p}": round(_percentil(amostras, p), 3) for p in (50, 95, 99)}}
+            for chave, amostras in janelas.items()
+        }
+
+    def limpar(self):
+        """Descarta todas as medições"""
+        with self._lock:
+            self._latencias.clear()
+
+
+# Instância global compartilhada pelas sessões HTTP
+latencias_http = LatenciasEndpoints()
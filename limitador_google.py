@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Limitador Google - Controle de taxa, backoff e circuit breaker para o Google Sheets
+Data: 16/10/2026
+"""
+
+import os
+import re
+import time
+import random
+import threading
+import requests
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# Respostas que indicam limitação ou instabilidade do Google (vale repetir)
+STATUS_LIMITACAO = (429, 500, 502, 503, 504)
+
+PADRAO_SHEET_ID = re.compile(r'/d/([a-zA-Z0-9-_]+)')
+
+
+class CircuitoAbertoError(Exception):
+    """Planilha com falhas seguidas - requisições suspensas até o circuito fechar"""
+
+    def __init__(self, sheet_id, segundos_restantes):
+        self.sheet_id = sheet_id
+        self.segundos_restantes = segundos_restantes
+        super().__init__(f"Circuito aberto para {sheet_id} - tente novamente em {segundos_restantes:.0f}s")
+
+
+class PrazoEsgotadoError(Exception):
+    """A espera exigida pelo limitador (fichas, Retry-After, backoff) passaria do prazo de quem chamou"""
+
+    def __init__(self, espera, restante):
+        self.espera = espera
+        self.restante = restante
+        super().__init__(f"Espera de {espera:.1f}s passaria do prazo (restam {max(0.0, restante):.1f}s)")
+
+
+class LimitadorGoogle:
+    """
+    Token bucket adaptativo por host + backoff exponencial com jitter + circuit breaker por planilha
+
+    - Cada host tem um balde com `rajada` fichas repostas a `taxa` fichas/s; um 429/503
+      corta a taxa pela metade e cada sucesso a recupera aos poucos (até a taxa configurada).
+    - Respostas 429/5xx e erros de conexão são repetidos com espera exponencial com jitter,
+      respeitando o cabeçalho Retry-After quando presente.
+    - Após `falhas_circuito` falhas seguidas numa planilha, o circuito abre por
+      `circuito_segundos` e as chamadas levantam CircuitoAbertoError sem ir à rede.
+    - Com `prazo` (time.time() limite de quem chama), uma espera que passaria dele
+      não é feita: levanta PrazoEsgotadoError na hora.
+    """
+
+    def __init__(self, taxa=None, rajada=None, max_tentativas=None, backoff_base=None,
+                 backoff_max=None, falhas_circuito=None, circuito_segundos=None):
+        self.taxa = float(taxa or os.getenv('NPS_GOOGLE_TAXA', 10))
+        self.rajada = float(rajada or os.getenv('NPS_GOOGLE_RAJADA', 20))
+        self.max_tentativas = int(max_tentativas or os.getenv('NPS_GOOGLE_TENTATIVAS', 4))
+        self.backoff_base = float(backoff_base or os.getenv('NPS_GOOGLE_BACKOFF_BASE', 0.5))
+        self.backoff_max = float(backoff_max or os.getenv('NPS_GOOGLE_BACKOFF_MAX', 30))
+        self.falhas_circuito = int(falhas_circuito or os.getenv('NPS_CIRCUITO_FALHAS', 5))
+        self.circuito_segundos = float(circuito_segundos or os.getenv('NPS_CIRCUITO_SEGUNDOS', 60))
+
+        self._lock = threading.Lock()
+        self._baldes = {}     # host -> {'fichas', 'taxa', 'atualizado'}
+        self._circuitos = {}  # sheet_id -> {'falhas', 'aberto_ate'}
+
+        # Contadores para diagnóstico
+        self.limitacoes = 0
+        self.repeticoes = 0
+        self.rejeitadas = 0
+
+    # === TOKEN BUCKET POR HOST ===
+
+    def _balde(self, host):
+        balde = self._baldes.get(host)
+        if balde is None:
+            balde = {'fichas': self.rajada, 'taxa': self.taxa, 'atualizado': time.monotonic()}
+            self._baldes[host] = balde
+        return balde
+
+    def aguardar_vez(self, host, prazo=None):
+        """Bloqueia até haver uma ficha disponível para o host (PrazoEsgotadoError se passar do prazo)"""
+        while True:
+            with self._lock:
+                balde = self._balde(host)
+                agora = time.monotonic()
+                balde['fichas'] = min(self.rajada, balde['fichas'] + (agora - balde['atualizado']) * balde['taxa'])
+                balde['atualizado'] = agora
+                if balde['fichas'] >= 1:
+                    balde['fichas'] -= 1
+                    return
+                espera = (1 - balde['fichas']) / balde['taxa']
+            self._verificar_prazo(espera, prazo)
+            time.sleep(espera)
+
+    def _ajustar_taxa(self, host, limitado):
+        """Diminui a taxa do host pela metade quando limitado; recupera aos poucos no sucesso"""
+        with self._lock:
+            balde = self._balde(host)
+            if limitado:
+                balde['taxa'] = max(0.5, balde['taxa'] / 2)
+                balde['fichas'] = min(balde['fichas'], 0)
+            elif balde['taxa'] < self.taxa:
+                balde['taxa'] = min(self.taxa, balde['taxa'] + 0.5)
+
+    def _verificar_prazo(self, espera, prazo):
+        """Levanta PrazoEsgotadoError se dormir `espera` segundos passaria do prazo"""
+        if prazo is not None and time.time() + espera > prazo:
+            raise PrazoEsgotadoError(espera, prazo - time.time())
+
+    # === CIRCUIT BREAKER POR PLANILHA ===
+
+    def sheet_id_da_url(self, url):
+        """ID da planilha contido na URL (None se não for uma URL de planilha)"""
+        match = PADRAO_SHEET_ID.search(urlparse(url).path)
+        return match.group(1) if match else None
+
+    def verificar_circuito(self, sheet_id):
+        """Levanta CircuitoAbertoError se a planilha estiver com o circuito aberto"""
+        restante = self.tempo_circuito_aberto(sheet_id)
+        if restante:
+            with self._lock:
+                self.rejeitadas += 1
+            raise CircuitoAbertoError(sheet_id, restante)
+
+    def tempo_circuito_aberto(self, sheet_id):
+        """Segundos até o circuito da planilha fechar (0 se estiver fechado)"""
+        if not sheet_id:
+            return 0
+        with self._lock:
+            circuito = self._circuitos.get(sheet_id)
+            if not circuito:
+                return 0
+            return max(0, circuito['aberto_ate'] - time.monotonic())
+
+    def registrar_resultado(self, sheet_id, sucesso):
+        """Atualiza o circuito: sucesso fecha; falhas seguidas acima do limite abrem"""
+        if not sheet_id:
+            return
+        with self._lock:
+            if sucesso:
+                self._circuitos.pop(sheet_id, None)
+                return
+            circuito = self._circuitos.setdefault(sheet_id, {'falhas': 0, 'aberto_ate': 0})
+            circuito['falhas'] += 1
+            # Meio-aberto: depois do período, uma nova falha reabre na hora
+            if circuito['falhas'] >= self.falhas_circuito:
+                circuito['aberto_ate'] = time.monotonic() + self.circuito_segundos
+                print(f"   [AVISO] Circuito aberto para a planilha {sheet_id} "
+                      f"({circuito['falhas']} falhas seguidas) - pausa de {self.circuito_segundos:.0f}s")
+
+    # === BACKOFF ===
+
+    def tempo_espera(self, tentativa, response=None):
+        """Retry-After da resposta ou backoff exponencial com jitter total"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after:
+                try:
+                    return min(self.backoff_max, max(0.0, float(retry_after)))
+                except ValueError:
+                    try:
+                        momento = parsedate_to_datetime(retry_after).timestamp()
+                        return min(self.backoff_max, max(0.0, momento - time.time()))
+                    except (TypeError, ValueError):
+                        pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** tentativa)))
+
+    def executar(self, url, requisicao, prazo=None):
+        """
+        Executa requisicao() sob o controle do limitador
+
+        Args:
+            url: URL chamada (define host e planilha)
+            requisicao: função sem argumentos que faz a chamada e devolve o response
+            prazo: time.time() até quando quem chama pode esperar (None = sem prazo)
+
+        Returns:
+            O último response obtido (pode ser 429/5xx se as tentativas acabarem)
+
+        Raises:
+            PrazoEsgotadoError quando a espera por ficha ou antes de repetir
+            passaria do prazo (nada é dormido)
+        """
+        host = urlparse(url).netloc
+        sheet_id = self.sheet_id_da_url(url)
+
+        for tentativa in range(self.max_tentativas):
+            self.verificar_circuito(sheet_id)
+            self.aguardar_vez(host, prazo)
+
+            try:
+                response = requisicao()
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError):
+                self.registrar_resultado(sheet_id, False)
+                if tentativa == self.max_tentativas - 1:
+                    raise
+                espera = self.tempo_espera(tentativa)
+                self._verificar_prazo(espera, prazo)
+                with self._lock:
+                    self.repeticoes += 1
+                time.sleep(espera)
+                continue
+            except requests.exceptions.Timeout:
+                self.registrar_resultado(sheet_id, False)
+                raise
+
+            if response.status_code not in STATUS_LIMITACAO:
+                self._ajustar_taxa(host, False)
+                self.registrar_resultado(sheet_id, True)
+                return response
+
+            with self._lock:
+                self.limitacoes += 1
+            self._ajustar_taxa(host, True)
+            self.registrar_resultado(sheet_id, False)
+            if tentativa == self.max_tentativas - 1:
+                return response
+
+            espera = self.tempo_espera(tentativa, response)
+            response.close()
+            self._verificar_prazo(espera, prazo)
+            with self._lock:
+                self.repeticoes += 1
+            time.sleep(espera)
+
+        return response
+
+    def get_stats(self):
+        """Retorna estatísticas do limitador"""
+        with self._lock:
+            return {
+                'limitacoes': self.limitacoes,
+                'repeticoes': self.repeticoes,
+                'rejeitadas_circuito': self.rejeitadas,
+                'circuitos_abertos': sum(1 for c in self._circuitos.values()
+                                         if c['aberto_ate'] > time.monotonic()),
+                'taxa_por_host': {host: round(b['taxa'], 2) for host, b in self._baldes.items()}
+            }
+
+
+# Instância global compartilhada por todas as análises do processo
+limitador_google = LimitadorGoogle()
@@ -0,0 +1,674 @@
+#!/usr/bin/env python3
+"""
+Servidor Planilha Local - Imitação local do Google Sheets para testes e benchmarks da extração
+Data: 16/10/2026
+
+Atende os mesmos caminhos usados pelo analisador, sob http://127.0.0.1:<porta>/spreadsheets/d:
+    /{id}/export?format=csv&gid=N      CSV de uma aba
+    /{id}/export?format=xlsx           planilha inteira (requer openpyxl)
+    /{id}/gviz/tq?tqx=out:csv&sheet=X  CSV via gviz (por nome ou gid), com consulta tq
+    /{id}/gviz/tq?tqx=out:json&sheet=X JSON tipado via gviz (colunas number/date/string)
+    /{id}/htmlview                     página com a lista de abas (items.push)
+
+e o values:batchGet da Sheets API v4 sob http://127.0.0.1:<porta>/v4/spreadsheets:
+    /{id}/values:batchGet?ranges=X&ranges=Y&key=K  valores formatados de várias abas
+
+Uso com o analisador:
+    with ServidorPlanilhaLocal(latencia=0.05, taxa_429=0.1) as servidor:
+        analisador = AnalisadorNPSCompleto('Teste', url_base=servidor.url_base)
+        analisador._extrair_abas_automaticamente(servidor.url_planilha('TESTE'))
+"""
+
+import io
+import re
+import csv
+import json
+import time
+import sys
+import random
+import hashlib
+import threading
+from datetime import datetime, timedelta, date
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+CABECALHO_D1 = ['ID', 'Data', 'Nome Completo', 'Primeiro Nome', 'Telefone', 'Avaliação',
+                'Comentário', 'Vendedor', 'Loja', 'Abandono']
+CABECALHO_D30 = ['Id Bot', 'Data', 'Nome Completo', 'Primeiro Nome', 'WhatsApp', 'Avaliação',
+                 'Comentário', 'Vendedor', 'Loja', 'Abandono']
+CABECALHO_RUIM = ['Id Bot', 'Fonte', 'Data', 'Nome Completo', 'Primeiro Nome', 'Telefone', 'Avaliação',
+                  'Comentário', 'Vendedor', 'Loja', 'Situação', 'Comentário da Resolução', 'Data Resolução']
+
+NOMES = ['Ana', 'Bruno', 'Carla', 'Diego', 'Elisa', 'Fábio', 'Gisele', 'Heitor', 'Júlia', 'Márcio']
+SOBRENOMES = ['Silva', 'Souza', 'Gonçalves', 'Oliveira', 'Pereira', 'Lima', 'Araújo', 'Conceição']
+VENDEDORES = ['Amanda', 'Rafael', 'Patrícia', 'João', 'Letícia']
+COMENTARIOS = ['Ótimo atendimento', 'Demorou um pouco', 'Gostei muito dos óculos', 'Lente veio errada',
+               'Não resolveram meu problema', 'Excelente, recomendo', 'Atendimento razoável', '']
+
+
+def mojibake(texto):
+    """Texto UTF-8 lido como latin-1 (ex.: 'Avaliação' -> 'AvaliaÃ§Ã£o'), como nas planilhas reais"""
+    return texto.encode('utf-8').decode('latin-1')
+
+
+def gerar_planilha_sintetica(linhas=500, semente=42, cabecalhos_mojibake=True, loja='MDO Centro'):
+    """
+    Planilha com as abas Resumo, NPS D+1, NPS D+30 e NPS Ruim (dados determinísticos)
+
+    Returns:
+        lista de dicts {'nome', 'gid', 'cabecalho', 'linhas'} na ordem das abas
+    """
+    rng = random.Random(semente)
+    inicio = date(2025, 1, 1)
+
+    def pessoa():
+        primeiro = rng.choice(NOMES)
+        return f"{primeiro} {rng.choice(SOBRENOMES)}", primeiro
+
+    def data_aleatoria():
+        return (inicio + timedelta(days=rng.randrange(365))).strftime('%d/%m/%Y')
+
+    def telefone():
+        return f"55419{rng.randrange(10 ** 7, 10 ** 8)}"
+
+    d1, d30, ruim = [], [], []
+    for i in range(linhas):
+        nome, primeiro = pessoa()
+        d1.append([i + 1, data_aleatoria(), nome, primeiro, telefone(), rng.randint(0, 10),
+                   rng.choice(COMENTARIOS), rng.choice(VENDEDORES), loja, rng.choice(['Não', 'Sim'])])
+        nome, primeiro = pessoa()
+        d30.append([f"bot-{i + 1}", data_aleatoria(), nome, primeiro, telefone(), rng.randint(0, 10),
+                    rng.choice(COMENTARIOS), rng.choice(VENDEDORES), loja, rng.choice(['Não', 'Sim'])])
+
+    for i in range(max(1, linhas // 10)):
+        nome, primeiro = pessoa()
+        resolvido = rng.random() < 0.5
+        ruim.append([f"bot-r{i + 1}", rng.choice(['D+1', 'D+30']), data_aleatoria(), nome, primeiro, telefone(),
+                     rng.randint(0, 6), rng.choice(COMENTARIOS[1:5]), rng.choice(VENDEDORES), loja,
+                     'Resolvido' if resolvido else 'Pendente',
+                     'Cliente contatado' if resolvido else '', data_aleatoria() if resolvido else ''])
+
+    def cabecalho(colunas):
+        return [mojibake(c) for c in colunas] if cabecalhos_mojibake else list(colunas)
+
+    return [
+        {'nome': 'Resumo', 'gid': 0, 'cabecalho': ['Mês', 'Total'], 'linhas': [['Janeiro', linhas]]},
+        {'nome': 'NPS D+1', 'gid': rng.randrange(10 ** 8, 2 * 10 ** 9), 'cabecalho': cabecalho(CABECALHO_D1), 'linhas': d1},
+        {'nome': 'NPS D+30', 'gid': rng.randrange(10 ** 8, 2 * 10 ** 9), 'cabecalho': cabecalho(CABECALHO_D30), 'linhas': d30},
+        {'nome': 'NPS Ruim', 'gid': rng.randrange(10 ** 8, 2 * 10 ** 9), 'cabecalho': cabecalho(CABECALHO_RUIM), 'linhas': ruim},
+    ]
+
+
+def _letra_coluna(indice):
+    """0 -> 'A', 27 -> 'AB'"""
+    letras = ''
+    indice += 1
+    while indice:
+        indice, resto = divmod(indice - 1, 26)
+        letras = chr(ord('A') + resto) + letras
+    return letras
+
+
+def _indice_coluna(letras):
+    """'A' -> 0, 'AB' -> 27"""
+    indice = 0
+    for letra in letras:
+        indice = indice * 26 + (ord(letra) - ord('A') + 1)
+    return indice - 1
+
+
+def _valor_numero(texto):
+    """Converte texto em int/float (None se não for número)"""
+    try:
+        numero = float(str(texto).strip())
+    except ValueError:
+        return None
+    return int(numero) if numero.is_integer() and '.' not in str(texto) else numero
+
+
+def _valor_data(texto):
+    """Converte dd/mm/aaaa ou aaaa-mm-dd em date (None se não for data)"""
+    for formato in ('%d/%m/%Y', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(str(texto).strip(), formato).date()
+        except ValueError:
+            continue
+    return None
+
+
+class ConsultaGviz:
+    """Subconjunto da linguagem de consulta gviz: select, where (and), limit e offset"""
+
+    PADRAO_CONDICAO = re.compile(
+        r"^(toDate\(\s*)?([A-Z]+)\s*\)?\s*(>=|<=|!=|=|>|<)\s*(date\s*'(\d{4}-\d{2}-\d{2})'|'([^']*)'|(-?[\d.]+))$",
+        re.IGNORECASE)
+
+    def __init__(self, texto):
+        texto = ' '.join((texto or '').split())
+        self.colunas = None
+        self.condicoes = []
+        self.limite = None
+        self.deslocamento = 0
+
+        match = re.match(r'^select\s+(.+?)(?=\s+where\s|\s+limit\s|\s+offset\s|$)', texto, re.IGNORECASE)
+        if not match:
+            raise ValueError(f"Consulta não suportada: {texto}")
+        if match.group(1).strip() != '*':
+            self.colunas = [_indice_coluna(c.strip().upper()) for c in match.group(1).split(',')]
+
+        match = re.search(r'\swhere\s+(.+?)(?=\s+limit\s|\s+offset\s|$)', texto, re.IGNORECASE)
+        if match:
+            for parte in re.split(r'\s+and\s+', match.group(1), flags=re.IGNORECASE):
+                condicao = self.PADRAO_CONDICAO.match(parte.strip())
+                if not condicao:
+                    raise ValueError(f"Condição não suportada: {parte}")
+                _, coluna, operador, _, data_txt, texto_txt, numero = condicao.groups()
+                if data_txt:
+                    valor = datetime.strptime(data_txt, '%Y-%m-%d').date()
+                elif texto_txt is not None:
+                    valor = texto_txt
+                else:
+                    valor = float(numero)
+                self.condicoes.append((_indice_coluna(coluna.upper()), operador, valor))
+
+        match = re.search(r'\slimit\s+(\d+)', texto, re.IGNORECASE)
+        if match:
+            self.limite = int(match.group(1))
+        match = re.search(r'\soffset\s+(\d+)', texto, re.IGNORECASE)
+        if match:
+            self.deslocamento = int(match.group(1))
+
+    def _atende(self, linha):
+        for indice, operador, valor in self.condicoes:
+            celula = linha[indice] if indice < len(linha) else ''
+            if isinstance(valor, date):
+                celula = _valor_data(celula)
+            elif isinstance(valor, float):
+                try:
+                    celula = float(celula)
+                except (TypeError, ValueError):
+                    celula = None
+            else:
+                celula = str(celula)
+            if celula is None:
+                return False
+            if not {'>=': celula >= valor, '<=': celula <= valor, '>': celula > valor,
+                    '<': celula < valor, '=': celula == valor, '!=': celula != valor}[operador]:
+                return False
+        return True
+
+    def aplicar(self, cabecalho, linhas):
+        """Retorna (cabecalho, linhas) depois de filtrar, paginar e projetar"""
+        resultado = [linha for linha in linhas if self._atende(linha)]
+        resultado = resultado[self.deslocamento:]
+        if self.limite is not None:
+            resultado = resultado[:self.limite]
+        if self.colunas is not None:
+            cabecalho = [cabecalho[i] for i in self.colunas]
+            resultado = [[linha[i] for i in self.colunas] for linha in resultado]
+        return cabecalho, resultado
+
+
+class ServidorPlanilhaLocal:
+    """Servidor HTTP em thread própria que imita os endpoints de exportação do Google Sheets"""
+
+    def __init__(self, planilhas=None, porta=0, latencia=0.0, jitter=0.0, taxa_erro=0.0,
+                 taxa_429=0.0, retry_after=1, validadores=True, semente=42,
+                 taxa_lenta=0.0, latencia_lenta=0.0, chave_api=None, listagem=True):
+        """
+        Args:
+            planilhas: dict sheet_id -> abas (ver gerar_planilha_sintetica); sem ele,
+                       qualquer sheet_id recebe a planilha sintética padrão
+            porta: porta TCP (0 = escolhe uma livre)
+            latencia / jitter: atraso fixo e variação aleatória de cada resposta (segundos)
+            taxa_erro: fração de respostas HTTP 500
+            taxa_429: fração de respostas HTTP 429 (com Retry-After)
+            taxa_lenta / latencia_lenta: fração de respostas com atraso extra (cauda longa)
+            validadores: envia ETag/Last-Modified e responde 304 a requisições condicionais
+            chave_api: chave exigida pelo values:batchGet (None = aceita qualquer uma)
+            listagem: False = htmlview responde 404 (planilha sem a página com a lista de abas)
+        """
+        self.planilhas = dict(planilhas or {})
+        self.planilha_padrao = gerar_planilha_sintetica(semente=semente) if not planilhas else None
+        self.porta = porta
+        self.latencia = latencia
+        self.jitter = jitter
+        self.taxa_erro = taxa_erro
+        self.taxa_429 = taxa_429
+        self.retry_after = retry_after
+        self.taxa_lenta = taxa_lenta
+        self.latencia_lenta = latencia_lenta
+        self.validadores = validadores
+        self.chave_api = chave_api
+        self.listagem = listagem
+
+        self._rng = random.Random(semente)
+        self._lock = threading.Lock()
+        self._servidor = None
+        self._thread = None
+        self.zerar_contadores()
+
+    # === CICLO DE VIDA ===
+
+    def iniciar(self):
+        """Sobe o servidor em background e retorna a url_base para o analisador"""
+        fixture = self
+
+        class Manipulador(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                fixture._atender(self)
+
+            def log_message(self, *args):
+                pass
+
+        class Servidor(ThreadingHTTPServer):
+            daemon_threads = True
+
+            def handle_error(self, request, client_address):
+                # Sonda que fecha a conexão no meio da resposta não é erro do servidor
+                if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+                    super().handle_error(request, client_address)
+
+        self._servidor = Servidor(('127.0.0.1', self.porta), Manipulador)
+        self.porta = self._servidor.server_address[1]
+        self._thread = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url_base
+
+    def parar(self):
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, *args):
+        self.parar()
+
+    @property
+    def url_base(self):
+        return f"http://127.0.0.1:{self.porta}/spreadsheets/d"
+
+    @property
+    def url_api(self):
+        return f"http://127.0.0.1:{self.porta}/v4/spreadsheets"
+
+    def url_planilha(self, sheet_id):
+        """URL de edição no formato que o usuário cola na interface"""
+        return f"{self.url_base}/{sheet_id}/edit#gid=0"
+
+    # === CONTADORES ===
+
+    def zerar_contadores(self):
+        with self._lock:
+            self.requisicoes = {}
+            self.bytes_enviados = 0
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'requisicoes': sum(self.requisicoes.values()),
+                'por_endpoint': dict(self.requisicoes),
+                'bytes_enviados': self.bytes_enviados
+            }
+
+    # === RESPOSTAS ===
+
+    def _abas(self, sheet_id):
+        return self.planilhas.get(sheet_id, self.planilha_padrao)
+
+    def _sortear(self, taxa):
+        if taxa <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < taxa
+
+    def _responder(self, manipulador, status, corpo=b'', tipo='text/plain; charset=utf-8', cabecalhos=None):
+        if isinstance(corpo, str):
+            corpo = corpo.encode('utf-8')
+        manipulador.send_response(status)
+        manipulador.send_header('Content-Type', tipo)
+        manipulador.send_header('Content-Length', str(len(corpo)))
+        for nome, valor in (cabecalhos or {}).items():
+            manipulador.send_header(nome, valor)
+        manipulador.end_headers()
+        manipulador.wfile.write(corpo)
+        with self._lock:
+            self.bytes_enviados += len(corpo)
+
+    def _pagina_erro(self, manipulador, status=400):
+        """Página HTML como a que o Google devolve para aba/planilha inexistente"""
+        self._responder(manipulador, status,
+                        '<!DOCTYPE html><html><head><title>Google Sheets - Erro</title></head>'
+                        '<body>Sorry, unable to open the file at this time.</body></html>',
+                        tipo='text/html; charset=utf-8')
+
+    def _csv(self, cabecalho, linhas, citar_tudo=False):
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer, quoting=csv.QUOTE_ALL if citar_tudo else csv.QUOTE_MINIMAL,
+                              lineterminator='\n')
+        escritor.writerow(cabecalho)
+        escritor.writerows(linhas)
+        return buffer.getvalue().encode('utf-8')
+
+    def _json_gviz(self, cabecalho, linhas):
+        """Resposta gviz out:json: tipo de cada coluna inferido como o Sheets faria (number/date/string)"""
+        colunas, conversores = [], []
+        for indice, rotulo in enumerate(cabecalho):
+            valores = [str(linha[indice]) for linha in linhas if indice < len(linha) and str(linha[indice]) != '']
+            if valores and all(_valor_numero(v) is not None for v in valores):
+                tipo, conversor = 'number', _valor_numero
+            elif valores and all(_valor_data(v) is not None for v in valores):
+                tipo = 'date'
+
+                def conversor(texto):
+                    data = _valor_data(texto)
+                    return f"Date({data.year},{data.month - 1},{data.day})"
+            else:
+                tipo, conversor = 'string', str
+            colunas.append({'id': _letra_coluna(indice), 'label': str(rotulo), 'type': tipo})
+            conversores.append(conversor)
+
+        linhas_json = []
+        for linha in linhas:
+            celulas = []
+            for indice, conversor in enumerate(conversores):
+                valor = linha[indice] if indice < len(linha) else ''
+                if str(valor) == '':
+                    celulas.append(None)
+                elif conversor is str:
+                    celulas.append({'v': str(valor)})
+                else:
+                    celulas.append({'v': conversor(valor), 'f': str(valor)})
+            linhas_json.append({'c': celulas})
+
+        resposta = {'version': '0.6', 'reqId': '0', 'status': 'ok',
+                    'table': {'cols': colunas, 'rows': linhas_json, 'parsedNumHeaders': 1}}
+        corpo = json.dumps(resposta, ensure_ascii=False, separators=(',', ':'))
+        return f"/*O_o*/\ngoogle.visualization.Query.setResponse({corpo});".encode('utf-8')
+
+    def _responder_csv(self, manipulador, corpo):
+        cabecalhos = {}
+        if self.validadores:
+            etag = '"' + hashlib.md5(corpo).hexdigest() + '"'
+            if manipulador.headers.get('If-None-Match') == etag:
+                self._responder(manipulador, 304, b'', cabecalhos={'ETag': etag})
+                return
+            cabecalhos['ETag'] = etag
+            cabecalhos['Last-Modified'] = 'Wed, 01 Jan 2025 00:00:00 GMT'
+        self._responder(manipulador, 200, corpo, tipo='text/csv; charset=utf-8', cabecalhos=cabecalhos)
+
+    def _atender(self, manipulador):
+        url = urlparse(manipulador.path)
+        parametros = {chave: valores[0] for chave, valores in parse_qs(url.query).items()}
+        match = (re.match(r'^/spreadsheets/d/([^/]+)/(export|gviz/tq|htmlview)$', url.path) or
+                 re.match(r'^/v4/spreadsheets/([^/]+)/(values:batchGet)$', url.path))
+        endpoint = match.group(2) if match else 'desconhecido'
+
+        with self._lock:
+            self.requisicoes[endpoint] = self.requisicoes.get(endpoint, 0) + 1
+
+        atraso = self.latencia + (self._rng.uniform(0, self.jitter) if self.jitter else 0)
+        if self._sortear(self.taxa_lenta):
+            atraso += self.latencia_lenta
+        if atraso:
+            time.sleep(atraso)
+
+        if self._sortear(self.taxa_429):
+            self._responder(manipulador, 429, 'Too Many Requests', cabecalhos={'Retry-After': str(self.retry_after)})
+            return
+        if self._sortear(self.taxa_erro):
+            self._responder(manipulador, 500, 'Internal Server Error')
+            return
+
+        abas = self._abas(match.group(1)) if match else None
+        if not abas:
+            self._pagina_erro(manipulador, 404)
+            return
+
+        if endpoint == 'htmlview':
+            if not self.listagem:
+                self._pagina_erro(manipulador, 404)
+                return
+            self._responder_htmlview(manipulador, abas)
+        elif endpoint == 'export':
+            self._responder_export(manipulador, abas, parametros)
+        elif endpoint == 'values:batchGet':
+            # ranges se repete na consulta: aqui vale a lista completa
+            self._responder_valores(manipulador, match.group(1), abas, parse_qs(url.query))
+        else:
+            self._responder_gviz(manipulador, abas, parametros)
+
+    def _localizar_aba(self, abas, gid=None, nome=None):
+        for aba in abas:
+            if gid is not None and str(aba['gid']) == str(gid):
+                return aba
+            if nome is not None and aba['nome'] == nome:
+                return aba
+        return None
+
+    def _responder_htmlview(self, manipulador, abas):
+        itens = ''.join(
+            f'items.push({{name: "{aba["nome"]}", pageUrl: "htmlview/sheet?gid={aba["gid"]}", '
+            f'gid: "{aba["gid"]}",initialSheet: {str(i == 0).lower()}}});'
+            for i, aba in enumerate(abas))
+        self._responder(manipulador, 200, f'<html><body><script>var items = [];{itens}</script></body></html>',
+                        tipo='text/html; charset=utf-8')
+
+    def _responder_export(self, manipulador, abas, parametros):
+        formato = parametros.get('format', 'csv')
+        if formato == 'xlsx':
+            self._responder_xlsx(manipulador, abas)
+            return
+
+        aba = self._localizar_aba(abas, gid=parametros.get('gid', 0))
+        if aba is None or formato != 'csv':
+            self._pagina_erro(manipulador)
+            return
+        self._responder_csv(manipulador, self._csv(aba['cabecalho'], aba['linhas']))
+
+    def _responder_xlsx(self, manipulador, abas):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            self._pagina_erro(manipulador, 501)
+            return
+
+        workbook = Workbook(write_only=True)
+        for aba in abas:
+            worksheet = workbook.create_sheet(aba['nome'])
+            worksheet.append(aba['cabecalho'])
+            for linha in aba['linhas']:
+                worksheet.append(linha)
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        self._responder(manipulador, 200, buffer.getvalue(),
+                        tipo='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+
+    def _responder_gviz(self, manipulador, abas, parametros):
+        aba = self._localizar_aba(abas, gid=parametros.get('gid'), nome=parametros.get('sheet'))
+        if aba is None and 'gid' not in parametros and 'sheet' not in parametros:
+            aba = abas[0]
+        if aba is None:
+            self._pagina_erro(manipulador)
+            return
+
+        cabecalho, linhas = aba['cabecalho'], aba['linhas']
+        if parametros.get('tq'):
+            try:
+                cabecalho, linhas = ConsultaGviz(parametros['tq']).aplicar(cabecalho, linhas)
+            except ValueError as e:
+                self._responder(manipulador, 400, str(e))
+                return
+
+        formato = parametros.get('tqx', 'out:csv').split(':', 1)[-1]
+        if formato == 'json':
+            self._responder(manipulador, 200, self._json_gviz(cabecalho, linhas),
+                            tipo='application/javascript; charset=utf-8')
+            return
+        if formato != 'csv':
+            self._pagina_erro(manipulador)
+            return
+        self._responder_csv(manipulador, self._csv(cabecalho, linhas, citar_tudo=True))
+
+    def _erro_api(self, manipulador, status, mensagem, situacao):
+        """Erro no formato JSON da Sheets API"""
+        corpo = json.dumps({'error': {'code': status, 'message': mensagem, 'status': situacao}})
+        self._responder(manipulador, status, corpo, tipo='application/json; charset=UTF-8')
+
+    def _responder_valores(self, manipulador, sheet_id, abas, parametros):
+        if self.chave_api and parametros.get('key', [None])[0] != self.chave_api:
+            self._erro_api(manipulador, 403, 'The request is missing a valid API key.', 'PERMISSION_DENIED')
+            return
+
+        intervalos = []
+        for intervalo in parametros.get('ranges', []):
+            nome = intervalo.split('!', 1)[0]
+            if len(nome) > 1 and nome[0] == nome[-1] == "'":
+                nome = nome[1:-1].replace("''", "'")
+            aba = self._localizar_aba(abas, nome=nome)
+            if aba is None:
+                # Um intervalo inválido recusa o lote inteiro, como na API real
+                self._erro_api(manipulador, 400, f"Unable to parse range: {intervalo}", 'INVALID_ARGUMENT')
+                return
+
+            # Células como texto, sem as vazias do fim de cada linha
+            valores = []
+            for linha in [aba['cabecalho']] + aba['linhas']:
+                celulas = ['' if valor is None else str(valor) for valor in linha]
+                while celulas and celulas[-1] == '':
+                    celulas.pop()
+                valores.append(celulas)
+            intervalos.append({
+                'range': f"'{aba['nome']}'!A1:{_letra_coluna(len(aba['cabecalho']) - 1)}{len(valores)}",
+                'majorDimension': 'ROWS',
+                'values': valores
+            })
+
+        corpo = json.dumps({'spreadsheetId': sheet_id, 'valueRanges': intervalos}, ensure_ascii=False)
+        self._responder(manipulador, 200, corpo, tipo='application/json; charset=UTF-8')
+
+
+def executar_benchmark(linhas=2000, latencia=0.02, taxa_429=0.0, taxa_erro=0.0,
+                       taxa_lenta=0.0, latencia_lenta=0.0):
+    """Roda cada estratégia de descoberta e a extração completa contra o servidor local"""
+    import tempfile
+    from analisador_nps_completo import AnalisadorNPSCompleto, ESTRATEGIAS_DESCOBERTA
+    from sessao_http import SessaoHTTP
+    from limitador_google import LimitadorGoogle
+    from latencias_http import LatenciasEndpoints
+
+    # Cache, índice, cache negativo, esquemas e estatísticas próprios num diretório
+    # temporário: o benchmark não lê nem altera o cache/ do projeto
+    diretorio_cache = tempfile.mkdtemp(prefix='benchmark_nps_')
+
+    planilha = gerar_planilha_sintetica(linhas=linhas)
+    resultados = []
+    # Latências medidas ao longo de todo o benchmark (timeouts adaptativos e hedge)
+    latencias = LatenciasEndpoints()
+    sessoes = []
+
+    with ServidorPlanilhaLocal(latencia=latencia, taxa_429=taxa_429, taxa_erro=taxa_erro,
+                               taxa_lenta=taxa_lenta, latencia_lenta=latencia_lenta) as servidor:
+        servidor.planilha_padrao = planilha
+
+        def novo_analisador():
+            sessao = SessaoHTTP(limitador=LimitadorGoogle(), latencias=latencias)
+            sessoes.append(sessao)
+            return AnalisadorNPSCompleto('Benchmark', url_base=servidor.url_base, sessao=sessao,
+                                         diretorio_cache=diretorio_cache)
+
+        # Estratégias sem o pacote opcional instalado (ex.: XLSX sem openpyxl) ficam de fora
+        disponiveis = novo_analisador()._estrategias_disponiveis()
+        for numero, (codigo, (descricao, metodo, _)) in enumerate(disponiveis.items()):
+            analisador = novo_analisador()
+            sheet_id = f"BENCH{numero}"
+            analisador._sheet_id_atual = sheet_id
+            servidor.zerar_contadores()
+            inicio = time.time()
+            abas = getattr(analisador, metodo)(sheet_id)
+            analisador._materializar_abas(abas)
+            resultados.append((f"{codigo} {descricao}", sorted(abas), time.time() - inicio, servidor.get_stats()))
+
+        # Buscas por nome com o JSON tipado do gviz no lugar do CSV
+        for numero, codigo in enumerate(('1.7', '2')):
+            descricao, metodo, _ = ESTRATEGIAS_DESCOBERTA[codigo]
+            analisador = novo_analisador()
+            analisador.formato_gviz = 'json'
+            sheet_id = f"BENCHJSON{numero}"
+            analisador._sheet_id_atual = sheet_id
+            servidor.zerar_contadores()
+            inicio = time.time()
+            abas = getattr(analisador, metodo)(sheet_id)
+            analisador._materializar_abas(abas)
+            resultados.append((f"{codigo} {descricao} (json)", sorted(abas), time.time() - inicio,
+                               servidor.get_stats()))
+
+        # As 3 abas num único values:batchGet da Sheets API
+        analisador = novo_analisador()
+        analisador.api_key = 'BENCHMARK'
+        analisador.url_api = servidor.url_api
+        analisador._sheet_id_atual = 'BENCHAPI'
+        servidor.zerar_contadores()
+        inicio = time.time()
+        abas = analisador._extrair_via_api_valores('BENCHAPI')
+        resultados.append(("API values:batchGet", sorted(abas), time.time() - inicio, servidor.get_stats()))
+
+        for rotulo in ('extração completa (fria)', 'extração completa (índice/cache)'):
+            analisador = novo_analisador()
+            servidor.zerar_contadores()
+            inicio = time.time()
+            analisador._extrair_abas_automaticamente(servidor.url_planilha('BENCHFULL'))
+            resultados.append((rotulo, sorted(analisador.dados_abas), time.time() - inicio, servidor.get_stats()))
+
+    print()
+    print(f"BENCHMARK - {linhas} linhas por aba, latência {latencia * 1000:.0f}ms, "
+          f"429 {taxa_429 * 100:.0f}%, erro {taxa_erro * 100:.0f}%, "
+          f"lentas {taxa_lenta * 100:.0f}% (+{latencia_lenta:.1f}s)")
+    print("=" * 96)
+    for rotulo, abas, segundos, stats in resultados:
+        print(f"{rotulo:<40} {len(abas)} abas | {stats['requisicoes']:>4} req | "
+              f"{stats['bytes_enviados'] / 1024:>8.0f} KB | {segundos:>6.2f}s")
+    print("-" * 96)
+    for endpoint, percentis in latencias.resumo().items():
+        print(f"{endpoint:<56} {percentis['amostras']:>4} medições | p50 {percentis['p50']:.3f}s | "
+              f"p95 {percentis['p95']:.3f}s | p99 {percentis['p99']:.3f}s")
+    print(f"Hedges: {sum(s.total_hedges for s in sessoes)} disparados, "
+          f"{sum(s.hedges_vencedores for s in sessoes)} venceram a requisição original")
+    return resultados
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Servidor local imitando o Google Sheets / benchmark da extração")
+    parser.add_argument('--servir', action='store_true', help="só sobe o servidor (Ctrl+C para parar)")
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--linhas', type=int, default=2000)
+    parser.add_argument('--latencia', type=float, default=0.02)
+    parser.add_argument('--taxa-429', type=float, default=0.0)
+    parser.add_argument('--taxa-erro', type=float, default=0.0)
+    parser.add_argument('--taxa-lenta', type=float, default=0.0)
+    parser.add_argument('--latencia-lenta', type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.servir:
+        servidor = ServidorPlanilhaLocal(porta=args.porta, latencia=args.latencia,
+                                         taxa_429=args.taxa_429, taxa_erro=args.taxa_erro,
+                                         taxa_lenta=args.taxa_lenta, latencia_lenta=args.latencia_lenta)
+        servidor.planilha_padrao = gerar_planilha_sintetica(linhas=args.linhas)
+        print(f"Servidor local em {servidor.iniciar()}")
+        print(f"Use NPS_SHEETS_URL_BASE={servidor.url_base}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            servidor.parar()
+    else:
+        executar_benchmark(args.linhas, args.latencia, args.taxa_429, args.taxa_erro,
+                           args.taxa_lenta, args.latencia_lenta)
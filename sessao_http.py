@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Sessão HTTP - Pool de conexões keep-alive compartilhado para o Google Sheets
+Data: 16/10/2026
+"""
+
+import os
+import time
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
+from limitador_google import limitador_google
+from latencias_http import latencias_http
+
+# User-Agent usado em todas as chamadas ao Google Sheets
+USER_AGENT_PADRAO = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Percentil de latência do endpoint a partir do qual get_com_hedge dispara a cópia
+PERCENTIL_HEDGE = float(os.getenv('NPS_HEDGE_PERCENTIL', 95))
+
+
+def _fechar_resposta(futuro):
+    """Devolve ao pool a conexão de uma resposta que perdeu o hedge"""
+    if not futuro.cancelled() and futuro.exception() is None:
+        futuro.result().close()
+
+
+class SessaoHTTP:
+    """Sessão requests thread-safe que reaproveita conexões entre estratégias e threads"""
+
+    def __init__(self, pool_conexoes=None, pool_maximo=None, headers=None, limitador=None, latencias=None):
+        # Número de hosts distintos mantidos no pool (docs.google.com, googleusercontent...)
+        self.pool_conexoes = int(pool_conexoes or os.getenv('NPS_HTTP_POOL_HOSTS', 4))
+        # Conexões keep-alive por host - deve cobrir NPS_MAX_CONCORRENCIA
+        self.pool_maximo = int(pool_maximo or os.getenv('NPS_HTTP_POOL_MAXIMO', 16))
+        self.headers = {
+            'User-Agent': USER_AGENT_PADRAO,
+            'Connection': 'keep-alive',
+        }
+        self.headers.update(headers or {})
+        # Taxa por host, backoff em 429/503 e circuit breaker por planilha
+        self.limitador = limitador or limitador_google
+        # Percentis por endpoint (timeouts adaptativos e atraso do hedge)
+        self.latencias = latencias or latencias_http
+
+        self._sessao = None
+        self._executor_hedge = None
+        self._lock = threading.Lock()
+        self.total_requisicoes = 0
+        self.total_hedges = 0
+        self.hedges_vencedores = 0
+
+    def _obter_sessao(self):
+        """Cria a sessão na primeira chamada (uma única vez, mesmo com várias threads)"""
+        if self._sessao is None:
+            with self._lock:
+                if self._sessao is None:
+                    sessao = requests.Session()
+                    adaptador = HTTPAdapter(
+                        pool_connections=self.pool_conexoes,
+                        pool_maxsize=self.pool_maximo,
+                        max_retries=0  # Retentativas são decididas por quem chama
+                    )
+                    sessao.mount('https://', adaptador)
+                    sessao.mount('http://', adaptador)
+                    sessao.headers.update(self.headers)
+                    self._sessao = sessao
+        return self._sessao
+
+    def _requisitar(self, metodo, url, prazo=None, **kwargs):
+        """
+        Chamada passando pelo limitador (pode levantar CircuitoAbertoError)
+
+        Com prazo (time.time() limite), esperas do limitador que passariam dele
+        levantam PrazoEsgotadoError em vez de dormir.
+        """
+        def requisicao():
+            with self._lock:
+                self.total_requisicoes += 1
+            inicio = time.perf_counter()
+            try:
+                resposta = self._obter_sessao().request(metodo, url, **kwargs)
+            except requests.Timeout:
+                # A latência real passou do timeout: conta o timeout como medição
+                if isinstance(kwargs.get('timeout'), (int, float)):
+                    self.latencias.registrar(url, kwargs['timeout'])
+                raise
+            self.latencias.registrar(url, time.perf_counter() - inicio)
+            return resposta
+
+        return self.limitador.executar(url, requisicao, prazo=prazo)
+
+    def get(self, url, **kwargs):
+        """GET usando uma conexão do pool"""
+        return self._requisitar('GET', url, **kwargs)
+
+    def get_com_hedge(self, url, ao_duplicar=None, **kwargs):
+        """
+        GET com cópia atrasada (hedge) para a cauda de latência do endpoint
+
+        Se a resposta não chegar até o p95 do endpoint, dispara a mesma requisição
+        de novo e fica com a que responder primeiro; a outra é fechada quando
+        terminar. Sem medições suficientes do endpoint é um GET comum.
+
+        Args:
+            ao_duplicar: callback() -> bool chamado antes da cópia (False = não duplicar)
+        """
+        atraso = self.latencias.percentil(url, PERCENTIL_HEDGE)
+        if atraso is None:
+            return self.get(url, **kwargs)
+
+        executor = self._obter_executor_hedge()
+        primeira = executor.submit(self.get, url, **kwargs)
+        if wait([primeira], timeout=atraso).done or (ao_duplicar is not None and not ao_duplicar()):
+            return primeira.result()
+
+        copia = executor.submit(self.get, url, **kwargs)
+        with self._lock:
+            self.total_hedges += 1
+
+        pendentes = {primeira, copia}
+        erro = None
+        while pendentes:
+            concluidas, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            vencedoras = [futuro for futuro in concluidas if futuro.exception() is None]
+            if vencedoras:
+                vencedora = primeira if primeira in vencedoras else vencedoras[0]
+                perdedora = copia if vencedora is primeira else primeira
+                perdedora.add_done_callback(_fechar_resposta)
+                if vencedora is copia:
+                    with self._lock:
+                        self.hedges_vencedores += 1
+                return vencedora.result()
+            erro = erro or next(iter(concluidas)).exception()
+        raise erro
+
+    def _obter_executor_hedge(self):
+        """Pool das requisições com hedge (criado na primeira chamada)"""
+        if self._executor_hedge is None:
+            with self._lock:
+                if self._executor_hedge is None:
+                    self._executor_hedge = ThreadPoolExecutor(max_workers=self.pool_maximo,
+                                                              thread_name_prefix='hedge')
+        return self._executor_hedge
+
+    def head(self, url, **kwargs):
+        """HEAD usando uma conexão do pool"""
+        kwargs.setdefault('allow_redirects', False)
+        return self._requisitar('HEAD', url, **kwargs)
+
+    def fechar(self):
+        """Fecha todas as conexões do pool"""
+        with self._lock:
+            if self._sessao is not None:
+                self._sessao.close()
+                self._sessao = None
+            if self._executor_hedge is not None:
+                self._executor_hedge.shutdown(wait=False)
+                self._executor_hedge = None
+
+
+# Instância global compartilhada (analisador, servidor e scripts)
+sessao_http = SessaoHTTP()
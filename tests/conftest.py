@@ -0,0 +1,81 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_negativo import cache_negativo
+from cache_manager import cache_manager
+from indice_abas import indice_abas
+from esquemas_leitura import esquemas_leitura
+from estatisticas_estrategias import estatisticas_estrategias
+from servidor_planilha_local import ServidorPlanilhaLocal, gerar_planilha_sintetica
+from sessao_http import SessaoHTTP
+from limitador_google import LimitadorGoogle
+from latencias_http import LatenciasEndpoints
+from analisador_nps_completo import AnalisadorNPSCompleto
+
+
+@pytest.fixture(autouse=True)
+def caches_isolados(tmp_path, monkeypatch):
+    """Cada teste grava cache/ num diretório temporário e começa com as memórias vazias"""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('cache')
+    monkeypatch.setattr(cache_negativo, '_entradas', {})
+    monkeypatch.setattr(cache_negativo, 'acertos', 0)
+    monkeypatch.setattr(cache_negativo, 'falhas', 0)
+    monkeypatch.setattr(indice_abas, '_indice', {})
+    monkeypatch.setattr(esquemas_leitura, '_esquemas', {})
+    monkeypatch.setattr(estatisticas_estrategias, '_dados', {'geral': {}, 'planilhas': {}})
+    monkeypatch.setattr(cache_manager, 'ttl_validacao_seconds', 0)
+    monkeypatch.delenv('GOOGLE_SHEETS_API_KEY', raising=False)
+
+
+@pytest.fixture
+def planilha():
+    return gerar_planilha_sintetica(linhas=300)
+
+
+@pytest.fixture
+def servidor(planilha):
+    with ServidorPlanilhaLocal(planilhas={'PLANILHA': planilha}, chave_api='CHAVE') as servidor:
+        yield servidor
+
+
+@pytest.fixture
+def novo_analisador(servidor):
+    """Analisador com sessão própria apontando para o servidor local"""
+    sessoes = []
+
+    def criar(**kwargs):
+        # Taxa alta: o servidor local não limita e a força bruta não deve levar segundos
+        sessao = SessaoHTTP(limitador=LimitadorGoogle(taxa=1000, rajada=1000), latencias=LatenciasEndpoints())
+        sessoes.append(sessao)
+        return AnalisadorNPSCompleto('Teste', url_base=servidor.url_base, sessao=sessao, **kwargs)
+
+    yield criar
+    for sessao in sessoes:
+        sessao.fechar()
+
+
+@pytest.fixture
+def extrair(servidor):
+    """extrair(analisador, sheet_id, **kwargs) -> (sucesso, requisicoes feitas ao servidor)"""
+    def extrair(analisador, sheet_id='PLANILHA', **kwargs):
+        servidor.zerar_contadores()
+        sucesso = analisador._extrair_abas_automaticamente(servidor.url_planilha(sheet_id), **kwargs)
+        return sucesso, servidor.get_stats()['requisicoes']
+
+    return extrair
+
+
+@pytest.fixture
+def apagar_cache_planilhas():
+    """apagar_cache_planilhas() remove os dados das planilhas em cache (índice e demais memórias ficam)"""
+    def apagar():
+        for arquivo in os.listdir('cache'):
+            if arquivo.endswith('.cache'):
+                os.remove(os.path.join('cache', arquivo))
+
+    return apagar
@@ -0,0 +1,59 @@
+"""Análise em lote de várias lojas contra o servidor local"""
+
+import pytest
+
+from analise_lote import analisar_lote, consolidar_resultados
+from limitador_google import LimitadorGoogle
+from servidor_planilha_local import ServidorPlanilhaLocal, gerar_planilha_sintetica
+from sessao_http import sessao_http
+
+
+@pytest.fixture
+def servidor_lojas(monkeypatch):
+    planilhas = {'CENTRO': gerar_planilha_sintetica(linhas=200, semente=1, loja='MDO Centro'),
+                 'NORTE': gerar_planilha_sintetica(linhas=120, semente=2, loja='MDO Norte')}
+    with ServidorPlanilhaLocal(planilhas=planilhas) as servidor:
+        # analisar_loja usa a sessão global: aponta para o servidor local, sem limitar a taxa
+        monkeypatch.setenv('NPS_SHEETS_URL_BASE', servidor.url_base)
+        monkeypatch.setattr(sessao_http, 'limitador', LimitadorGoogle(taxa=1000, rajada=1000))
+        yield servidor
+
+
+def test_lote_preserva_ordem_e_consolida(servidor_lojas):
+    lojas = [('Centro', servidor_lojas.url_planilha('CENTRO')),
+             {'loja_nome': 'Inexistente', 'sheets_url': servidor_lojas.url_planilha('NAO_EXISTE')},
+             ('Norte', servidor_lojas.url_planilha('NORTE'))]
+    progresso = []
+
+    lote = analisar_lote(lojas, max_concorrencia=3, progress_callback=lambda *args: progresso.append(args))
+
+    # Resultados na ordem de entrada, mesmo concluindo fora de ordem
+    assert [r['loja_nome'] for r in lote['resultados']] == ['Centro', 'Inexistente', 'Norte']
+    centro, inexistente, norte = lote['resultados']
+    assert centro['success'] and norte['success']
+    assert not inexistente['success'] and inexistente['error']
+    assert len(progresso) == 3 and progresso[-1][:2] == (3, 3)
+
+    resumo = lote['resumo']
+    assert (resumo['total_lojas'], resumo['sucessos'], resumo['falhas']) == (3, 2, 1)
+    assert resumo['lojas_com_falha'][0]['loja_nome'] == 'Inexistente'
+    assert resumo['total_registros'] == centro['dados']['total_registros'] + norte['dados']['total_registros']
+    # NPS médio ponderado pelas respostas de cada loja
+    pesos = centro['dados']['total_respostas'], norte['dados']['total_respostas']
+    esperado = (centro['dados']['nps_score'] * pesos[0] + norte['dados']['nps_score'] * pesos[1]) / sum(pesos)
+    assert resumo['nps_medio_ponderado'] == round(esperado, 1)
+    assert [item['nps_score'] for item in resumo['ranking']] == sorted(
+        (centro['dados']['nps_score'], norte['dados']['nps_score']), reverse=True)
+
+
+def test_excecao_na_analise_vira_falha_da_loja():
+    def analisar(loja_nome, *args):
+        if loja_nome == 'B':
+            raise RuntimeError('planilha corrompida')
+        return {'success': True, 'dados': {'nps_score': 50, 'total_respostas': 10, 'total_registros': 12}}
+
+    lote = analisar_lote([('A', 'url-a'), ('B', 'url-b')], analisar=analisar)
+
+    assert lote['resultados'][1] == {**lote['resultados'][1], 'success': False, 'loja_nome': 'B'}
+    assert 'planilha corrompida' in lote['resultados'][1]['error']
+    assert consolidar_resultados(lote['resultados'])['nps_medio_ponderado'] == 50
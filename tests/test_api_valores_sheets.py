@@ -0,0 +1,36 @@
+"""values:batchGet da Sheets API contra o servidor local: as 3 abas numa única chamada"""
+
+ABAS = ['NPS_D1', 'NPS_D30', 'NPS_Ruim']
+
+
+def test_batchget_traz_as_tres_abas_numa_requisicao(servidor, novo_analisador, extrair):
+    analisador = novo_analisador(api_key='CHAVE', url_api=servidor.url_api)
+    sucesso, requisicoes = extrair(analisador)
+
+    assert sucesso
+    assert requisicoes == 1
+    assert servidor.get_stats()['por_endpoint'] == {'values:batchGet': 1}
+    assert sorted(analisador.dados_abas) == ABAS
+    assert analisador.dados_abas['NPS_D1'].attrs['origem']['aba'] == 'NPS D+1'
+
+
+def test_batchget_tem_os_mesmos_tipos_do_csv(servidor, novo_analisador, extrair, apagar_cache_planilhas):
+    via_csv = novo_analisador()
+    extrair(via_csv)
+    apagar_cache_planilhas()
+    via_api = novo_analisador(api_key='CHAVE', url_api=servidor.url_api)
+    extrair(via_api)
+
+    for tipo in ABAS:
+        assert list(via_api.dados_abas[tipo].columns) == list(via_csv.dados_abas[tipo].columns)
+        assert via_api.dados_abas[tipo].shape == via_csv.dados_abas[tipo].shape
+
+
+def test_batchget_chave_invalida_cai_nas_estrategias(servidor, novo_analisador, extrair):
+    analisador = novo_analisador(api_key='ERRADA', url_api=servidor.url_api)
+    sucesso, requisicoes = extrair(analisador)
+
+    assert sucesso
+    assert sorted(analisador.dados_abas) == ABAS
+    assert servidor.get_stats()['por_endpoint']['values:batchGet'] == 1
+    assert requisicoes > 1
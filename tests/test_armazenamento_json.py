@@ -0,0 +1,28 @@
+"""Leitura e gravação atômica das memórias em cache/"""
+
+import os
+
+from armazenamento_json import carregar_json, salvar_json
+from indice_abas import IndiceAbas
+
+
+def test_grava_sem_temporario_e_le_de_volta(tmp_path):
+    arquivo = str(tmp_path / 'novo' / 'memoria.json')
+    assert carregar_json(arquivo, 'memória', padrao=[]) == []
+
+    assert salvar_json(arquivo, {'planilha': {'aba': 'Avaliação'}}, 'memória')
+    assert os.listdir(tmp_path / 'novo') == ['memoria.json']
+    assert carregar_json(arquivo, 'memória') == {'planilha': {'aba': 'Avaliação'}}
+
+
+def test_arquivo_corrompido_vira_memoria_vazia(tmp_path, capsys):
+    arquivo = tmp_path / 'indice.json'
+    arquivo.write_text('{"PLANILHA": {', encoding='utf-8')
+
+    indice = IndiceAbas(str(arquivo))
+
+    assert indice.obter('PLANILHA') == {}
+    assert 'Erro ao ler índice de abas' in capsys.readouterr().out
+    # A próxima gravação substitui o arquivo corrompido
+    indice.registrar('PLANILHA', {'NPS_D1': {'gid': 7, 'aba': None, 'assinatura': 'x'}})
+    assert IndiceAbas(str(arquivo)).obter('PLANILHA')['NPS_D1']['gid'] == 7
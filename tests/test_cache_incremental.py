@@ -0,0 +1,70 @@
+"""Atualização incremental do cache: só as respostas novas são baixadas"""
+
+import pandas as pd
+
+from esquemas_leitura import esquemas_leitura
+from indice_abas import assinatura_cabecalho
+
+
+def _aba(planilha, nome):
+    return next(aba for aba in planilha if aba['nome'] == nome)
+
+
+def test_delta_anexa_somente_linhas_novas(servidor, planilha, novo_analisador, extrair):
+    extrair(novo_analisador())
+    aba = _aba(planilha, 'NPS D+1')
+    total = len(aba['linhas'])
+    aba['linhas'].append(list(aba['linhas'][-1]))
+
+    analisador = novo_analisador()
+    sucesso, _ = extrair(analisador)
+
+    assert sucesso
+    assert len(analisador.dados_abas['NPS_D1']) == total + 1
+    stats = servidor.get_stats()['por_endpoint']
+    assert 'htmlview' not in stats
+    # Validadores da aba atualizada permitem detectar a próxima edição
+    assert analisador.dados_abas['NPS_D1'].attrs.get('validadores')
+
+
+def test_delta_linha_antiga_editada_extrai_de_novo(planilha, novo_analisador, extrair):
+    extrair(novo_analisador())
+    aba = _aba(planilha, 'NPS D+1')
+    coluna = aba['cabecalho'].index('Vendedor')
+    aba['linhas'][5][coluna] = 'EDITADO'
+
+    analisador = novo_analisador()
+    sucesso, _ = extrair(analisador)
+
+    assert sucesso
+    assert analisador.dados_abas['NPS_D1']['Vendedor'].iloc[5] == 'EDITADO'
+
+
+def _aba_xlsx(planilha, nome):
+    """Aba como a estratégia XLSX entrega: data como datetime e avaliação como int"""
+    aba = _aba(planilha, nome)
+    df = pd.DataFrame([linha[:] for linha in aba['linhas']], columns=aba['cabecalho'])
+    df['Data'] = pd.to_datetime(df['Data'], format='%d/%m/%Y')
+    df.attrs = {'origem': {'gid': None, 'aba': nome}, 'formato': 'xlsx'}
+    return df
+
+
+def test_aba_do_xlsx_fica_fora_do_delta(servidor, planilha, novo_analisador):
+    analisador = novo_analisador()
+    servidor.zerar_contadores()
+
+    assert analisador._atualizar_cache_incremental('PLANILHA', {'NPS_D1': _aba_xlsx(planilha, 'NPS D+1')}) is None
+    assert servidor.get_stats()['requisicoes'] == 0
+
+
+def test_aba_do_xlsx_registra_esquema_sem_formato_de_data(planilha, novo_analisador):
+    analisador = novo_analisador()
+    analisador._sheet_id_atual = 'PLANILHA'
+    d1 = _aba_xlsx(planilha, 'NPS D+1')
+    analisador.dados_abas = {'NPS_D1': d1}
+
+    analisador._registrar_esquemas_leitura()
+
+    esquema = esquemas_leitura.obter('PLANILHA', assinatura_cabecalho(d1.columns))
+    assert 'Data' in esquema['colunas'] and 'Primeiro Nome' not in esquema['colunas']
+    assert esquema['coluna_data'] is None and esquema['formato_data'] is None
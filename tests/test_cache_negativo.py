@@ -0,0 +1,75 @@
+"""Cache negativo contra o servidor local: o que é registrado e quanto poupa entre análises"""
+
+from cache_negativo import cache_negativo
+
+ABAS = ['NPS_D1', 'NPS_D30', 'NPS_Ruim']
+
+
+def _aba(planilha, nome):
+    return next(aba for aba in planilha if aba['nome'] == nome)
+
+
+def test_registra_gid_inexistente_de_planilha_acessivel(planilha, novo_analisador, extrair):
+    gids = [_aba(planilha, 'NPS D+1')['gid'], _aba(planilha, 'NPS D+30')['gid'], 999999]
+    sucesso, _ = extrair(novo_analisador(gids_customizados=gids))
+
+    assert sucesso
+    assert cache_negativo.tem_registro('PLANILHA', 'gid', 999999)
+    assert not cache_negativo.tem_registro('PLANILHA', 'gid', gids[0])
+
+
+def test_ignora_planilha_inacessivel(servidor, planilha, novo_analisador, extrair):
+    sucesso, requisicoes = extrair(novo_analisador(max_requisicoes=40), 'PRIVADA')
+    assert not sucesso
+    assert requisicoes > 0
+    assert cache_negativo.get_stats()['entradas'] == 0
+
+    # Planilha publicada depois: a nova tentativa não herda falhas
+    servidor.planilhas['PRIVADA'] = planilha
+    analisador = novo_analisador()
+    sucesso, requisicoes = extrair(analisador, 'PRIVADA')
+    assert sucesso
+    assert requisicoes > 0
+    assert sorted(analisador.dados_abas) == ABAS
+
+
+def _planilha_parcial(planilha):
+    """Sem aba Ruim e com nomes/GIDs fora do padrão: a descoberta cai na força bruta"""
+    resumo, d1, d30, _ = (dict(aba) for aba in planilha)
+    d1.update(nome='Pesquisa A', gid=7)
+    d30.update(nome='Pesquisa B', gid=12)
+    return [resumo, d1, d30]
+
+
+def test_segunda_analise_de_planilha_parcial_reaproveita_falhas(servidor, planilha, novo_analisador, extrair):
+    servidor.planilhas['PARCIAL'] = _planilha_parcial(planilha)
+    servidor.listagem = False
+
+    sucesso, requisicoes_primeira = extrair(novo_analisador(), 'PARCIAL')
+    assert sucesso
+    entradas = cache_negativo.get_stats()['entradas']
+    assert entradas > 50
+
+    sucesso, requisicoes_segunda = extrair(novo_analisador(), 'PARCIAL')
+    assert sucesso
+    assert requisicoes_segunda < requisicoes_primeira / 4
+    assert cache_negativo.get_stats()['acertos'] >= entradas / 2
+
+
+def test_nova_tentativa_esquece_falhas_da_planilha(servidor, planilha, novo_analisador, extrair):
+    servidor.planilhas['PARCIAL'] = _planilha_parcial(planilha)
+    servidor.listagem = False
+    extrair(novo_analisador(), 'PARCIAL')
+    assert cache_negativo.tem_registro('PARCIAL', 'aba', 'NPS Ruim')
+
+    # Aba criada depois: a falha registrada vale até o TTL, a não ser numa nova tentativa
+    servidor.planilhas['PARCIAL'].append(_aba(planilha, 'NPS Ruim'))
+    analisador = novo_analisador()
+    extrair(analisador, 'PARCIAL')
+    assert 'NPS_Ruim' not in analisador.dados_abas
+
+    analisador = novo_analisador()
+    sucesso, _ = extrair(analisador, 'PARCIAL', nova_tentativa=True)
+    assert sucesso
+    assert 'NPS_Ruim' in analisador.dados_abas
+    assert not cache_negativo.tem_registro('PARCIAL', 'aba', 'NPS Ruim')
@@ -0,0 +1,51 @@
+"""Consulta tq recusada não conta como aba inexistente"""
+
+import servidor_planilha_local
+from cache_negativo import cache_negativo
+
+
+APLICAR_CONSULTA = servidor_planilha_local.ConsultaGviz.aplicar
+
+
+def _recusar_consultas(monkeypatch):
+    def recusar(self, cabecalho, linhas):
+        raise ValueError('Invalid query')
+
+    monkeypatch.setattr(servidor_planilha_local.ConsultaGviz, 'aplicar', recusar)
+
+
+def test_falha_com_consulta_nao_bloqueia_outra_url(servidor, novo_analisador, monkeypatch):
+    _recusar_consultas(monkeypatch)
+    analisador = novo_analisador()
+    com_consulta = analisador._url_gviz('PLANILHA', nome_aba='NPS D+1', consulta='select * limit 5')
+
+    assert analisador._baixar_aba('PLANILHA', com_consulta, 10, nome_aba='NPS D+1') is None
+    assert not cache_negativo.tem_registro('PLANILHA', 'aba', 'NPS D+1')
+    assert ('aba', 'NPS D+1') not in analisador._falhas_sondagem
+
+    # Mesma aba por outra URL (sem tq), na mesma extração e com o memo ativo
+    df = analisador._baixar_aba('PLANILHA', analisador._url_gviz('PLANILHA', nome_aba='NPS D+1'), 10,
+                                nome_aba='NPS D+1')
+    assert df is not None and len(df) == 300
+
+
+def test_amostra_json_recusada_nao_vai_para_o_cache_negativo(servidor, novo_analisador, extrair, monkeypatch):
+    # Amostras JSON pedem "select * limit N": com a consulta recusada os nomes continuam válidos
+    _recusar_consultas(monkeypatch)
+    servidor.listagem = False
+    analisador = novo_analisador(max_requisicoes=40)
+    analisador.formato_gviz = 'json'
+
+    sucesso, _ = extrair(analisador)
+
+    assert not sucesso
+    assert cache_negativo.get_stats()['entradas'] > 0
+    for nome in ('NPS D+1', 'NPS D+30', 'NPS Ruim'):
+        assert not cache_negativo.tem_registro('PLANILHA', 'aba', nome)
+
+    # Sem a recusa, a próxima análise acha as abas pelo nome
+    monkeypatch.setattr(servidor_planilha_local.ConsultaGviz, 'aplicar', APLICAR_CONSULTA)
+    analisador = novo_analisador()
+    analisador.formato_gviz = 'json'
+    sucesso, _ = extrair(analisador)
+    assert sucesso and 'NPS_D1' in analisador.dados_abas
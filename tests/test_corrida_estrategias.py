@@ -0,0 +1,40 @@
+"""Corrida entre estratégias de descoberta: a primeira a resolver cancela as demais"""
+
+import time
+
+ABAS = ['NPS_D1', 'NPS_D30', 'NPS_Ruim']
+
+
+def test_perdedora_da_corrida_e_cancelada(servidor, novo_analisador):
+    servidor.latencia = 0.02
+    analisador = novo_analisador(max_concorrencia=2)
+    analisador._sheet_id_atual = 'PLANILHA'
+
+    servidor.zerar_contadores()
+    abas = analisador._correr_estrategias([
+        ('1.7', analisador._buscar_forcado_nomes_exatos),
+        ('3', analisador._descobrir_gids_por_nomes),
+    ], 'PLANILHA')
+
+    assert sorted(abas) == ABAS
+    # A busca por GIDs (100 candidatos) para assim que os nomes exatos resolvem as 3 abas
+    assert servidor.get_stats()['por_endpoint']['export'] < 30
+
+
+def test_estrategia_lenta_ve_o_cancelamento(servidor, novo_analisador):
+    analisador = novo_analisador()
+    analisador._sheet_id_atual = 'PLANILHA'
+
+    def lenta(sheet_id):
+        inicio = time.time()
+        while time.time() - inicio < 10 and not analisador._busca_cancelada():
+            time.sleep(0.01)
+        return {}
+
+    inicio = time.time()
+    abas = analisador._correr_estrategias([('1.7', analisador._buscar_forcado_nomes_exatos),
+                                           ('lenta', lenta)], 'PLANILHA')
+
+    assert sorted(abas) == ABAS
+    assert time.time() - inicio < 5
+    assert not analisador._busca_cancelada()  # Sinal limpo para a próxima corrida
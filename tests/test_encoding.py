@@ -0,0 +1,20 @@
+"""Detecção do encoding do CSV pelos bytes iniciais (_detectar_encoding)"""
+
+import codecs
+
+
+def test_bom_utf8(novo_analisador):
+    amostra = codecs.BOM_UTF8 + 'Avaliação;Comentário\n'.encode('utf-8')
+    assert novo_analisador()._detectar_encoding(amostra) == 'utf-8-sig'
+
+
+def test_bytes_cp1252(novo_analisador):
+    amostra = 'Avaliação;Comentário “ótimo”\n'.encode('cp1252')
+    assert novo_analisador()._detectar_encoding(amostra) == 'cp1252'
+
+
+def test_caractere_multibyte_cortado_no_fim_da_amostra(novo_analisador):
+    texto = 'Comentário;Avaliação\n'.encode('utf-8')
+    amostra = texto[:texto.index('ç'.encode('utf-8')) + 1]
+    assert amostra.endswith(b'\xc3')
+    assert novo_analisador()._detectar_encoding(amostra) == 'utf-8'
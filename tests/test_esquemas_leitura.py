@@ -0,0 +1,59 @@
+"""Esquema de leitura aprendido na primeira extração e aplicado nas seguintes"""
+
+import sys
+
+import pandas as pd
+import pytest
+
+import analisador_nps_completo
+from analisador_nps_completo import AnalisadorNPSCompleto
+from esquemas_leitura import esquemas_leitura
+
+
+def _extrair_duas_vezes(novo_analisador, extrair, apagar_cache_planilhas):
+    """Primeira extração registra o esquema; a segunda (sem cache de dados) o aplica"""
+    assert extrair(novo_analisador())[0]
+    apagar_cache_planilhas()
+    analisador = novo_analisador()
+    assert extrair(analisador)[0]
+    return analisador
+
+
+def test_esquema_aplicado_na_segunda_leitura(planilha, novo_analisador, extrair, apagar_cache_planilhas):
+    analisador = novo_analisador()
+    assert extrair(analisador)[0]
+    d1 = analisador.dados_abas['NPS_D1']
+    assert not d1.attrs.get('esquema')
+    esquema = esquemas_leitura.obter('PLANILHA', analisador_nps_completo.assinatura_cabecalho(d1.columns))
+    assert esquema['formato_data'] == '%d/%m/%Y'
+
+    apagar_cache_planilhas()
+    analisador = novo_analisador()
+    assert extrair(analisador)[0]
+
+    d1 = analisador.dados_abas['NPS_D1']
+    assert d1.attrs['esquema'] and d1.attrs['cabecalho'] == planilha[1]['cabecalho']
+    # Só as colunas do pipeline, data já convertida e avaliação numérica
+    assert list(d1.columns) == esquema['colunas'] and 'Primeiro Nome' not in d1.columns
+    assert pd.api.types.is_datetime64_any_dtype(d1[esquema['coluna_data']])
+    assert len(d1) == len(planilha[1]['linhas'])
+
+
+@pytest.mark.parametrize('sem_pyarrow', [False, True])
+def test_motor_pyarrow_e_fallback(sem_pyarrow, planilha, novo_analisador, extrair, apagar_cache_planilhas,
+                                  monkeypatch, capsys):
+    monkeypatch.setattr(analisador_nps_completo, 'MOTOR_CSV', 'pyarrow')
+    monkeypatch.setattr(AnalisadorNPSCompleto, '_aviso_pyarrow', False, raising=False)
+    if sem_pyarrow:
+        # Import de pyarrow falha como se o pacote não estivesse instalado
+        monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    else:
+        pytest.importorskip('pyarrow')
+
+    analisador = _extrair_duas_vezes(novo_analisador, extrair, apagar_cache_planilhas)
+
+    d1 = analisador.dados_abas['NPS_D1']
+    assert d1.attrs['esquema'] and len(d1) == len(planilha[1]['linhas'])
+    assert pd.api.types.is_datetime64_any_dtype(d1['Data'])
+    assert pd.api.types.is_numeric_dtype(d1[[c for c in d1.columns if c.startswith('Avalia')][0]])
+    assert ('pyarrow não instalado' in capsys.readouterr().out) == sem_pyarrow
@@ -0,0 +1,44 @@
+"""Ordem das estratégias de descoberta aprendida com o histórico"""
+
+from analisador_nps_completo import ESTRATEGIAS_DESCOBERTA
+from estatisticas_estrategias import EstatisticasEstrategias, estatisticas_estrategias
+from indice_abas import indice_abas
+
+CUSTOS = {'1.2': 3, '1.5': 3, '1.7': 3, '2': 20}
+
+
+def test_historico_muda_a_ordem_e_persiste(tmp_path):
+    arquivo = str(tmp_path / 'estatisticas.json')
+    estatisticas = EstatisticasEstrategias(arquivo)
+    assert estatisticas.ordenar('A', CUSTOS) == ['1.2', '1.5', '1.7', '2']
+
+    for _ in range(3):
+        estatisticas.registrar('A', '1.2', False, 3, 0.1)
+        estatisticas.registrar('A', '2', True, 2, 0.1)
+
+    ordem = estatisticas.ordenar('A', CUSTOS)
+    assert ordem.index('2') < ordem.index('1.2')
+    assert estatisticas.tem_sucesso('A', '2') and not estatisticas.tem_sucesso('A', '1.2')
+    # O histórico da planilha vale antes do geral; planilha sem histórico usa o geral
+    estatisticas.registrar('B', '1.2', True, 1, 0.1)
+    assert estatisticas.ordenar('B', CUSTOS)[0] == '1.2'
+    assert EstatisticasEstrategias(arquivo).ordenar('A', CUSTOS) == ordem
+
+
+def test_extracao_registra_e_reordena(servidor, novo_analisador, extrair, apagar_cache_planilhas):
+    custos = {codigo: custo for codigo, (_, _, custo) in ESTRATEGIAS_DESCOBERTA.items() if codigo != '1.1'}
+    assert estatisticas_estrategias.ordenar('PLANILHA', custos)[0] == '1.2'
+
+    # Sem a página htmlview a listagem falha e os nomes exatos resolvem a planilha
+    servidor.listagem = False
+    extrair(novo_analisador())
+    ordem = estatisticas_estrategias.ordenar('PLANILHA', custos)
+    assert ordem[0] == '1.7'
+    assert ordem.index('1.2') > ordem.index('1.7')
+
+    # Próxima extração: a líder com sucesso roda sozinha, sem a corrida nem o htmlview
+    apagar_cache_planilhas()
+    indice_abas.remover('PLANILHA')
+    sucesso, _ = extrair(novo_analisador())
+    assert sucesso
+    assert 'htmlview' not in servidor.get_stats()['por_endpoint']
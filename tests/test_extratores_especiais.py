@@ -0,0 +1,89 @@
+"""Registro de extratores especiais da estratégia 0"""
+
+import os
+import random
+
+import pytest
+
+from extratores_especiais import DivisorAbaUnica, ExtratorEspecial, ExtratorLegadoAbaUnica, RegistroExtratores
+from servidor_planilha_local import gerar_planilha_sintetica
+
+EXTRATOR_LEGADO = '''
+class ExtratorAbaUnicaEspecial:
+    def extrair_especial(self, url):
+        return {'sucesso': True, 'header': ['Fonte', 'Nota'],
+                'dados_separados': {'D+1': [['D+1', 9]], 'D+30': [['D+30', 7]]}}
+'''
+
+IMPLEMENTADOR_RUIM = '''
+class ImplementadorNPSRuim:
+    def implementar_nps_ruim_completo(self, url):
+        open('extracao_especial_NPS_Ruim.csv', 'w').write('Fonte,Nota\\n')
+        return {'sucesso': True, 'dados': [{'Fonte': 'NPS Ruim', 'Nota': 2}]}
+'''
+
+
+def test_extrator_sem_extrair_nao_instancia():
+    class Incompleto(ExtratorEspecial):
+        nome = 'incompleto'
+
+    with pytest.raises(TypeError):
+        Incompleto()
+
+
+def test_legado_roda_em_memoria_sem_o_implementador_ruim(tmp_path):
+    legado = tmp_path / 'legado'
+    legado.mkdir()
+    (legado / 'extrator_aba_unica_especial.py').write_text(EXTRATOR_LEGADO)
+    (legado / 'implementar_nps_ruim_completo.py').write_text(IMPLEMENTADOR_RUIM)
+
+    registro = RegistroExtratores(modulos=[], diretorio_legado=str(legado))
+    extratores = [e for e in registro.aplicaveis('URL') if isinstance(e, ExtratorLegadoAbaUnica)]
+    assert len(extratores) == 1
+
+    abas = extratores[0].extrair(None, 'PLANILHA', 'URL', None)
+    assert sorted(abas) == ['NPS_D1', 'NPS_D30']
+    assert not os.path.exists('extracao_especial_NPS_Ruim.csv')
+
+
+def _planilha_mista(linhas):
+    """Aba única com D+1, D+30 e NPS Ruim misturadas (coluna Fonte, Telefone e WhatsApp)"""
+    d1, d30, ruim = gerar_planilha_sintetica(linhas=linhas, cabecalhos_mojibake=False)[1:]
+    linhas_mistas = ([['D+1', l[1], l[2], l[4], '', l[5], l[6], l[7], l[8], '', ''] for l in d1['linhas']] +
+                     [['D+30', l[1], l[2], '', l[4], l[5], l[6], l[7], l[8], '', ''] for l in d30['linhas']] +
+                     [['NPS Ruim', l[2], l[3], l[5], '', l[6], l[7], l[8], l[9], l[10], l[11]] for l in ruim['linhas']])
+    random.Random(1).shuffle(linhas_mistas)
+    return [{'nome': 'Respostas', 'gid': 0, 'linhas': linhas_mistas,
+             'cabecalho': ['Fonte', 'Data', 'Nome Completo', 'Telefone', 'WhatsApp', 'Avaliação', 'Comentário',
+                           'Vendedor', 'Loja', 'Situação', 'Comentário da Resolução']}]
+
+
+def test_divide_aba_unica_com_todas_as_fontes(servidor, novo_analisador, extrair):
+    servidor.planilhas['MISTA'] = _planilha_mista(300)
+
+    analisador = novo_analisador()
+    sucesso, requisicoes = extrair(analisador, 'MISTA')
+
+    assert sucesso
+    assert {tipo: len(df) for tipo, df in analisador.dados_abas.items()} == {
+        'NPS_D1': 300, 'NPS_D30': 300, 'NPS_Ruim': 30}
+    assert 'WhatsApp' not in analisador.dados_abas['NPS_D1'].columns
+    assert 'Telefone' not in analisador.dados_abas['NPS_D30'].columns
+    # Listagem + amostra do GID 0 + corpo completo
+    assert requisicoes <= 3
+
+
+def test_aba_ruim_com_fonte_nao_e_dividida(servidor, novo_analisador):
+    # NPS Ruim comum: Fonte diz de onde veio o detrator e metade dos casos está pendente
+    ruim = gerar_planilha_sintetica(linhas=1000, cabecalhos_mojibake=False)[3]
+    servidor.planilhas['RUIM'] = [dict(ruim, gid=0, cabecalho=ruim['cabecalho'] + ['WhatsApp'],
+                                       linhas=[linha + [linha[5]] for linha in ruim['linhas']])]
+    analisador = novo_analisador()
+    amostra = analisador._baixar_aba('RUIM', analisador._url_export('RUIM', 0), 10, gid=0, amostra=True)
+    divisor = DivisorAbaUnica()
+    assert amostra.attrs.get('amostra_url') and divisor.aplica_cabecalho(amostra.columns)
+
+    servidor.zerar_contadores()
+    assert divisor.extrair(analisador, 'RUIM', servidor.url_planilha('RUIM'), amostra) is None
+    # Descartada pela amostra: o corpo completo não é baixado
+    assert servidor.get_stats()['requisicoes'] == 0
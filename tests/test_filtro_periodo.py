@@ -0,0 +1,65 @@
+"""Filtro por período no servidor (consulta gviz) com o cliente como garantia"""
+
+from datetime import date, datetime
+from urllib.parse import parse_qsl, urlsplit
+
+import servidor_planilha_local
+
+
+def _espionar_consultas(analisador, monkeypatch):
+    """Lista o parâmetro tq de cada transferência (None quando não há consulta)"""
+    consultas = []
+    original = analisador._transferir_aba
+
+    def transferir(sheet_id, csv_url, timeout, gid=None, nome_aba=None, amostra=False):
+        consultas.append(dict(parse_qsl(urlsplit(csv_url).query)).get('tq'))
+        return original(sheet_id, csv_url, timeout, gid, nome_aba, amostra)
+
+    monkeypatch.setattr(analisador, '_transferir_aba', transferir)
+    return consultas
+
+
+def _linhas_no_periodo(planilha, nome, inicio, fim):
+    aba = next(aba for aba in planilha if aba['nome'] == nome)
+    return sum(1 for linha in aba['linhas'] if inicio <= datetime.strptime(linha[1], '%d/%m/%Y').date() <= fim)
+
+
+def test_consulta_com_periodo_e_colunas_do_pipeline(planilha, novo_analisador, extrair, monkeypatch):
+    analisador = novo_analisador()
+    consultas = _espionar_consultas(analisador, monkeypatch)
+
+    sucesso, _ = extrair(analisador, data_inicio='2025-03-01', data_fim='2025-03-31')
+
+    assert sucesso
+    periodo = "where toDate(B) >= date '2025-03-01' and toDate(B) <= date '2025-03-31'"
+    # D+1 sem ID, Primeiro Nome e a última coluna; D+30 mantém o Id Bot
+    assert f"select B, C, E, F, G, H, I {periodo}" in consultas
+    assert f"select A, B, C, E, F, G, H, I {periodo}" in consultas
+    inicio, fim = date(2025, 3, 1), date(2025, 3, 31)
+    d1, d30 = analisador.dados_abas['NPS_D1'], analisador.dados_abas['NPS_D30']
+    assert len(d1) == _linhas_no_periodo(planilha, 'NPS D+1', inicio, fim)
+    assert len(d30) == _linhas_no_periodo(planilha, 'NPS D+30', inicio, fim)
+    assert 'Primeiro Nome' not in d1.columns and d1.attrs['consulta'].endswith(periodo)
+
+
+def test_consulta_recusada_baixa_a_aba_inteira(planilha, novo_analisador, extrair, monkeypatch):
+    def recusar(self, cabecalho, linhas):
+        raise ValueError('Invalid query: Can\'t perform the function toDate on a column that is not a Date')
+
+    monkeypatch.setattr(servidor_planilha_local.ConsultaGviz, 'aplicar', recusar)
+    analisador = novo_analisador()
+    consultas = _espionar_consultas(analisador, monkeypatch)
+
+    sucesso, _ = extrair(analisador, data_inicio='2025-03-01', data_fim='2025-03-31')
+
+    assert sucesso
+    assert any(consultas) and consultas[-1] is None
+    assert len(analisador.dados_abas['NPS_D1']) == len(planilha[1]['linhas'])
+
+
+def test_sem_periodo_nao_consulta(novo_analisador, extrair, monkeypatch):
+    analisador = novo_analisador()
+    consultas = _espionar_consultas(analisador, monkeypatch)
+
+    assert extrair(analisador)[0]
+    assert not any(consultas)
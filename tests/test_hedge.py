@@ -0,0 +1,77 @@
+"""Cópia atrasada (hedge) das requisições presas na cauda de latência"""
+
+import time
+import threading
+from collections import Counter
+
+from latencias_http import LatenciasEndpoints
+from limitador_google import LimitadorGoogle
+from sessao_http import SessaoHTTP
+
+ATRASO_CAUDA = 1.5
+
+
+def _aquecer_latencias(latencias, url, segundos=0.01):
+    """Medições suficientes para o endpoint ter p95 (e o hedge ser armado)"""
+    for _ in range(latencias.amostras_minimas):
+        latencias.registrar(url, segundos)
+
+
+def _injetar_cauda(servidor, monkeypatch, lenta):
+    """Atrasa em ATRASO_CAUDA a requisição escolhida por lenta(caminho, ordem do caminho)"""
+    vistos = Counter()
+    lock = threading.Lock()
+    original = servidor._atender
+
+    def atender(manipulador):
+        with lock:
+            vistos[manipulador.path] += 1
+            ordem = vistos[manipulador.path]
+        if lenta(manipulador.path, ordem):
+            time.sleep(ATRASO_CAUDA)
+        original(manipulador)
+
+    monkeypatch.setattr(servidor, '_atender', atender)
+
+
+def test_copia_vence_a_requisicao_lenta(servidor, planilha, monkeypatch):
+    url = f"{servidor.url_base}/PLANILHA/export?format=csv&gid={planilha[1]['gid']}"
+    _injetar_cauda(servidor, monkeypatch, lambda caminho, ordem: ordem == 1)
+    sessao = SessaoHTTP(limitador=LimitadorGoogle(taxa=1000, rajada=1000), latencias=LatenciasEndpoints())
+    _aquecer_latencias(sessao.latencias, url)
+
+    inicio = time.time()
+    try:
+        response = sessao.get_com_hedge(url, timeout=10)
+    finally:
+        sessao.fechar()
+
+    assert response.status_code == 200
+    assert time.time() - inicio < ATRASO_CAUDA
+    assert (sessao.total_hedges, sessao.hedges_vencedores) == (1, 1)
+
+
+def test_sem_medicoes_nao_duplica(servidor, planilha):
+    url = f"{servidor.url_base}/PLANILHA/export?format=csv&gid={planilha[1]['gid']}"
+    sessao = SessaoHTTP(limitador=LimitadorGoogle(taxa=1000, rajada=1000), latencias=LatenciasEndpoints())
+    try:
+        assert sessao.get_com_hedge(url, timeout=10).status_code == 200
+    finally:
+        sessao.fechar()
+    assert sessao.total_hedges == 0
+
+
+def test_download_completo_lento_e_duplicado(servidor, planilha, novo_analisador, extrair, monkeypatch):
+    gid_d1 = str(planilha[1]['gid'])
+    # A primeira requisição de cada aba é a amostra; a segunda, o corpo completo (com hedge)
+    _injetar_cauda(servidor, monkeypatch, lambda caminho, ordem: caminho.endswith(f"gid={gid_d1}") and ordem == 2)
+    analisador = novo_analisador()
+    _aquecer_latencias(analisador.sessao.latencias, f"{servidor.url_base}/PLANILHA/export?format=csv&gid=0")
+
+    inicio = time.time()
+    sucesso, _ = extrair(analisador)
+
+    assert sucesso
+    assert time.time() - inicio < ATRASO_CAUDA
+    assert analisador.sessao.hedges_vencedores >= 1
+    assert len(analisador.dados_abas['NPS_D1']) == len(planilha[1]['linhas'])
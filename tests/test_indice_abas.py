@@ -0,0 +1,34 @@
+"""Índice persistente de GIDs por planilha contra o servidor local"""
+
+from indice_abas import indice_abas
+
+ABAS = ['NPS_D1', 'NPS_D30', 'NPS_Ruim']
+
+
+def test_indice_dispensa_descoberta(novo_analisador, extrair, apagar_cache_planilhas):
+    _, requisicoes_fria = extrair(novo_analisador())
+    assert sorted(indice_abas.obter('PLANILHA')) == ABAS
+
+    apagar_cache_planilhas()
+    analisador = novo_analisador()
+    sucesso, requisicoes = extrair(analisador)
+
+    assert sucesso
+    assert sorted(analisador.dados_abas) == ABAS
+    assert requisicoes == len(ABAS) < requisicoes_fria
+
+
+def test_indice_parcial_descobre_tipos_faltantes(novo_analisador, extrair, apagar_cache_planilhas):
+    extrair(novo_analisador())
+    entradas = indice_abas.obter('PLANILHA')
+    del entradas['NPS_D30']
+    indice_abas.registrar('PLANILHA', entradas)
+
+    apagar_cache_planilhas()
+    analisador = novo_analisador()
+    sucesso, _ = extrair(analisador)
+
+    assert sucesso
+    assert analisador.status_extracao == 'completa'
+    assert sorted(analisador.dados_abas) == ABAS
+    assert sorted(indice_abas.obter('PLANILHA')) == ABAS
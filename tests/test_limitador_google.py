@@ -0,0 +1,74 @@
+"""Limitador do Google: backoff em 429 e circuit breaker por planilha contra o servidor local"""
+
+import os
+import importlib.util
+
+import pytest
+
+from limitador_google import LimitadorGoogle, CircuitoAbertoError, limitador_google
+from latencias_http import LatenciasEndpoints
+from sessao_http import SessaoHTTP
+
+
+@pytest.fixture
+def sessao_limitada():
+    sessoes = []
+
+    def criar(**kwargs):
+        sessao = SessaoHTTP(limitador=LimitadorGoogle(**kwargs), latencias=LatenciasEndpoints())
+        sessoes.append(sessao)
+        return sessao
+
+    yield criar
+    for sessao in sessoes:
+        sessao.fechar()
+
+
+def test_circuito_abre_depois_de_n_falhas(servidor, sessao_limitada):
+    servidor.taxa_erro = 1.0
+    sessao = sessao_limitada(max_tentativas=1, falhas_circuito=3, circuito_segundos=60)
+    url = f"{servidor.url_base}/PLANILHA/export?format=csv&gid=0"
+
+    for _ in range(3):
+        assert sessao.get(url, timeout=5).status_code == 500
+    servidor.zerar_contadores()
+
+    with pytest.raises(CircuitoAbertoError) as erro:
+        sessao.get(url, timeout=5)
+    assert erro.value.segundos_restantes > 50
+    assert servidor.get_stats()['requisicoes'] == 0
+    # Outras planilhas seguem liberadas
+    assert sessao.get(f"{servidor.url_base}/OUTRA/export?format=csv&gid=0", timeout=5).status_code == 500
+
+
+def test_429_repete_e_reduz_a_taxa_do_host(servidor, sessao_limitada):
+    servidor.taxa_429 = 1.0
+    servidor.retry_after = 0
+    sessao = sessao_limitada(taxa=1000, rajada=1000, max_tentativas=3, falhas_circuito=10)
+    url = f"{servidor.url_base}/PLANILHA/export?format=csv&gid=0"
+
+    assert sessao.get(url, timeout=5).status_code == 429
+    assert servidor.get_stats()['requisicoes'] == 3
+    stats = sessao.limitador.get_stats()
+    assert stats['repeticoes'] == 2
+    assert list(stats['taxa_por_host'].values())[0] < 1000
+
+
+def test_api_test_responde_503_com_retry_after_no_circuito_aberto(monkeypatch):
+    pytest.importorskip('flask')
+    pytest.importorskip('flask_cors')
+    caminho = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'frontend', 'server.py')
+    spec = importlib.util.spec_from_file_location('servidor_frontend', caminho)
+    servidor_frontend = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(servidor_frontend)
+
+    monkeypatch.setattr(limitador_google, '_circuitos', {})
+    for _ in range(limitador_google.falhas_circuito):
+        limitador_google.registrar_resultado('BLOQUEADA', False)
+
+    resposta = servidor_frontend.app.test_client().post(
+        '/api/test', json={'sheets_url': 'https://docs.google.com/spreadsheets/d/BLOQUEADA/edit'})
+
+    assert resposta.status_code == 503
+    assert int(resposta.headers['Retry-After']) > 0
+    assert resposta.get_json()['retry_after'] == int(resposta.headers['Retry-After'])
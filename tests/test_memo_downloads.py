@@ -0,0 +1,61 @@
+"""Memo de downloads por extração: cada recurso é transferido uma vez"""
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from test_cache_negativo import _planilha_parcial
+
+
+def _espionar_transferencias(analisador, monkeypatch):
+    """Conta as transferências reais por (URL canônica, amostra)"""
+    transferencias = Counter()
+    original = analisador._transferir_aba
+
+    def transferir(sheet_id, csv_url, timeout, gid=None, nome_aba=None, amostra=False):
+        transferencias[(analisador._url_canonica(csv_url), amostra)] += 1
+        return original(sheet_id, csv_url, timeout, gid, nome_aba, amostra)
+
+    monkeypatch.setattr(analisador, '_transferir_aba', transferir)
+    return transferencias
+
+
+def test_gid_zero_baixado_uma_vez_por_extracao(servidor, planilha, novo_analisador, extrair, monkeypatch):
+    servidor.planilhas['PARCIAL'] = _planilha_parcial(planilha)
+    servidor.listagem = False
+    analisador = novo_analisador()
+    transferencias = _espionar_transferencias(analisador, monkeypatch)
+    acertos = []
+    limpar = analisador._limpar_memo
+    monkeypatch.setattr(analisador, '_limpar_memo', lambda: (acertos.append(analisador._memo_acertos), limpar()))
+
+    sucesso, _ = extrair(analisador, 'PARCIAL')
+
+    assert sucesso
+    # Estratégia 1.5 (single=true) e força bruta pedem o GID 0: uma transferência só
+    gid_zero = [chave for chave in transferencias if 'gid=0' in chave[0]]
+    assert len(gid_zero) == 1 and transferencias[gid_zero[0]] == 1
+    assert max(transferencias.values()) == 1
+    assert acertos[-1] > 0
+
+
+def test_pedidos_simultaneos_e_amostra(servidor, novo_analisador, monkeypatch):
+    analisador = novo_analisador()
+    transferencias = _espionar_transferencias(analisador, monkeypatch)
+    url = f"{servidor.url_base}/PLANILHA/export?format=csv&gid=0"
+    mesma_aba = f"{servidor.url_base}/PLANILHA/export?gid=0&single=true&format=csv"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        resultados = list(executor.map(lambda u: analisador._baixar_aba('PLANILHA', u, 10, gid=0, amostra=True),
+                                       [url, mesma_aba] * 2))
+
+    assert sum(transferencias.values()) == 1
+    assert analisador._memo_acertos == 3
+    # Cada chamada recebe sua cópia: attrs de uma não vazam para a outra
+    resultados[0].attrs['marcado'] = True
+    assert 'marcado' not in resultados[1].attrs
+
+    # A amostra memorizada atende outra amostra, mas não o corpo completo
+    completo = analisador._baixar_aba('PLANILHA', url, 10, gid=0)
+    assert len(completo) >= len(resultados[0])
+    esperado = 2 if resultados[0].attrs.get('amostra_url') else 1
+    assert sum(transferencias.values()) == esperado
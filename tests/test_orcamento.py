@@ -0,0 +1,51 @@
+"""Orçamento da extração: o prazo vale também para as esperas do limitador"""
+
+import time
+
+import pytest
+
+from limitador_google import LimitadorGoogle, PrazoEsgotadoError
+
+
+class _Resposta:
+    def __init__(self, status, cabecalhos=None):
+        self.status_code = status
+        self.headers = cabecalhos or {}
+
+    def close(self):
+        pass
+
+
+def test_limitador_nao_dorme_retry_after_alem_do_prazo():
+    limitador = LimitadorGoogle(max_tentativas=3)
+    chamadas = []
+
+    def requisicao():
+        chamadas.append(time.time())
+        return _Resposta(429, {'Retry-After': '30'})
+
+    inicio = time.time()
+    with pytest.raises(PrazoEsgotadoError):
+        limitador.executar('http://127.0.0.1/spreadsheets/d/X/export', requisicao, prazo=time.time() + 2)
+    assert len(chamadas) == 1
+    assert time.time() - inicio < 1
+
+
+def test_limitador_nao_espera_ficha_alem_do_prazo():
+    limitador = LimitadorGoogle(taxa=0.1, rajada=1)
+    limitador.aguardar_vez('host')
+    with pytest.raises(PrazoEsgotadoError):
+        limitador.aguardar_vez('host', prazo=time.time() + 1)
+
+
+def test_extracao_termina_no_prazo_com_retry_after_longo(servidor, novo_analisador):
+    servidor.taxa_429 = 1.0
+    servidor.retry_after = 30
+    analisador = novo_analisador(prazo_extracao=3)
+
+    inicio = time.time()
+    sucesso = analisador._extrair_abas_automaticamente(servidor.url_planilha('PLANILHA'))
+
+    assert not sucesso
+    assert analisador.status_extracao == 'falha'
+    assert time.time() - inicio < 3
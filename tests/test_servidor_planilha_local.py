@@ -0,0 +1,19 @@
+"""Servidor local e benchmark da extração"""
+
+import os
+
+from indice_abas import indice_abas
+from servidor_planilha_local import executar_benchmark
+
+
+def test_benchmark_usa_memorias_proprias(tmp_path):
+    resultados = executar_benchmark(linhas=50, latencia=0)
+
+    assert os.getcwd() == str(tmp_path)
+    assert os.listdir('cache') == []
+    assert indice_abas.obter('BENCHFULL') == {}
+
+    completas = {rotulo: stats for rotulo, _, _, stats in resultados if rotulo.startswith('extração completa')}
+    assert completas['extração completa (fria)']['requisicoes'] > 0
+    # Segunda extração completa reaproveita o cache gravado pela primeira
+    assert completas['extração completa (índice/cache)']['requisicoes'] == 0
@@ -0,0 +1,37 @@
+"""Sondagem concorrente de GIDs (estratégias de força bruta)"""
+
+ABAS = ['NPS_D1', 'NPS_D30', 'NPS_Ruim']
+
+
+def _por_nome(planilha):
+    abas = {aba['nome']: dict(aba) for aba in planilha}
+    # Sem Telefone a aba Ruim é reconhecida só pelo cabeçalho (sem o nome da aba)
+    ruim = abas['NPS Ruim']
+    coluna = ruim['cabecalho'].index('Telefone')
+    ruim['cabecalho'] = ruim['cabecalho'][:coluna] + ruim['cabecalho'][coluna + 1:]
+    ruim['linhas'] = [linha[:coluna] + linha[coluna + 1:] for linha in ruim['linhas']]
+    return abas
+
+
+def test_pool_para_quando_as_tres_abas_aparecem(servidor, planilha, novo_analisador):
+    abas = _por_nome(planilha)
+    servidor.planilhas['PLANILHA'] = list(abas.values())
+    gids = [abas[nome]['gid'] for nome in ('NPS Ruim', 'NPS D+1', 'NPS D+30')] + list(range(5000, 5200))
+
+    servidor.zerar_contadores()
+    encontradas = novo_analisador(max_concorrencia=4)._sondar_gids_concorrente('PLANILHA', gids)
+
+    assert sorted(encontradas) == ABAS
+    assert servidor.get_stats()['requisicoes'] < 20
+
+
+def test_mesmo_tipo_em_dois_gids_vence_o_primeiro_da_lista(servidor, planilha, novo_analisador):
+    abas = _por_nome(planilha)
+    copia = dict(abas['NPS D+1'], nome='Cópia D+1', gid=77)
+    servidor.planilhas['PLANILHA'] = list(abas.values()) + [copia]
+    gids = [77, abas['NPS D+1']['gid'], abas['NPS D+30']['gid']]
+
+    encontradas = novo_analisador()._sondar_gids_concorrente('PLANILHA', gids)
+
+    assert encontradas['NPS_D1'].attrs['origem']['gid'] == 77
+    assert 'NPS_D30' in encontradas